@@ -0,0 +1,164 @@
+"""配工流程分阶段性能测试
+
+用 synthetic 生成指定规模的工作簿，逐阶段计时（多次运行取最短时间），并与保存的基线
+比较，判断对读取、解析或配工逻辑的改动是否让峰值日配工变慢：
+    python cli.py bench --save-baseline        # 记录基线
+    python cli.py bench                        # 与基线比较，有阶段变慢时返回非零
+
+用时与机器相关，基线文件（默认 bench_baseline.json）不随代码提交，须在运行比较的机器上
+先记录；缺少所比较规模的基线时 bench 直接返回非零，不会在无基线时误报通过。
+"""
+import json
+import platform
+import random
+import time
+from io import BytesIO
+
+from constraints import compile_constraints
+from engine import (allocate_ships_to_leaders, assign_workareas, build_crane_leader_index, build_workarea_data,
+                    cluster_allocations, crane_policy, match_staff_to_leaders, parse_crane_tables, partition_cranes,
+                    summarize_staff)
+from export import build_report, export_report
+from loader import read_workbook
+from synthetic import BERTH_CRANE_COLUMN, generate_frames, write_workbook
+
+# 预置规模：小（日常）、中、峰值日
+SCENARIOS = {
+    "small": {"ships": 12, "workareas": 2},
+    "medium": {"ships": 60, "workareas": 2},
+    "peak": {"ships": 240, "workareas": 4, "staff": 1500},
+}
+
+STAGES = ["解析Excel", "人员筛选", "桥吊解析", "规则编译", "组长分配", "岸线聚类", "连续切分", "结果匹配", "配工合计", "整理报表",
+          "导出Excel"]
+
+DEFAULT_BASELINE = "bench_baseline.json"
+
+# 比基线慢超过该倍数且绝对差超过 MIN_DELTA 秒视为变慢（过滤计时抖动）
+SLOWDOWN = 1.2
+MIN_DELTA = 0.005
+
+
+def run_stages(data, seed=0):
+    """对工作簿字节内容执行一遍贪心配工流程，返回 阶段 -> 用时（秒）
+
+    组长分配、岸线聚类、连续切分、结果匹配四个阶段按贪心模式的顺序单独调用对应函数计时（输入与
+    assign_work 相同），配工合计为 assign_workareas 全流程，
+    导出Excel 为完整报表（含汇总视图）的流式写出。
+    """
+    timings = {}
+    clock = time.perf_counter
+
+    start = clock()
+    frames, _ = read_workbook(BytesIO(data))
+    timings["解析Excel"] = clock() - start
+
+    start = clock()
+    summary = summarize_staff(frames["人员信息表"])
+    timings["人员筛选"] = clock() - start
+    leader_available = summary["available"]["理货组长"]
+    staff_available = summary["available"]["理货员"]
+
+    start = clock()
+    workarea_data = build_workarea_data(parse_crane_tables(frames["泊位与桥吊关联表"], frames["船舶与桥吊关联表"]))
+    timings["桥吊解析"] = clock() - start
+
+    start = clock()
+    constraints = compile_constraints(frames["四期-组长带船限制"], frames["理货员桥吊负责规则"],
+                                      known_people=frames["人员信息表"]["姓名"])
+    timings["规则编译"] = clock() - start
+
+    # 组长分配、岸线聚类、连续切分、结果匹配：与贪心模式相同的输入，每个工作地一个随机数生成器
+    allocations, crane_maps, rngs = {}, {}, {}
+    start = clock()
+    for wa, data_wa in workarea_data.items():
+        leaders, model = leader_available.get(wa, []), data_wa["model"]
+        if leaders and model.num_ships:
+            rngs[wa] = random.Random(seed)
+            allocations[wa], _ = allocate_ships_to_leaders(leaders, model, range(model.num_ships), rngs[wa],
+                                                           constraints.leader_caps(wa, leaders))
+    timings["组长分配"] = clock() - start
+    start = clock()
+    for wa, leader_allocations in allocations.items():
+        allocations[wa] = cluster_allocations(workarea_data[wa]["model"], leader_allocations, rngs[wa])
+    timings["岸线聚类"] = clock() - start
+
+    crane_counts = {}
+    for wa, data_wa in workarea_data.items():
+        total, staff = data_wa["model"].num_cranes, staff_available.get(wa, [])
+        min_per, max_per = constraints.clerk_limits(wa)
+        limits = {person: constraints.clerk_limits(wa, person) for person in staff}
+        counts = crane_policy(wa)["split"](wa, total, staff, min_per, max_per, [], limits) if staff else None
+        if counts and wa in allocations:
+            crane_counts[wa] = counts
+    start = clock()
+    for wa, counts in crane_counts.items():
+        model = workarea_data[wa]["model"]
+        limits = [constraints.clerk_limits(wa, person) for person in counts]
+        crane_maps[wa] = partition_cranes(model, counts, limits, build_crane_leader_index(model, allocations[wa]))
+    timings["连续切分"] = clock() - start
+    start = clock()
+    for wa, staff_crane_map in crane_maps.items():
+        match_staff_to_leaders(wa, workarea_data[wa]["model"], staff_crane_map, allocations[wa], [])
+    timings["结果匹配"] = clock() - start
+
+    start = clock()
+    outcomes = assign_workareas(workarea_data, leader_available, staff_available, seed=seed,
+                                constraints=constraints)
+    timings["配工合计"] = clock() - start
+
+    start = clock()
+    report = build_report({wa: outcome[0] for wa, outcome in outcomes.items()},
+                          {wa: outcome[2] for wa, outcome in outcomes.items()}, workarea_data,
+                          {wa: outcome[3] for wa, outcome in outcomes.items()},
+                          {wa: outcome[1] for wa, outcome in outcomes.items()})
+    timings["整理报表"] = clock() - start
+
+    start = clock()
+    export_report(report, "xlsx")
+    timings["导出Excel"] = clock() - start
+    return timings
+
+
+def benchmark(params, repeat=5, seed=0):
+    """生成一次工作簿，重复运行 repeat 次，各阶段取最短用时"""
+    frames = generate_frames(seed=seed, **params)
+    data = write_workbook(frames)
+    runs = [run_stages(data, seed) for _ in range(repeat)]
+    return {
+        "params": params,
+        "size": {"人员": len(frames["人员信息表"]), "船舶": len(frames["船舶与桥吊关联表"]),
+                 "桥吊": int(frames["泊位与桥吊关联表"][BERTH_CRANE_COLUMN].str.split(",").str.len().sum()),
+                 "文件KB": round(len(data) / 1024, 1)},
+        "stages": {stage: min(run[stage] for run in runs) for stage in STAGES},
+    }
+
+
+def compare(current, baseline, slowdown=SLOWDOWN, min_delta=MIN_DELTA):
+    """逐阶段与基线比较，返回（阶段，本次，基线，倍数，是否变慢）列表；基线缺失的阶段倍数为None"""
+    rows = []
+    for stage, seconds in current["stages"].items():
+        base = (baseline or {}).get("stages", {}).get(stage)
+        ratio = seconds / base if base else None
+        slower = base is not None and seconds > base * slowdown and seconds - base > min_delta
+        rows.append((stage, seconds, base, ratio, slower))
+    return rows
+
+
+def load_baseline(path):
+    """读取基线文件，不存在时返回空字典"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, results):
+    """保存基线：规模名 -> benchmark 结果，附带运行环境便于判断是否可比"""
+    baseline = load_baseline(path)
+    baseline.update(results)
+    baseline["_环境"] = {"python": platform.python_version(), "平台": platform.platform(),
+                        "时间": time.strftime("%Y-%m-%d %H:%M:%S")}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,451 @@
+"""桥吊理货配工命令行工具
+
+批量配工：对目录下的每日Excel逐个配工，每个输入生成一个结果文件
+    python cli.py batch 输入目录或文件... -o 输出目录 [-j 进程数] [--seed 种子]
+        [--mode optimal --time-budget 秒] [--trace]
+增量重排：基于上次配工结果和更新后的Excel，只调整受影响的组长和理货员
+    python cli.py replan 更新后的Excel --plan 上次配工结果.xlsx -o 输出文件 [--seed 种子]
+多日配工：按日期顺序逐日配工，按历史负荷轮换大船和桥吊，历史保存在本地SQLite
+    python cli.py roster 每日Excel或目录... -o 输出目录 [--base 人员与规则.xlsx] [--history 配工历史.sqlite]
+生成测试数据：按指定规模生成五张工作表齐全的工作簿
+    python cli.py generate -o 峰值日.xlsx --ships 240 --workareas 4 [--staff 人数 --leave-ratio 0.1]
+性能测试：分阶段计时并与基线比较，有阶段变慢或缺少基线时返回非零（先用 --save-baseline 在本机记录）
+    python cli.py bench [--scenario peak] [--save-baseline] [--baseline 基线文件]
+预检：只读表头和必要的列，逐项列出缺少的工作表/列及取值问题，有错误时返回非零
+    python cli.py validate 输入目录或文件...
+方案评估：按输入数据给配工结果打分（覆盖、均衡、规则、理货员与组长一致性），可评估任意导出的结果
+    python cli.py evaluate 输入Excel --plan 配工结果.xlsx [-o 评估结果.xlsx]
+多种子择优：用多个随机种子并行配工，按评估得分取最优方案导出
+    python cli.py best 输入Excel -n 16 -o 输出文件 [-j 进程数] [--seed 起始种子] [--mode optimal]
+方案对比：在同一份Excel上试算多个方案（增减人员、改规则、调整船舶），输出对比表
+    python cli.py scenarios 输入Excel --spec 方案.json -o 方案对比.xlsx [-j 进程数] [--mode optimal]
+配工服务：本地HTTP服务，接收Excel或JSON，有界进程池执行并按内容缓存结果（见 service.py）
+    python cli.py serve [--host 127.0.0.1] [--port 8765] [-j 进程数] [--queue 排队数] [--cache 缓存数]
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import bench
+from diagnostics import Recorder
+from engine import MODES, has_results, run_schedule, schedule_file, write_sheets
+from evaluate import PlanEvaluator, best_of_seeds, combine_results, read_plan_workbook
+from export import EXPORT_FORMATS, available_formats, build_report, export_report, report_filename
+from loader import read_workbook
+from replan import read_plan, replan
+from roster import HistoryStore, fairness_report, plan_days, read_days
+from scenario import SCENARIO_KEYS, compare_scenarios, load_scenarios, prepare_base
+from service import DEFAULT_PORT, make_server
+from synthetic import generate_frames, write_workbook
+from validate import blocking, format_issue, validate_workbook
+
+
+def collect_workbooks(paths, pattern="*.xlsx"):
+    """展开输入路径（文件或目录），忽略Excel临时文件"""
+    files = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            files.extend(sorted(p.glob(pattern)))
+        elif p.is_file():
+            files.append(p)
+        else:
+            print(f"路径不存在：{p}", file=sys.stderr)
+    return [f for f in files if not f.name.startswith("~$")]
+
+
+def schedule_one(path, output_dir, seed=None, mode="greedy", time_budget=5.0, trace=False, fmt="xlsx"):
+    """配工单个文件并写出完整报表（见 export.build_report），返回（输入文件，输出文件，提示信息）
+
+    fmt 为导出格式（见 export.EXPORT_FORMATS）；trace 为 True 时记录各阶段用时和内存峰值，另存为 <文件名>_trace.json（Chrome trace 格式）。
+    """
+    if trace:
+        with Recorder(memory=True) as recorder:
+            result = _schedule_and_write(path, output_dir, seed, mode, time_budget, fmt)
+        trace_file = Path(output_dir) / f"{Path(path).stem}_trace.json"
+        trace_file.write_text(recorder.chrome_trace(), encoding="utf-8")
+        return result
+    return _schedule_and_write(path, output_dir, seed, mode, time_budget, fmt)
+
+
+def _schedule_and_write(path, output_dir, seed, mode, time_budget, fmt):
+    errors = blocking(validate_workbook(path))
+    if not errors.empty:
+        raise ValueError("；".join(format_issue(item) for _, item in errors.iterrows()))
+    result = schedule_file(path, seed=seed, mode=mode, time_budget=time_budget)
+    messages = [(wa, level, text) for wa, msgs in result["messages"].items() for level, text in msgs]
+    for sheet, row, text in result["rule_issues"]:
+        messages.append((sheet, "warning", f"{f'第{row}行 ' if row is not None else ''}{text}"))
+    for row in result["crane_issues"].itertuples(index=False):
+        messages.append((row.工作表, "warning", f"第{row.行号}行 {row.名称} {row.桥吊号}：{row.问题}"))
+    if not has_results(result["results"]):
+        return str(path), None, messages
+
+    target = Path(output_dir) / report_filename(f"{Path(path).stem}_配工结果", fmt)
+    report = build_report(result["results"], result["details"], result["workarea_data"],
+                          result["messages"], result["remaining"])
+    export_report(report, fmt, target)
+    return str(path), str(target), messages
+
+
+def cmd_batch(args):
+    files = collect_workbooks(args.inputs, args.pattern)
+    if not files:
+        print("未找到待配工的Excel文件", file=sys.stderr)
+        return 1
+    os.makedirs(args.output, exist_ok=True)
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {pool.submit(schedule_one, f, args.output, args.seed, args.mode, args.time_budget, args.trace,
+                               args.format): f
+                   for f in files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                _, target, messages = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[失败] {path}：{e}")
+                continue
+            if target is None:
+                failed += 1
+                print(f"[无结果] {path}")
+            else:
+                print(f"[完成] {path} -> {target}")
+            if args.verbose or target is None:
+                for wa, level, text in messages:
+                    if level in ("warning", "error") or args.verbose:
+                        print(f"    {wa} {level}: {text}")
+
+    print(f"共{len(files)}个文件，成功{len(files) - failed}个，失败{failed}个")
+    return 1 if failed else 0
+
+
+def cmd_replan(args):
+    frames, missing = read_workbook(args.input)
+    if missing:
+        print(f"未找到工作表：{'、'.join(missing)}", file=sys.stderr)
+        return 1
+    result = replan(read_plan(args.plan), frames, seed=args.seed)
+    for wa, msgs in result["messages"].items():
+        for level, text in msgs:
+            if level in ("warning", "error") or args.verbose:
+                print(f"    {wa} {level}: {text}")
+    if not has_results(result["results"]):
+        print(f"[无结果] {args.input}")
+        return 1
+
+    target = Path(args.output or f"{Path(args.input).stem}_重排结果.xlsx")
+    report = build_report(result["results"], result["details"], result["workarea_data"], result["messages"],
+                          result["remaining"], extra_sheets={"变更清单": result["changes"]})
+    export_report(report, "xlsx", target)
+    for row in result["changes"].itertuples(index=False):
+        print(f"{row.工作地} {row.对象类型} {row.名称} {row.变更}：{row.原安排 or '-'} -> {row.新安排 or '-'}")
+    print(f"[完成] {args.input} -> {target}，变更{len(result['changes'])}项")
+    return 0
+
+
+def cmd_roster(args):
+    files = collect_workbooks(args.inputs, args.pattern)
+    if not files:
+        print("未找到每日Excel文件", file=sys.stderr)
+        return 1
+    os.makedirs(args.output, exist_ok=True)
+
+    failed = 0
+    with HistoryStore(args.history) as store:
+        try:
+            days = plan_days(read_days(files, base=args.base), store, seed=args.seed, mode=args.mode,
+                             time_budget=args.time_budget)
+            for day, result in days:
+                for wa, msgs in result["messages"].items():
+                    for level, text in msgs:
+                        if level in ("warning", "error") or args.verbose:
+                            print(f"    {wa} {level}: {text}")
+                if not has_results(result["results"]):
+                    failed += 1
+                    print(f"[无结果] {day}")
+                    continue
+                target = Path(args.output) / report_filename(f"{day}_配工结果", args.format)
+                report = build_report(result["results"], result["details"], result["workarea_data"],
+                                      result["messages"], result["remaining"])
+                export_report(report, args.format, target)
+                print(f"[完成] {day} -> {target}")
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 1
+
+        summary = Path(args.output) / "负荷汇总.xlsx"
+        write_sheets({"负荷汇总": fairness_report(store)}, summary)
+        print(f"共{len(files)}天，成功{len(files) - failed}天，负荷汇总：{summary}（历史：{args.history}）")
+    return 1 if failed else 0
+
+
+def cmd_validate(args):
+    files = collect_workbooks(args.inputs, args.pattern)
+    if not files:
+        print("未找到待检查的Excel文件", file=sys.stderr)
+        return 1
+    failed = 0
+    for path in files:
+        report = validate_workbook(path)
+        errors = blocking(report)
+        failed += not errors.empty
+        print(f"[{'错误' if not errors.empty else '通过'}] {path}：错误{len(errors)}项，警告{len(report) - len(errors)}项")
+        for _, item in report.iterrows():
+            print(f"    {format_issue(item)}")
+    print(f"共{len(files)}个文件，通过{len(files) - failed}个，有错误{failed}个")
+    return 1 if failed else 0
+
+
+def cmd_evaluate(args):
+    frames, missing = read_workbook(args.input)
+    if missing:
+        print(f"未找到工作表：{'、'.join(missing)}", file=sys.stderr)
+        return 1
+    plan, leaders = read_plan_workbook(args.plan)
+    evaluation = PlanEvaluator.from_base(prepare_base(frames)).evaluate(plan, leaders)
+    print(evaluation["summary"].to_string(index=False))
+    for row in evaluation["issues"].itertuples(index=False):
+        print(f"    {row.工作地} {row.类型} {row.名称}：{row.说明}")
+    print(f"[得分] {evaluation['score']:.3f}（越低越好），问题{len(evaluation['issues'])}项")
+    if args.output:
+        write_sheets({"评估汇总": evaluation["summary"], "组长搭配": evaluation["leaders"],
+                      "理货员一致性": evaluation["clerks"], "问题明细": evaluation["issues"]}, args.output)
+        print(f"[完成] {args.plan} -> {args.output}")
+    return 0
+
+
+def cmd_best(args):
+    frames, missing = read_workbook(args.input)
+    if missing:
+        print(f"未找到工作表：{'、'.join(missing)}", file=sys.stderr)
+        return 1
+    base = prepare_base(frames)
+    ranking, seed = best_of_seeds(base, runs=args.runs, seed=args.seed, mode=args.mode,
+                                  time_budget=args.time_budget, jobs=args.jobs)
+    print(ranking.head(args.top).to_string(index=False))
+    result = run_schedule(frames, seed=seed, mode=args.mode, time_budget=args.time_budget)
+    if not has_results(result["results"]):
+        print(f"[无结果] {args.input}")
+        return 1
+    evaluation = PlanEvaluator.from_base(base).evaluate(combine_results(result["results"]), result["details"])
+    target = Path(args.output or f"{Path(args.input).stem}_择优结果.xlsx")
+    report = build_report(result["results"], result["details"], result["workarea_data"], result["messages"],
+                          result["remaining"], extra_sheets={"评估汇总": evaluation["summary"], "种子对比": ranking})
+    export_report(report, "xlsx", target)
+    print(f"[完成] {args.input} -> {target}，种子{seed}，得分{evaluation['score']:.3f}")
+    return 0
+
+
+def cmd_scenarios(args):
+    frames, missing = read_workbook(args.input)
+    if missing:
+        print(f"未找到工作表：{'、'.join(missing)}", file=sys.stderr)
+        return 1
+    try:
+        scenarios = load_scenarios(Path(args.spec).read_text(encoding="utf-8"))
+        overview, detail = compare_scenarios(prepare_base(frames), scenarios, seed=args.seed or 0, mode=args.mode,
+                                             time_budget=args.time_budget, jobs=args.jobs)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(overview.to_string(index=False))
+    target = Path(args.output or f"{Path(args.input).stem}_方案对比.xlsx")
+    write_sheets({"方案对比": overview, "分工作地明细": detail}, target)
+    print(f"[完成] {len(scenarios)}个方案 -> {target}")
+    return 0
+
+
+def cmd_serve(args):
+    server = make_server(args.host, args.port, workers=args.jobs or os.cpu_count() or 1, queue_size=args.queue,
+                         cache_size=args.cache, verbose=args.verbose)
+    host, port = server.server_address[:2]
+    print(f"配工服务已启动：http://{host}:{port}（POST /schedule，GET /metrics），Ctrl+C 退出")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def size_params(args):
+    """命令行中指定的工作簿规模参数"""
+    params = {key: getattr(args, key) for key in ("ships", "workareas", "staff", "leave_ratio")
+              if getattr(args, key) is not None}
+    if args.cranes_per_ship is not None:
+        params["cranes_per_ship"] = tuple(args.cranes_per_ship)
+    return params
+
+
+def cmd_generate(args):
+    try:
+        frames = generate_frames(seed=args.seed or 0, rules=not args.no_rules, **size_params(args))
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    write_workbook(frames, args.output)
+    print(f"[完成] {args.output}：{len(frames['人员信息表'])}人，{len(frames['船舶与桥吊关联表'])}艘船舶")
+    return 0
+
+
+def cmd_bench(args):
+    custom = size_params(args)
+    if custom:
+        scenarios = {"custom": custom}
+    elif args.scenario == "all":
+        scenarios = bench.SCENARIOS
+    else:
+        scenarios = {args.scenario: bench.SCENARIOS[args.scenario]}
+
+    baseline = bench.load_baseline(args.baseline)
+    missing = [name for name in scenarios if name not in baseline]
+    if missing and not args.save_baseline:
+        # 基线与机器相关，不随代码提交：缺少时须先在本机显式记录，避免CI在无基线时误报通过
+        print(f"基线文件 {args.baseline} 中没有 {'、'.join(missing)} 的记录，请先加 --save-baseline 记录基线",
+              file=sys.stderr)
+        return 1
+    results, slower = {}, []
+    for name, params in scenarios.items():
+        result = bench.benchmark(params, repeat=args.repeat, seed=args.seed or 0)
+        results[name] = result
+        size = "，".join(f"{k}{v}" for k, v in result["size"].items())
+        print(f"== {name}（{size}）")
+        print(f"{'阶段':<8}{'本次(ms)':>10}{'基线(ms)':>10}{'倍数':>8}")
+        for stage, seconds, base, ratio, is_slower in bench.compare(result, baseline.get(name), args.threshold):
+            base_text = f"{base * 1000:.1f}" if base is not None else "-"
+            ratio_text = f"{ratio:.2f}" if ratio is not None else "-"
+            print(f"{stage:<8}{seconds * 1000:>10.1f}{base_text:>10}{ratio_text:>8}{'  变慢' if is_slower else ''}")
+            if is_slower:
+                slower.append(f"{name}/{stage}")
+
+    if args.save_baseline:
+        bench.save_baseline(args.baseline, results)
+        print(f"基线已保存：{args.baseline}")
+    if slower:
+        print(f"比基线变慢（超过{args.threshold}倍）：{'、'.join(slower)}")
+        return 1
+    return 0
+
+
+def add_size_arguments(p):
+    p.add_argument("--ships", type=int, default=None, help="船舶总数")
+    p.add_argument("--workareas", type=int, default=None, help="工作地数量")
+    p.add_argument("--staff", type=int, default=None, help="总人数（默认：满足配工的最少人数）")
+    p.add_argument("--leave-ratio", type=float, default=None, help="请假/抽调人员占比（默认0.1）")
+    p.add_argument("--cranes-per-ship", type=int, nargs=2, metavar=("最少", "最多"), default=None,
+                   help="每艘船桥吊数范围（默认1 6）")
+    p.add_argument("--seed", type=int, default=None, help="随机种子（默认0）")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="桥吊理货配工命令行工具")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("batch", help="批量配工，每个输入文件生成一个结果Excel")
+    p.add_argument("inputs", nargs="+", help="输入Excel文件或所在目录")
+    p.add_argument("-o", "--output", default="配工结果", help="结果输出目录（默认：配工结果）")
+    p.add_argument("-j", "--jobs", type=int, default=None, help="并行进程数（默认：CPU核数）")
+    p.add_argument("--mode", choices=list(MODES), default="greedy", help="配工模式：greedy 贪心，optimal 优化求解")
+    p.add_argument("--time-budget", type=float, default=5.0, help="优化求解时间预算（秒，默认5）")
+    p.add_argument("--seed", type=int, default=None, help="随机种子，指定后结果可复现")
+    p.add_argument("--pattern", default="*.xlsx", help="目录中匹配的文件名（默认：*.xlsx）")
+    p.add_argument("-v", "--verbose", action="store_true", help="输出全部配工提示")
+    p.add_argument("--trace", action="store_true", help="记录各阶段用时和内存，输出 <文件名>_trace.json")
+    p.add_argument("--format", choices=available_formats(), default="xlsx",
+                   help="导出格式：" + "，".join(f"{fmt} {EXPORT_FORMATS[fmt][0]}" for fmt in available_formats())
+                        + "（默认：xlsx）")
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser("replan", help="增量重排，只调整受人员/船舶/桥吊变化影响的部分")
+    p.add_argument("input", help="更新后的Excel文件")
+    p.add_argument("--plan", required=True, help="上次导出的配工结果Excel")
+    p.add_argument("-o", "--output", default=None, help="结果文件（默认：<输入文件名>_重排结果.xlsx）")
+    p.add_argument("--seed", type=int, default=None, help="随机种子，指定后结果可复现")
+    p.add_argument("-v", "--verbose", action="store_true", help="输出全部配工提示")
+    p.set_defaults(func=cmd_replan)
+
+    p = sub.add_parser("roster", help="多日配工，按历史负荷轮换大船和桥吊")
+    p.add_argument("inputs", nargs="+", help="每日Excel文件或所在目录（按文件名排序，文件名即日期）")
+    p.add_argument("-o", "--output", default="多日配工结果", help="输出目录（默认：多日配工结果）")
+    p.add_argument("--base", default=None, help="人员与规则工作簿，指定后每日Excel只需泊位与船舶两张表")
+    p.add_argument("--history", default="配工历史.sqlite", help="历史负荷库，跨次运行累计（默认：配工历史.sqlite）")
+    p.add_argument("--pattern", default="*.xlsx", help="目录中匹配的文件名（默认：*.xlsx）")
+    p.add_argument("--seed", type=int, default=None, help="随机种子，第i天使用 种子+i")
+    p.add_argument("--mode", choices=list(MODES), default="greedy", help="配工模式：greedy 贪心，optimal 优化求解")
+    p.add_argument("--time-budget", type=float, default=5.0, help="优化求解时间预算（秒，默认5）")
+    p.add_argument("--format", choices=available_formats(), default="xlsx", help="每日结果的导出格式（默认：xlsx）")
+    p.add_argument("-v", "--verbose", action="store_true", help="输出全部配工提示")
+    p.set_defaults(func=cmd_roster)
+
+    p = sub.add_parser("validate", help="预检Excel格式，逐项列出缺少的工作表/列及取值问题")
+    p.add_argument("inputs", nargs="+", help="Excel文件或所在目录")
+    p.add_argument("--pattern", default="*.xlsx", help="目录中匹配的文件名（默认：*.xlsx）")
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("evaluate", help="方案评估：按输入数据检查配工结果的覆盖、均衡、规则和一致性")
+    p.add_argument("input", help="配工所用的Excel文件")
+    p.add_argument("--plan", required=True, help="要评估的配工结果Excel（本工具导出的结果文件）")
+    p.add_argument("-o", "--output", default=None, help="评估结果Excel（默认不保存，只打印）")
+    p.set_defaults(func=cmd_evaluate)
+
+    p = sub.add_parser("best", help="多种子择优：并行配工多次，按评估得分导出最优方案")
+    p.add_argument("input", help="Excel文件")
+    p.add_argument("-n", "--runs", type=int, default=8, help="配工次数（种子个数，默认8）")
+    p.add_argument("-o", "--output", default=None, help="输出文件（默认：<输入文件名>_择优结果.xlsx）")
+    p.add_argument("-j", "--jobs", type=int, default=None, help="并行进程数（默认：CPU核数）")
+    p.add_argument("--seed", type=int, default=0, help="起始种子，依次使用 seed ~ seed+n-1（默认0）")
+    p.add_argument("--top", type=int, default=5, help="打印得分最低的前几个种子（默认5）")
+    p.add_argument("--mode", choices=list(MODES), default="greedy", help="配工模式：greedy 贪心，optimal 优化求解")
+    p.add_argument("--time-budget", type=float, default=5.0, help="优化求解时间预算（秒，默认5）")
+    p.set_defaults(func=cmd_best)
+
+    p = sub.add_parser("scenarios", help="方案对比：试算多个方案并比较均衡程度和未分配数量")
+    p.add_argument("input", help="基准Excel文件")
+    p.add_argument("--spec", required=True,
+                   help="方案JSON文件（方案对象的列表），可用修改项：" + "、".join(SCENARIO_KEYS))
+    p.add_argument("-o", "--output", default=None, help="对比结果Excel（默认：<输入文件名>_方案对比.xlsx）")
+    p.add_argument("-j", "--jobs", type=int, default=None, help="并行进程数（默认：CPU核数）")
+    p.add_argument("--mode", choices=list(MODES), default="greedy", help="配工模式：greedy 贪心，optimal 优化求解")
+    p.add_argument("--time-budget", type=float, default=5.0, help="优化求解时间预算（秒，默认5）")
+    p.add_argument("--seed", type=int, default=None, help="随机种子（默认0），方案中可用“种子”单独指定")
+    p.set_defaults(func=cmd_scenarios)
+
+    p = sub.add_parser("serve", help="启动本地配工HTTP服务")
+    p.add_argument("--host", default="127.0.0.1", help="监听地址（默认：127.0.0.1）")
+    p.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"监听端口（默认：{DEFAULT_PORT}）")
+    p.add_argument("-j", "--jobs", type=int, default=None, help="配工进程数（默认：CPU核数）")
+    p.add_argument("--queue", type=int, default=8, help="进程都忙时最多排队的任务数，超出返回503（默认8）")
+    p.add_argument("--cache", type=int, default=64, help="缓存的结果个数（默认64）")
+    p.add_argument("-v", "--verbose", action="store_true", help="输出每个请求的访问日志")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("generate", help="按指定规模生成测试用工作簿")
+    p.add_argument("-o", "--output", default="测试工作簿.xlsx", help="输出文件（默认：测试工作簿.xlsx）")
+    add_size_arguments(p)
+    p.add_argument("--no-rules", action="store_true", help="规则表只保留表头（使用默认规则）")
+    p.set_defaults(func=cmd_generate)
+
+    p = sub.add_parser("bench", help="分阶段性能测试，并与基线比较")
+    p.add_argument("--scenario", choices=["all", *bench.SCENARIOS], default="all", help="预置规模（默认：all）")
+    add_size_arguments(p)
+    p.add_argument("--repeat", type=int, default=5, help="重复次数，各阶段取最短用时（默认5）")
+    p.add_argument("--baseline", default=bench.DEFAULT_BASELINE, help=f"基线文件（默认：{bench.DEFAULT_BASELINE}）")
+    p.add_argument("--save-baseline", action="store_true", help="保存本次结果为基线")
+    p.add_argument("--threshold", type=float, default=bench.SLOWDOWN, help=f"变慢判定倍数（默认{bench.SLOWDOWN}）")
+    p.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
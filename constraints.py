@@ -0,0 +1,217 @@
+"""配工规则编译：四期-组长带船限制、理货员桥吊负责规则
+
+每次上传只编译一次，得到以（工作地，人员，船舶大小）为键的约束表，配工循环中
+按键直接查询。规则表中未覆盖的部分沿用默认规则（四期每人4-6个桥吊、自动化每人
+2个桥吊、组长带船数按平均值均衡）。
+
+四期-组长带船限制 列：
+    工作地（可空，默认四期）、理货组长（可空，表示该工作地全部组长）、
+    船舶大小（大船/小船/合计，可空表示合计）、最多带船数
+理货员桥吊负责规则 列：
+    工作地（可空，表示全部工作地）、理货员（可空，表示该工作地全部理货员）、
+    最少桥吊数、最多桥吊数
+"""
+import math
+
+import pandas as pd
+
+from diagnostics import traced
+from loader import excel_rows
+
+# 通配键：规则适用于全部工作地/人员
+ANY = "*"
+
+# 船舶大小键
+SIZE_TOTAL = "合计"
+SHIP_SIZES = ["大船", "小船", SIZE_TOTAL]
+
+# 默认理货员桥吊数（最少，最多）
+DEFAULT_CLERK_LIMITS = {"四期": (4, 6), "自动化": (2, 2)}
+FALLBACK_CLERK_LIMITS = (4, 6)
+
+# 规则表列名（按顺序匹配第一个存在的列）
+LEADER_SHEET = "四期-组长带船限制"
+CLERK_SHEET = "理货员桥吊负责规则"
+COLUMN_ALIASES = {
+    "工作地": ["工作地", "工作地（四期/自动化/闸口）"],
+    "理货组长": ["理货组长", "组长", "组长姓名", "姓名"],
+    "理货员": ["理货员", "理货员姓名", "姓名"],
+    "船舶大小": ["船舶大小", "船型", "大小"],
+    "最多带船数": ["最多带船数", "带船上限", "最多船舶数"],
+    "最少桥吊数": ["最少桥吊数", "最少负责桥吊数", "桥吊下限"],
+    "最多桥吊数": ["最多桥吊数", "最多负责桥吊数", "桥吊上限"],
+}
+
+
+def find_column(df, name):
+    """按别名查找规则表中的列，找不到返回None"""
+    for alias in COLUMN_ALIASES[name]:
+        if alias in df.columns:
+            return alias
+    return None
+
+
+def _text(value, default=ANY):
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return default
+    value = str(value).strip()
+    return value if value else default
+
+
+def _count(value):
+    """读取非负整数，无法识别返回None"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(number) or number < 0 or number != int(number):
+        return None
+    return int(number)
+
+
+class ConstraintTable:
+    """编译后的配工约束表
+
+    leader_rules：（工作地，组长，船舶大小）-> （最多带船数，规则行号）
+    clerk_rules：（工作地，理货员）-> （最少桥吊数，最多桥吊数，规则行号）
+    issues：编译时发现的规则行问题（工作表，行号，问题）
+    """
+
+    def __init__(self):
+        self.leader_rules = {}
+        self.clerk_rules = {}
+        self.issues = []
+
+    def copy(self):
+        """复制约束表（规则字典为浅复制），修改副本的规则不影响原表"""
+        table = ConstraintTable()
+        table.leader_rules = dict(self.leader_rules)
+        table.clerk_rules = dict(self.clerk_rules)
+        table.issues = list(self.issues)
+        return table
+
+    def _clerk_rule(self, workarea, person):
+        """生效的理货员规则：个人（本工作地 > 全部工作地）> 工作地 > 全部工作地，无规则返回None"""
+        personal = ((workarea, person), (ANY, person)) if person != ANY else ()
+        for key in (*personal, (workarea, ANY), (ANY, ANY)):
+            rule = self.clerk_rules.get(key)
+            if rule is not None:
+                return rule
+        return None
+
+    def clerk_limits(self, workarea, person=ANY):
+        """理货员每人负责桥吊数（最少，最多）：个人 > 工作地 > 全部工作地 > 默认"""
+        rule = self._clerk_rule(workarea, person)
+        return (rule[0], rule[1]) if rule else DEFAULT_CLERK_LIMITS.get(workarea, FALLBACK_CLERK_LIMITS)
+
+    def clerk_rule_row(self, workarea, person=ANY):
+        """生效的理货员规则所在行号，默认规则返回None"""
+        rule = self._clerk_rule(workarea, person)
+        return rule[2] if rule else None
+
+    def leader_limit(self, workarea, leader, size=SIZE_TOTAL):
+        """组长最多带船数：个人规则优先，其次工作地规则，无规则返回None"""
+        rule = self.leader_rules.get((workarea, leader, size)) or self.leader_rules.get((workarea, ANY, size))
+        return rule[0] if rule else None
+
+    def leader_caps(self, workarea, leaders):
+        """各组长的带船上限列表：（合计，大船，小船），无规则的项为None"""
+        return [tuple(self.leader_limit(workarea, leader, size) for size in (SIZE_TOTAL, "大船", "小船"))
+                for leader in leaders]
+
+    def leader_rule_row(self, workarea, leader, size=SIZE_TOTAL):
+        rule = self.leader_rules.get((workarea, leader, size)) or self.leader_rules.get((workarea, ANY, size))
+        return rule[1] if rule else None
+
+    def check_assignment(self, workarea, leader_allocations, staff_crane_map):
+        """逐条核对配工结果是否违反规则，返回违规明细列表
+
+        leader_allocations 为组长 -> model.Allocation，staff_crane_map 为理货员 -> 桥吊列表（编号或名称）。
+        """
+        violations = []
+        for leader, alloc in leader_allocations.items():
+            actual = {SIZE_TOTAL: len(alloc.ships), "大船": alloc.large_count, "小船": alloc.small_count}
+            for size, count in actual.items():
+                limit = self.leader_limit(workarea, leader, size)
+                if limit is not None and count > limit:
+                    violations.append({
+                        "规则表": LEADER_SHEET,
+                        "行号": self.leader_rule_row(workarea, leader, size),
+                        "对象": leader,
+                        "规则": f"{size}最多{limit}艘",
+                        "实际": f"{count}艘",
+                    })
+        for staff, cranes in staff_crane_map.items():
+            min_per, max_per = self.clerk_limits(workarea, staff)
+            if not min_per <= len(cranes) <= max_per:
+                violations.append({
+                    "规则表": CLERK_SHEET,
+                    "行号": self.clerk_rule_row(workarea, staff),
+                    "对象": staff,
+                    "规则": f"每人{min_per}-{max_per}个桥吊",
+                    "实际": f"{len(cranes)}个",
+                })
+        return violations
+
+
+@traced("规则编译", lambda table, df_leader, df_clerk, *args, **kwargs: {
+    "规则行": len(df_leader) + len(df_clerk), "问题": len(table.issues)})
+def compile_constraints(df_leader_ship_limit, df_staff_crane_limit, known_people=None):
+    """编译两张规则工作表为约束表
+
+    known_people 为人员信息表中的姓名集合，提供时会提示规则中不存在的人员。
+    """
+    table = ConstraintTable()
+    known_people = set(known_people) if known_people is not None else None
+
+    # 组长带船限制
+    df = df_leader_ship_limit
+    limit_col = find_column(df, "最多带船数")
+    if limit_col is None:
+        if not df.empty:
+            table.issues.append((LEADER_SHEET, None, "未识别到“最多带船数”列，组长带船数按平均值均衡"))
+    else:
+        wa_col, leader_col, size_col = find_column(df, "工作地"), find_column(df, "理货组长"), find_column(df, "船舶大小")
+        for row, r in zip(excel_rows(df), df.to_dict("records")):
+            workarea = _text(r[wa_col], "四期") if wa_col else "四期"
+            leader = _text(r[leader_col]) if leader_col else ANY
+            size = _text(r[size_col], SIZE_TOTAL) if size_col else SIZE_TOTAL
+            if size == ANY or size == "全部":
+                size = SIZE_TOTAL
+            limit = _count(r[limit_col])
+            if size not in SHIP_SIZES:
+                table.issues.append((LEADER_SHEET, row, f"船舶大小“{size}”无法识别，应为大船/小船/合计"))
+                continue
+            if limit is None:
+                table.issues.append((LEADER_SHEET, row, f"最多带船数“{r[limit_col]}”不是非负整数"))
+                continue
+            if known_people is not None and leader != ANY and leader not in known_people:
+                table.issues.append((LEADER_SHEET, row, f"组长“{leader}”不在人员信息表中"))
+            key = (workarea, leader, size)
+            if key in table.leader_rules:
+                table.issues.append((LEADER_SHEET, row, f"与第{table.leader_rules[key][1]}行规则重复，以本行为准"))
+            table.leader_rules[key] = (limit, row)
+
+    # 理货员桥吊负责规则
+    df = df_staff_crane_limit
+    min_col, max_col = find_column(df, "最少桥吊数"), find_column(df, "最多桥吊数")
+    if min_col is None or max_col is None:
+        if not df.empty:
+            table.issues.append((CLERK_SHEET, None, "未识别到“最少桥吊数/最多桥吊数”列，使用默认规则"))
+    else:
+        wa_col, staff_col = find_column(df, "工作地"), find_column(df, "理货员")
+        for row, r in zip(excel_rows(df), df.to_dict("records")):
+            workarea = _text(r[wa_col]) if wa_col else ANY
+            person = _text(r[staff_col]) if staff_col else ANY
+            min_per, max_per = _count(r[min_col]), _count(r[max_col])
+            if min_per is None or max_per is None or min_per == 0 or min_per > max_per:
+                table.issues.append((CLERK_SHEET, row, f"桥吊数范围“{r[min_col]}-{r[max_col]}”无效，应为 1 ≤ 最少 ≤ 最多"))
+                continue
+            if known_people is not None and person != ANY and person not in known_people:
+                table.issues.append((CLERK_SHEET, row, f"理货员“{person}”不在人员信息表中"))
+            key = (workarea, person)
+            if key in table.clerk_rules:
+                table.issues.append((CLERK_SHEET, row, f"与第{table.clerk_rules[key][2]}行规则重复，以本行为准"))
+            table.clerk_rules[key] = (min_per, max_per, row)
+
+    return table
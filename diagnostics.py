@@ -0,0 +1,249 @@
+"""配工诊断：按需记录各阶段用时、内存峰值和数据规模，可导出JSON或Chrome trace
+
+默认不记录，各阶段的 stage()/traced 为空操作；需要时：
+    with Recorder(memory=True, profile=True) as recorder:
+        run_schedule(frames)
+    recorder.records()            # 阶段明细
+    recorder.chrome_trace()       # 可在 chrome://tracing 或 Perfetto 中打开
+    recorder.profiler.collapsed() # 采样调用栈（折叠格式，可生成火焰图）
+
+记录器通过 contextvars 传递，线程池中的工作地配工同样会被记录（见 engine.assign_workareas）；
+进程池中的阶段不会回传。内存峰值由 tracemalloc 统计，开启后配工会明显变慢，且并行时
+各线程的分配会计入同一峰值。
+"""
+import contextvars
+import functools
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import nullcontext
+
+_recorder = contextvars.ContextVar("recorder", default=None)
+_current = contextvars.ContextVar("current_span", default=None)
+
+# 记录的阶段明细列
+RECORD_COLUMNS = ["阶段", "层级", "开始(ms)", "用时(ms)", "内存峰值(KB)", "线程"]
+
+
+class _Span:
+    """一个阶段的记录，退出时写入所属 Recorder"""
+
+    def __init__(self, recorder, name, counts):
+        self.recorder = recorder
+        self.name = name
+        self.counts = counts
+        self.peak = 0
+
+    def __enter__(self):
+        rec = self.recorder
+        self.parent = _current.get()
+        self.depth = self.parent.depth + 1 if self.parent else 0
+        self.thread = threading.get_ident()
+        rec.threads.add(self.thread)
+        if rec.memory:
+            # 嵌套阶段会重置峰值，先把已有峰值记到上一层
+            current, peak = tracemalloc.get_traced_memory()
+            if self.parent:
+                self.parent.peak = max(self.parent.peak, peak - self.parent.base)
+            self.base = current
+            tracemalloc.reset_peak()
+        self.token = _current.set(self)
+        self.start = time.perf_counter()
+        return self.counts
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        _current.reset(self.token)
+        rec = self.recorder
+        record = {
+            "阶段": self.name,
+            "层级": self.depth,
+            "开始(ms)": round((self.start - rec.origin) * 1000, 3),
+            "用时(ms)": round((end - self.start) * 1000, 3),
+            "内存峰值(KB)": None,
+            "线程": self.thread,
+        }
+        if rec.memory:
+            peak = max(self.peak, tracemalloc.get_traced_memory()[1] - self.base)
+            record["内存峰值(KB)"] = round(peak / 1024, 1)
+            if self.parent:
+                self.parent.peak = max(self.parent.peak, peak + self.base - self.parent.base)
+        record.update(self.counts)
+        rec.spans.append(record)
+        return False
+
+
+class SamplingProfiler:
+    """采样分析器：后台线程定时采集指定线程的调用栈，按折叠格式汇总
+
+    只采集 threads 中的线程（Recorder 会把记录过阶段的线程加入），interval 为采样间隔（秒）。
+    """
+
+    def __init__(self, threads, interval=0.005):
+        self.threads = threads
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for ident in list(self.threads):
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if stack:
+                    self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self):
+        """折叠格式的调用栈（每行“栈;栈 次数”），可用 flamegraph.pl 或 speedscope 打开"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+    def top(self, limit=20):
+        """按采样次数排列的热点函数（栈顶），返回（函数，次数，占比）列表"""
+        total = sum(self.samples.values()) or 1
+        leaf = Counter()
+        for stack, count in self.samples.items():
+            leaf[stack.rsplit(";", 1)[-1]] += count
+        return [(func, count, count / total) for func, count in leaf.most_common(limit)]
+
+
+class Recorder:
+    """诊断记录器，在 with 块内或 start()/stop() 之间生效
+
+    memory 为 True 时用 tracemalloc 统计各阶段内存峰值；profile 为 True 时同时运行采样分析器，
+    也可传入 profiler 工厂函数（参数为线程集合，返回带 start/stop 方法的对象）接入其他分析器。
+    """
+
+    def __init__(self, memory=False, profile=False, interval=0.005, profiler=None):
+        self.memory = memory
+        self.spans = []
+        self.threads = set()
+        self.profiler = None
+        if profiler is not None:
+            self.profiler = profiler(self.threads)
+        elif profile:
+            self.profiler = SamplingProfiler(self.threads, interval)
+        self._token = None
+        self._started_tracing = False
+
+    def start(self):
+        self.origin = time.perf_counter()
+        self.wall_start = time.time()
+        self.threads.add(threading.get_ident())
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.profiler is not None:
+            self.profiler.start()
+        self._token = _recorder.set(self)
+        return self
+
+    def stop(self):
+        if self._token is not None:
+            _recorder.reset(self._token)
+            self._token = None
+        if self.profiler is not None:
+            self.profiler.stop()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self.elapsed = time.perf_counter() - self.origin
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def records(self):
+        """阶段明细（按开始时间排序），计数列合并在后"""
+        return sorted(self.spans, key=lambda r: r["开始(ms)"])
+
+    def to_json(self):
+        """导出JSON：运行环境、各阶段明细及采样热点"""
+        data = {
+            "环境": {"python": platform.python_version(), "平台": platform.platform(),
+                    "时间": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.wall_start))},
+            "阶段": self.records(),
+        }
+        if isinstance(self.profiler, SamplingProfiler):
+            data["采样热点"] = [{"函数": func, "次数": count, "占比": round(share, 4)}
+                            for func, count, share in self.profiler.top()]
+        return json.dumps(data, ensure_ascii=False, indent=2, default=str)
+
+    def chrome_trace(self):
+        """导出 Chrome trace（Trace Event Format），每个阶段为一个完整事件"""
+        pid = os.getpid()
+        events = [{
+            "name": r["阶段"],
+            "ph": "X",
+            "ts": r["开始(ms)"] * 1000,
+            "dur": r["用时(ms)"] * 1000,
+            "pid": pid,
+            "tid": r["线程"],
+            "args": {k: v for k, v in r.items() if k not in ("阶段", "开始(ms)", "用时(ms)", "线程")},
+        } for r in self.records()]
+        return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, ensure_ascii=False, default=str)
+
+
+def current_recorder():
+    """当前生效的记录器，未开启诊断时为None"""
+    return _recorder.get()
+
+
+def stage(name, **counts):
+    """记录一个阶段；未开启诊断时为空操作
+
+    with stage("组长分配", 工作地=wa, 船舶=len(ships)) as counts:
+        ...
+        counts["未分配"] = len(unassigned)   # 可在阶段内补充计数
+    """
+    recorder = _recorder.get()
+    if recorder is None:
+        return nullcontext(counts)
+    return _Span(recorder, name, counts)
+
+
+def traced(name, counts=None):
+    """装饰器：把整个函数记录为一个阶段
+
+    counts 为可选函数 counts(result, *args, **kwargs) -> 计数字典，仅在开启诊断时调用。
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder.get()
+            if recorder is None:
+                return func(*args, **kwargs)
+            with _Span(recorder, name, {}) as span_counts:
+                result = func(*args, **kwargs)
+                if counts is not None:
+                    span_counts.update(counts(result, *args, **kwargs))
+            return result
+        return wrapper
+    return decorator
+
+
+def submit(pool, func, *args):
+    """向线程池提交任务，并把当前记录器带入工作线程"""
+    return pool.submit(contextvars.copy_context().run, func, *args)
@@ -0,0 +1,895 @@
+"""桥吊理货配工核心逻辑，不依赖Streamlit，可供页面、命令行及其他脚本调用"""
+import heapq
+import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+from constraints import ConstraintTable, compile_constraints
+from diagnostics import stage, submit, traced
+from loader import excel_rows, read_workbook
+from model import Allocation, WorkareaModel, iter_bits
+from solver import solve_workarea
+
+# 已知工作地的展示顺序；实际参与配工的工作地由泊位与桥吊关联表的工作地列得出
+WORKAREAS = ["四期", "自动化"]
+
+# 人员状态列
+STATUS_COLUMNS = [
+    ("请假人员", "是否请假（是/否）"),
+    ("公司抽调", "公司抽调（是/否）"),
+    ("负责闸口", "负责闸口（是/否）"),
+    ("驾驶员", "驾驶员（是/否）"),
+    ("设备员", "设备员（是/否）"),
+    ("申请加班", "申请加班（是/否）"),
+]
+
+# 不可参与配工的状态列（任一为"是"即不可用）
+UNAVAILABLE_COLUMNS = ["是否请假（是/否）", "公司抽调（是/否）", "负责闸口（是/否）"]
+
+YES_NO = {"是": True, "否": False}
+
+# 参与配工的岗位
+ROLES = ["理货组长", "理货员"]
+
+# 桥吊数超过该值为大船
+LARGE_SHIP_CRANES = 3
+
+# 合法桥吊号：大写字母、数字，可含 - _ # 分隔
+CRANE_ID_PATTERN = r"[A-Z0-9][A-Z0-9_\-#]*"
+
+# 配工模式
+MODES = {"greedy": "贪心分配（快速）", "optimal": "优化求解（均衡优先，超时回退贪心）"}
+
+# 结果工作表名称
+RESULT_SHEETS = {"四期": "四期配工结果", "自动化": "自动化配工结果"}
+
+# 导出Excel的表头样式，列宽按表头和前 WIDTH_SAMPLE 行估算
+HEADER_FONT = Font(bold=True)
+HEADER_FILL = PatternFill("solid", fgColor="DDEBF7")
+WIDTH_SAMPLE = 200
+MAX_COLUMN_WIDTH = 60
+
+# 理货员桥吊连续切分的代价：段内每跨一次组长/船舶/泊位分界的代价，以及桥吊数偏离均分值的平方的权重
+CONTIGUITY_WEIGHTS = {"组长": 100.0, "船舶": 10.0, "泊位": 2.0, "偏差": 3.0}
+
+# 桥吊拆分策略：策略名 -> {"split": 拆分函数, "use_all_staff": 是否全员上岗}，由 register_policy 登记
+CRANE_POLICIES = {}
+
+# 工作地使用的桥吊拆分策略，未登记的工作地使用默认策略
+WORKAREA_POLICIES = {"四期": "all_staff", "自动化": "quota"}
+DEFAULT_POLICY = "quota"
+
+
+# 工具函数
+def clean_crane_name(name):
+    """清洗桥吊号，保证每个编号独立"""
+    name = str(name).strip()
+    if not name:
+        return []
+    name = name.replace("，", ",").upper().strip()
+    return [c.strip() for c in name.split(",") if c.strip()]
+
+
+def assign_cranes_fixed(total_cranes, staff_list, min_per=4, max_per=6, messages=None, limits=None):
+    """分配桥吊给理货员（保证每人必分配一次）
+
+    limits 为与 staff_list 对应的每人（最少，最多）桥吊数，提供时替代 min_per/max_per。
+    """
+    n = len(staff_list)
+    limits = limits or [(min_per, max_per)] * n
+    low = sum(lo for lo, _ in limits)
+    high = sum(hi for _, hi in limits)
+    if total_cranes < low or total_cranes > high:
+        if messages is not None:
+            if len(set(limits)) > 1:
+                messages.append(("error", f"桥吊数 {total_cranes} 无法满足理货员桥吊负责规则（{n}人合计{low}-{high}个）"))
+            else:
+                lo, hi = limits[0] if limits else (min_per, max_per)
+                messages.append(("error", f"桥吊数 {total_cranes} 无法满足每人 {lo}-{hi} 的分配"))
+        return None
+
+    # 每人初始分配最小值
+    counts = [lo for lo, _ in limits]
+    remaining = total_cranes - sum(counts)
+
+    # 循环分配剩余桥吊，确保不超过每人上限
+    i = 0
+    while remaining > 0:
+        if counts[i] < limits[i][1]:
+            counts[i] += 1
+            remaining -= 1
+        i = (i + 1) % n
+
+    return dict(zip(staff_list, counts))
+
+
+def categorize_ship_size(ship_cranes):
+    """根据桥吊数量判断船舶大小：3个以上桥吊为大船，1-3个为小船"""
+    crane_count = len(ship_cranes)
+    if crane_count > LARGE_SHIP_CRANES:
+        return "大船", crane_count
+    else:
+        return "小船", crane_count
+
+
+# 数据准备
+@traced("人员筛选", lambda result, df_staff: {"人员": len(df_staff)})
+def summarize_staff(df_staff):
+    """一次性预处理人员信息表，统计各状态人员名单及各工作地、各岗位的可用人员
+
+    是/否列只转换一次为可空布尔值（其他取值视为缺失），状态名单与可用人员各用
+    一次分组得到。返回 {"status": 状态 -> 姓名列表,
+    "available": 岗位 -> {工作地 -> 姓名列表}}；可用人员要求请假、抽调、闸口三列
+    均明确填写"否"。
+    """
+    flag_cols = [col for _, col in STATUS_COLUMNS]
+    flags = df_staff[flag_cols].apply(lambda col: col.map(YES_NO)).astype("boolean")
+    names = df_staff["姓名"].to_numpy()
+
+    # 状态名单：取所有为"是"的（行，列）位置，按列一次分组
+    rows, cols = np.nonzero(flags.fillna(False).to_numpy(dtype=bool))
+    grouped = pd.Series(names[rows]).groupby(cols, sort=False).agg(list)
+    status = {label: grouped.get(i, []) for i, (label, _) in enumerate(STATUS_COLUMNS)}
+
+    # 可用人员：按（工作地，岗位）一次分组
+    available_mask = (~flags[UNAVAILABLE_COLUMNS]).fillna(False).all(axis=1)
+    grouped = (
+        df_staff.loc[available_mask.to_numpy()]
+        .groupby(["岗位类型", "工作地（四期/自动化/闸口）"], sort=False)["姓名"]
+        .agg(list)
+    )
+    available = {role: {} for role in ROLES}
+    for (role, wa), people in grouped.items():
+        available.setdefault(role, {})[wa] = people
+
+    return {"status": status, "available": available}
+
+
+def explode_cranes(column):
+    """向量化清洗桥吊号列，规则与 clean_crane_name 一致（空单元格视为无桥吊）
+
+    返回长表：行号（原表中的位置序号）、顺序（该行内从左到右的序号）、桥吊号。
+    """
+    column = column.reset_index(drop=True)
+    pieces = (
+        column.where(column.notna(), "").astype(str)
+        .str.replace("，", ",", regex=False).str.upper().str.split(",")
+        .explode().str.strip()
+    )
+    pieces = pieces[pieces.notna() & (pieces != "")]
+    long = pd.DataFrame({"行号": pieces.index.to_numpy(dtype=int), "桥吊号": pieces.to_numpy(dtype=object)})
+    long["顺序"] = long.groupby("行号").cumcount()
+    return long
+
+
+@traced("桥吊解析", lambda result, *args: {"船舶": len(result["ships"]), "桥吊": len(result["berth_cranes"]),
+                                        "问题": len(result["issues"])})
+def parse_crane_tables(df_berth_crane, df_ship_crane):
+    """解析泊位与桥吊关联表、船舶与桥吊关联表，结果均为列式DataFrame
+
+    返回字典：
+    - berth_cranes：工作地、桥吊号、顺序（泊位表中从左到右）、行号
+    - crane_workarea：桥吊号 -> 工作地（同一桥吊出现多次时以最后一次为准）
+    - ship_cranes：行号、船舶名称、桥吊号、顺序、工作地（桥吊所属工作地，未登记为空）
+    - ships：行号、船舶名称、工作地（第一个已登记桥吊的工作地）、大小、桥吊数量
+    - issues：格式不正确或未在泊位表登记的桥吊号，以及无法确定工作地的船舶
+    """
+    berth_cranes = explode_cranes(df_berth_crane["桥吊号（按从左到右顺序，逗号分隔）"])
+    berth_workareas = df_berth_crane["工作地"].astype(str).str.strip().to_numpy(dtype=object)
+    berth_cranes["工作地"] = berth_workareas[berth_cranes["行号"].to_numpy()]
+    crane_workarea = berth_cranes.drop_duplicates("桥吊号", keep="last").set_index("桥吊号")["工作地"]
+
+    ship_names = df_ship_crane["船舶名称"].astype(str).str.strip().to_numpy(dtype=object)
+    ship_cranes = explode_cranes(df_ship_crane["对应桥吊号（逗号分隔，需属于工作表1中的桥吊）"])
+    ship_cranes["船舶名称"] = ship_names[ship_cranes["行号"].to_numpy()]
+    ship_cranes["工作地"] = ship_cranes["桥吊号"].map(crane_workarea)
+
+    # 船舶大小及工作地（取第一个已登记桥吊所属工作地）
+    ships = pd.DataFrame({"行号": np.arange(len(ship_names)), "船舶名称": ship_names})
+    ships["桥吊数量"] = ship_cranes.groupby("行号").size().reindex(ships["行号"], fill_value=0).to_numpy()
+    ships["大小"] = np.where(ships["桥吊数量"] > LARGE_SHIP_CRANES, "大船", "小船")
+    first_workarea = ship_cranes.dropna(subset=["工作地"]).groupby("行号")["工作地"].first()
+    ships["工作地"] = ships["行号"].map(first_workarea)
+
+    # 数据问题：格式不正确的桥吊号、船舶表中未登记的桥吊号、无法确定工作地的船舶
+    berth_rows, ship_rows = excel_rows(df_berth_crane), excel_rows(df_ship_crane)
+    issues = []
+    for sheet, long, name_col, rows in (("泊位与桥吊关联表", berth_cranes, "工作地", berth_rows),
+                                        ("船舶与桥吊关联表", ship_cranes, "船舶名称", ship_rows)):
+        bad = long[~long["桥吊号"].str.fullmatch(CRANE_ID_PATTERN)]
+        issues.append(pd.DataFrame({"工作表": sheet, "行号": rows[bad["行号"]], "名称": bad[name_col],
+                                    "桥吊号": bad["桥吊号"], "问题": "桥吊号格式不正确"}))
+    unknown = ship_cranes[ship_cranes["工作地"].isna()]
+    issues.append(pd.DataFrame({"工作表": "船舶与桥吊关联表", "行号": ship_rows[unknown["行号"]], "名称": unknown["船舶名称"],
+                                "桥吊号": unknown["桥吊号"], "问题": "桥吊号未在泊位与桥吊关联表中登记"}))
+    unmatched = ships[ships["工作地"].isna()]
+    issues.append(pd.DataFrame({"工作表": "船舶与桥吊关联表", "行号": ship_rows[unmatched["行号"]], "名称": unmatched["船舶名称"],
+                                "桥吊号": "", "问题": "船舶无已登记桥吊，无法确定工作地，不参与配工"}))
+    issues = pd.concat(issues, ignore_index=True)
+
+    return {
+        "berth_cranes": berth_cranes,
+        "crane_workarea": crane_workarea,
+        "ship_cranes": ship_cranes,
+        "ships": ships,
+        "issues": issues,
+    }
+
+
+def discover_workareas(parsed):
+    """由泊位与桥吊关联表的工作地列得出参与配工的工作地
+
+    已知工作地按 WORKAREAS 顺序排在前面，其余按首次出现的顺序排列。
+    """
+    found = parsed["berth_cranes"]["工作地"]
+    found = [wa for wa in found.drop_duplicates() if wa and wa.lower() not in ("nan", "none")]
+    return [wa for wa in WORKAREAS if wa in found] + [wa for wa in found if wa not in WORKAREAS]
+
+
+def crane_positions(berth_cranes):
+    """桥吊号 -> 泊位（泊位表中的位置序号）、位置（岸线上的全局序号，泊位表自上而下、每行从左到右）
+
+    同一桥吊出现多次时以最后一次为准（同 crane_workarea）。
+    """
+    cranes = berth_cranes.drop_duplicates("桥吊号", keep="last")
+    return pd.DataFrame({"泊位": cranes["行号"].to_numpy(), "位置": np.arange(len(cranes))},
+                        index=pd.Index(cranes["桥吊号"].to_numpy(), name="桥吊号"))
+
+
+@traced("工作地分组", lambda result, *args, **kwargs: {"工作地数": len(result)})
+def build_workarea_data(parsed, workareas=None):
+    """由 parse_crane_tables 的解析结果按工作地分组船舶和桥吊
+
+    workareas 为空时由 discover_workareas 得出，结果字典的顺序即配工顺序。
+    每个工作地的 model 为整数编号的 WorkareaModel（配工在其上进行），其余各项为按名称的视图，
+    桥吊号、船舶名称与 model 共用同一份字符串。桥吊编号按岸线位置排列（见 crane_positions）。
+    """
+    ships = parsed["ships"]
+    ship_cranes = parsed["ship_cranes"]
+    positions = crane_positions(parsed["berth_cranes"])
+
+    workarea_data = {}
+    for wa in workareas if workareas is not None else discover_workareas(parsed):
+        wa_ships = ships[ships["工作地"] == wa]
+        wa_cranes = ship_cranes[ship_cranes["行号"].isin(wa_ships["行号"])]
+        # 长表已按（行号，顺序）排列，即为CSR格式；桥吊先按首次出现编号，再按岸线位置重新编号
+        codes, cranes = pd.factorize(wa_cranes["桥吊号"])
+        berth = positions["泊位"].reindex(cranes).fillna(-1).to_numpy(dtype=np.int64)
+        slot = positions["位置"].reindex(cranes).fillna(len(positions)).to_numpy(dtype=np.int64)
+        order = np.lexsort((np.arange(len(cranes)), slot))
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        counts = wa_ships["桥吊数量"].to_numpy()
+        model = WorkareaModel(cranes[order], wa_ships["船舶名称"], wa_ships["大小"].to_numpy() == "大船",
+                              np.concatenate([[0], np.cumsum(counts)]), rank[codes], crane_berth=berth[order])
+
+        ship_list, crane_to_ship = [], {}
+        for i, (name, size, count) in enumerate(zip(model.ship_names, wa_ships["大小"], counts.tolist())):
+            crane_list = model.crane_names(model.crane_ids_of(i))
+            for c in crane_list:
+                crane_to_ship.setdefault(c, []).append(name)
+            ship_list.append({
+                "船舶名称": name,
+                "桥吊列表": crane_list,
+                "工作地": wa,
+                "大小": size,
+                "桥吊数量": count
+            })
+        workarea_data[wa] = {
+            "model": model,
+            "ships": ship_list,
+            "all_cranes": model.cranes,
+            "crane_to_ship": crane_to_ship,  # 桥吊到船舶的映射
+            "large_ships": [name for name, large in zip(model.ship_names, model.ship_large) if large],  # 大船列表
+            "small_ships": [name for name, large in zip(model.ship_names, model.ship_large) if not large]  # 小船列表
+        }
+
+    return workarea_data
+
+
+def allocate_ships_to_leaders(leaders, model, ships, rng, caps=None, leader_allocations=None, loads=None):
+    """按船舶数量均衡、兼顾大小搭配地把船舶分配给组长
+
+    ships 为待分配船舶在 model 中的编号。组长放在以（船舶数，大船数，随机序号）
+    为键的小顶堆中，每分配一艘船只需弹出/压入一次，随机序号由 rng 决定，
+    相同种子的分配结果可复现。caps 为各组长规则上限（合计，大船，小船），
+    None 表示不限。leader_allocations 为已有分配（增量重排时保留的部分），
+    新船舶在其基础上继续均衡分配。loads 为与 leaders 对应的历史负荷（可比较的元组），
+    提供时排在随机序号之前，当日船舶数相同的组长中历史负荷低者优先分到大船和多出的船。
+    返回（组长 -> Allocation，未能分配的船舶编号列表）。
+    """
+    num_leaders = len(leaders)
+    leader_allocations = leader_allocations or {}
+    for leader in leaders:
+        leader_allocations.setdefault(leader, Allocation())
+    unassigned = []
+    if not num_leaders:
+        return leader_allocations, list(ships)
+
+    # 随机打乱船舶顺序及组长同分时的先后，增加分配均衡性
+    ships = list(ships)
+    rng.shuffle(ships)
+    tie_break = list(range(num_leaders))
+    rng.shuffle(tie_break)
+    if loads is not None:
+        tie_break = list(zip(loads, tie_break))
+
+    large_ships = [i for i in ships if model.ship_large[i]]
+    small_ships = [i for i in ships if not model.ship_large[i]]
+
+    # 每人大船上限、总船舶上限（均衡上限与规则上限取较小值，含已有分配）
+    total_ships = len(ships) + sum(len(leader_allocations[leader].ships) for leader in leaders)
+    total_large = len(large_ships) + sum(leader_allocations[leader].large_count for leader in leaders)
+    min_large = total_large // num_leaders
+    min_ships = total_ships // num_leaders
+    max_ships = min_ships + 1 if total_ships % num_leaders != 0 else min_ships
+    caps = caps or [(None, None, None)] * num_leaders
+    total_cap = [max_ships if c[0] is None else min(max_ships, c[0]) for c in caps]
+    large_cap = [min_large + 1 if c[1] is None else min(min_large + 1, c[1]) for c in caps]
+    small_cap = [total_ships if c[2] is None else c[2] for c in caps]
+
+    def full_for_large(i):
+        alloc = leader_allocations[leaders[i]]
+        return alloc.large_count >= large_cap[i] or len(alloc.ships) >= total_cap[i]
+
+    def full_for_small(i):
+        alloc = leader_allocations[leaders[i]]
+        return alloc.small_count >= small_cap[i] or len(alloc.ships) >= total_cap[i]
+
+    heap = [(len(alloc.ships), alloc.large_count, tie_break[i], i)
+            for i, alloc in enumerate(leader_allocations[leader] for leader in leaders)]
+    heapq.heapify(heap)
+
+    # 先分配大船：达到上限的组长不再参与本轮（计数只增不减），直接出堆
+    for ship in large_ships:
+        while heap and full_for_large(heap[0][3]):
+            heapq.heappop(heap)
+        if not heap:
+            unassigned.append(ship)
+            continue
+        ship_count, large_count, tie, i = heapq.heappop(heap)
+        leader_allocations[leaders[i]].add(model, ship)
+        heapq.heappush(heap, (ship_count + 1, large_count + 1, tie, i))
+
+    # 再分配小船：按当前船舶总数重建堆，已满的组长同样直接出堆
+    heap = [(len(alloc.ships), alloc.large_count, tie_break[i], i)
+            for i, alloc in enumerate(leader_allocations[leader] for leader in leaders)]
+    heapq.heapify(heap)
+    for ship in small_ships:
+        while heap and full_for_small(heap[0][3]):
+            heapq.heappop(heap)
+        if not heap:
+            unassigned.append(ship)
+            continue
+        ship_count, large_count, tie, i = heapq.heappop(heap)
+        leader_allocations[leaders[i]].add(model, ship)
+        heapq.heappush(heap, (ship_count + 1, large_count, tie, i))
+
+    return leader_allocations, unassigned
+
+
+def cluster_allocations(model, leader_allocations, rng=None):
+    """不改变各组长的大船数、小船数，按岸线顺序重排船舶归属，使同一组长的船舶尽量相邻
+
+    船舶按首个桥吊的位置排列，先依次交给当前组长，当前组长该类（大/小船）名额用完时，
+    换成该类剩余名额最多的组长；同数时优先该船原来的组长，再取剩余总名额多者，最后按 rng
+    打乱的组长顺序（rng 为空时按组长顺序），不同种子的分配因此仍得到不同的分组；再做同类船舶
+    交换：与相邻船舶组长不同的船舶，尝试与相邻组长名下的同类船舶互换，相邻船舶组长不同
+    的对数减少时接受。组长的船舶相邻，理货员的连续桥吊段才能少跨组长（见 partition_cranes）。
+    返回新的 组长 -> Allocation，顺序不变。
+    """
+    leaders = list(leader_allocations)
+    quota = {leader: [alloc.small_count, alloc.large_count] for leader, alloc in leader_allocations.items()}
+    original = {i: leader for leader, alloc in leader_allocations.items() for i in alloc.ships}
+    rank = list(range(len(leaders)))
+    if rng is not None:
+        rng.shuffle(rank)
+    rank = dict(zip(leaders, rank))
+    first_crane = {i: int(model.crane_ids_of(i).min()) if model.ship_ptr[i + 1] > model.ship_ptr[i] else model.num_cranes
+                   for alloc in leader_allocations.values() for i in alloc.ships}
+    ships = sorted(first_crane, key=lambda i: (first_crane[i], i))
+    owner, members = {}, {}
+    current = None
+    for ship in ships:
+        size = int(model.ship_large[ship])
+        if current is None or not quota[current][size]:
+            current = max(leaders, key=lambda leader: (quota[leader][size], leader == original[ship],
+                                                       sum(quota[leader]), -rank[leader]))
+        owner[ship] = current
+        members.setdefault((current, size), set()).add(ship)
+        quota[current][size] -= 1
+
+    position = {ship: p for p, ship in enumerate(ships)}
+
+    def neighbours(ship):
+        p = position[ship]
+        return [ships[q] for q in (p - 1, p + 1) if 0 <= q < len(ships)]
+
+    def breaks(ship, leader, other):
+        return sum(owner[n] != leader for n in neighbours(ship) if n != other)
+
+    improved = True
+    while improved:
+        improved = False
+        for a in ships:
+            size = int(model.ship_large[a])
+            for target in dict.fromkeys(owner[n] for n in neighbours(a) if owner[n] != owner[a]):
+                source = owner[a]
+                for b in sorted(members.get((target, size), ())):
+                    before = breaks(a, source, b) + breaks(b, target, a)
+                    if breaks(a, target, b) + breaks(b, source, a) < before:
+                        owner[a], owner[b] = target, source
+                        members[(source, size)].remove(a)
+                        members[(target, size)].remove(b)
+                        members[(target, size)].add(a)
+                        members[(source, size)].add(b)
+                        improved = True
+                        break
+                if owner[a] != source:
+                    break
+
+    clustered = {leader: Allocation() for leader in leaders}
+    for ship in ships:
+        clustered[owner[ship]].add(model, ship)
+    return clustered
+
+
+def build_crane_leader_index(model, leader_allocations):
+    """建立桥吊编号 -> 组长位集合的倒排索引（组长分配完成后建立一次）
+
+    同一桥吊可能属于分给不同组长的多艘船，第 j 位对应 leader_allocations 中的第 j 位组长。
+    """
+    crane_to_leaders = [0] * model.num_cranes
+    for j, alloc in enumerate(leader_allocations.values()):
+        for k in iter_bits(alloc.crane_bits):
+            crane_to_leaders[k] |= 1 << j
+    return crane_to_leaders
+
+
+def crane_cut_costs(model, crane_to_leaders=None):
+    """相邻桥吊（编号 k 与 k + 1）之间的分界代价，按 CONTIGUITY_WEIGHTS 加权
+
+    两桥吊不属于同一艘船、不在同一泊位、不属于同一组长时分别计代价；未分配组长的桥吊
+    视为与相邻组长同属（并入相邻组长的段不计代价），crane_to_leaders 为空时不计组长分界。
+    """
+    n = model.num_cranes
+    if n < 2:
+        return np.zeros(0)
+    berth = model.crane_berth
+    ships = model.crane_ships()
+    cost = CONTIGUITY_WEIGHTS["泊位"] * (berth[1:] != berth[:-1])
+    cost = cost + CONTIGUITY_WEIGHTS["船舶"] * np.array([not a & b for a, b in zip(ships, ships[1:])])
+    if crane_to_leaders is not None and any(crane_to_leaders):
+        # 未分配组长的桥吊沿用前一个桥吊的组长，开头的沿用第一个有组长的桥吊
+        filled = list(crane_to_leaders)
+        first = next(mask for mask in filled if mask)
+        for k in range(n):
+            filled[k] = filled[k] or (filled[k - 1] if k else first)
+        cost = cost + CONTIGUITY_WEIGHTS["组长"] * np.array([not a & b for a, b in zip(filled, filled[1:])])
+    return cost
+
+
+def partition_cranes(model, crane_counts, limits, crane_to_leaders=None):
+    """按岸线顺序把桥吊切成连续段分给理货员（动态规划）
+
+    crane_counts 为 assign_cranes_fixed 得出的理货员 -> 均分桥吊数（按上岗顺序），limits 为对应的
+    每人（最少，最多）桥吊数。段内的分界代价（见 crane_cut_costs）与桥吊数偏离均分值的代价之和最小，
+    即切分点尽量落在组长、船舶、泊位的分界处，同时不超出每人上下限。
+    状态为（前 i 人，前 j 个桥吊），每人只需枚举上下限之间的段长，按桥吊数向量化，
+    整条岸线的桥吊也只需 人数 ×（上限 - 下限 + 1）次数组运算。
+    返回理货员 -> 桥吊编号 range（理货员沿岸线依次排列），无法切分时返回None。
+    """
+    n = model.num_cranes
+    prefix = np.concatenate([[0.0], np.cumsum(crane_cut_costs(model, crane_to_leaders))])
+    best = np.full(n + 1, np.inf)
+    best[0] = 0.0
+    picks = []
+    for target, (lo, hi) in zip(crane_counts.values(), limits):
+        current = np.full(n + 1, np.inf)
+        pick = np.zeros(n + 1, dtype=np.int64)
+        for length in range(lo, min(hi, n) + 1):
+            start = np.arange(n + 1 - length)
+            inner = prefix[start + length - 1] - prefix[start] if length else 0.0
+            candidate = best[start] + inner + CONTIGUITY_WEIGHTS["偏差"] * (length - target) ** 2
+            end = start + length
+            better = candidate < current[end]
+            current[end[better]] = candidate[better]
+            pick[end[better]] = length
+        best = current
+        picks.append(pick)
+    if not np.isfinite(best[n]):
+        return None
+
+    lengths, end = [], n
+    for pick in reversed(picks):
+        lengths.append(int(pick[end]))
+        end -= lengths[-1]
+    staff_crane_map, start = {}, 0
+    for staff, length in zip(crane_counts, reversed(lengths)):
+        staff_crane_map[staff] = range(start, start + length)
+        start += length
+    return staff_crane_map
+
+
+def match_staff_to_leaders(workarea, model, staff_crane_map, leader_allocations, messages, crane_to_leaders=None):
+    """通过桥吊 -> 组长索引为每个理货员匹配组长，整理最终配工结果
+
+    staff_crane_map 为理货员 -> 桥吊编号列表。理货员的桥吊分属多个组长时取组长顺序中的
+    第一位（位集合的最低位），并在提示信息中列出。crane_to_leaders 为已建立的索引（见
+    build_crane_leader_index），为空时在此建立。
+    """
+    if crane_to_leaders is None:
+        crane_to_leaders = build_crane_leader_index(model, leader_allocations)
+    leaders = list(leader_allocations)
+    ship_text = {}
+
+    final_result = []
+    spanning = []
+    for staff, cranes in staff_crane_map.items():
+        candidates = 0
+        for k in cranes:
+            candidates |= crane_to_leaders[k]
+        if candidates:
+            assigned_leader = leaders[(candidates & -candidates).bit_length() - 1]
+            if assigned_leader not in ship_text:
+                ship_text[assigned_leader] = ", ".join(leader_allocations[assigned_leader].ship_names(model))
+            assigned_ships = ship_text[assigned_leader]
+            if candidates & (candidates - 1):
+                spanning.append(f"{staff}（{'/'.join(leaders[j] for j in iter_bits(candidates))}）")
+        else:
+            assigned_leader = "未分配组长"
+            assigned_ships = ""
+
+        final_result.append({
+            "工作地": workarea,
+            "理货组长": assigned_leader,
+            "负责船舶": assigned_ships,
+            "理货员": staff,
+            "负责桥吊": ", ".join(model.crane_names(cranes)),
+            "桥吊数量": len(cranes)
+        })
+
+    if spanning:
+        messages.append(("warning", f"{workarea}有{len(spanning)}名理货员的桥吊分属多个组长，已按第一位组长归属：{', '.join(spanning)}"))
+    return final_result
+
+
+def allocation_rows(model, leader_allocations):
+    """组长分配详情（每位组长一行）"""
+    return [{
+        "理货组长": leader,
+        "总船舶数": len(alloc.ships),
+        "大船数": alloc.large_count,
+        "小船数": alloc.small_count,
+        "负责桥吊数": alloc.crane_count,
+        "负责船舶": ", ".join(alloc.ship_names(model))
+    } for leader, alloc in leader_allocations.items()]
+
+
+# 桥吊拆分策略
+def register_policy(name, use_all_staff=False):
+    """登记桥吊拆分策略
+
+    策略函数签名为 split(workarea, total_cranes, staff, min_per, max_per, messages, limits)，
+    limits 为理货员 -> 个人（最少，最多）桥吊数。策略决定哪些理货员参与配工、每人负责几个桥吊，
+    返回 理货员 -> 桥吊数（按顺序沿岸线连续切分给他们），无法满足时写入提示并返回None。
+    use_all_staff 表示可用理货员须全部上岗，优化求解时同样遵守。
+    """
+    def decorator(split):
+        CRANE_POLICIES[name] = {"split": split, "use_all_staff": use_all_staff}
+        return split
+    return decorator
+
+
+def crane_policy(workarea):
+    """工作地对应的桥吊拆分策略"""
+    return CRANE_POLICIES[WORKAREA_POLICIES.get(workarea, DEFAULT_POLICY)]
+
+
+@register_policy("all_staff", use_all_staff=True)
+def split_all_staff(workarea, total_cranes, staff, min_per, max_per, messages, limits):
+    """全员上岗（四期）：可用理货员全部参与，桥吊按每人上下限均分"""
+    return assign_cranes_fixed(total_cranes, staff, min_per, max_per, messages=messages,
+                               limits=[limits[person] for person in staff])
+
+
+@register_policy("quota")
+def split_quota_staff(workarea, total_cranes, staff, min_per, max_per, messages, limits):
+    """按需派员（自动化）：按每人桥吊上限计算所需人数，其余理货员留待调配"""
+    if min_per == max_per:
+        # 每人固定桥吊数时，校验桥吊数是否为其倍数
+        if total_cranes % min_per != 0:
+            messages.append(("error", f"{workarea}桥吊总数{total_cranes}个，需为{min_per}的倍数"))
+            return None
+        num_staff_needed = total_cranes // min_per
+    else:
+        num_staff_needed = -(-total_cranes // max_per)
+
+    # 校验理货员数量是否足够
+    if num_staff_needed > len(staff):
+        messages.append(("error", f"{workarea}理货员不足（需{num_staff_needed}人，仅{len(staff)}人）"))
+        return None
+    selected = staff[:num_staff_needed]
+    return assign_cranes_fixed(total_cranes, selected, min_per, max_per, messages=messages,
+                               limits=[limits[person] for person in selected])
+
+
+# 配工逻辑
+def solve_optimal(workarea, data, leaders, staff, min_per, max_per, use_all_staff, caps, staff_limits,
+                  time_budget, rng, messages):
+    """优化求解模式：调用 solver 求解，无可行解时返回None并提示回退贪心"""
+    solution = solve_workarea(data["model"], leaders, staff, min_per, max_per,
+                              use_all_staff=use_all_staff, leader_caps=caps, staff_limits=staff_limits,
+                              time_budget=time_budget, rng=rng)
+    if solution is None:
+        messages.append(("warning", f"{workarea}优化求解在{time_budget}秒内未找到可行方案（理货员无法按桥吊数上下限"
+                                    "切分，或无法满足组长带船上限），已回退贪心分配"))
+    else:
+        note = "已收敛" if solution["converged"] else "达到时间预算，取当前最优方案"
+        messages.append(("info", f"{workarea}优化求解用时{solution['elapsed']:.2f}秒（{note}）"))
+        if solution["unassigned_cranes"]:
+            names = data["model"].crane_names(solution["unassigned_cranes"])
+            messages.append(("warning", f"{workarea}有{len(names)}个桥吊超出所配理货员的个人桥吊数上限，"
+                                        f"未分配：{', '.join(names)}"))
+    return solution
+
+
+def report_violations(workarea, constraints, leader_allocations, staff_crane_map, messages):
+    """核对配工结果是否违反规则表，逐条加入提示信息，返回违规明细列表（同 check_assignment）"""
+    violations = constraints.check_assignment(workarea, leader_allocations, staff_crane_map)
+    for v in violations:
+        source = f"{v['规则表']}第{v['行号']}行" if v["行号"] is not None else "默认规则"
+        messages.append(("warning", f"{workarea}违反{source}：{v['对象']} {v['规则']}，实际{v['实际']}"))
+    return violations
+
+
+@traced("配工", lambda result, workarea, workarea_data, *args, **kwargs: {
+    "工作地": workarea, "船舶": len(workarea_data[workarea]["ships"]),
+    "桥吊": len(workarea_data[workarea]["all_cranes"]), "配工人数": 0 if result[0] is None else len(result[0])})
+def assign_work(workarea, workarea_data, leader_available, staff_available, seed=None,
+                mode="greedy", time_budget=5.0, constraints=None, loads=None):
+    """对单个工作地进行配工
+
+    返回（配工结果DataFrame，更新后的可用理货员，组长分配详情DataFrame，提示信息列表），
+    提示信息为（级别，内容）元组，级别对应 info/success/warning/error。
+    配工结果的 attrs["violations"] 为规则违反明细（同 ConstraintTable.check_assignment）。
+    seed 为随机种子，相同输入和种子得到相同的配工结果。
+    mode 为 "optimal" 时在 time_budget 秒内优化求解，未找到可行方案则回退贪心分配。
+    constraints 为 compile_constraints 编译的规则表，为空时使用默认规则。
+    loads 为 姓名 -> 历史负荷（可比较的元组，未列出的人视为无负荷），提供时理货员按负荷从低到高
+    上岗并优先分到多出的桥吊，组长分配见 allocate_ships_to_leaders（多日配工见 roster）。
+    各工作地只有参与配工的理货员和每人桥吊数不同，由桥吊拆分策略决定，见 crane_policy。
+    """
+    messages = []
+    rng = random.Random(seed)
+    constraints = constraints or ConstraintTable()
+    data = workarea_data[workarea]
+    model = data["model"]
+    ships = data["ships"]
+    total_cranes = model.num_cranes
+
+    leaders = leader_available.get(workarea, [])
+    current_staff = staff_available.get(workarea, [])
+    if loads is not None:
+        current_staff = sorted(current_staff, key=lambda staff: loads.get(staff, ()))
+
+    if not ships:
+        messages.append(("warning", f"{workarea} 无待配工船舶"))
+        return None, staff_available, None, messages
+    if not leaders:
+        messages.append(("warning", f"{workarea} 无可用理货组长"))
+        return None, staff_available, None, messages
+    if not current_staff:
+        messages.append(("warning", f"{workarea} 无可用理货员"))
+        return None, staff_available, None, messages
+
+    # 规则：理货员桥吊数上下限、组长带船上限
+    min_per, max_per = constraints.clerk_limits(workarea)
+    caps = constraints.leader_caps(workarea, leaders)
+    staff_limits = {staff: constraints.clerk_limits(workarea, staff) for staff in current_staff}
+    policy = crane_policy(workarea)
+    messages.append(("info", f"{workarea}总桥吊数：{total_cranes}个"))
+
+    # 按工作地策略确定参与配工的理货员及每人桥吊数，无法满足每人上下限时策略写入提示
+    with stage("桥吊拆分", 工作地=workarea, 桥吊=total_cranes, 理货员=len(current_staff)):
+        crane_counts = policy["split"](workarea, total_cranes, current_staff, min_per, max_per, messages,
+                                       staff_limits)
+        if not crane_counts:
+            return None, staff_available, None, messages
+
+    solution = None
+    if mode == "optimal":
+        with stage("优化求解", 工作地=workarea, 船舶=len(ships), 组长=len(leaders)) as counts:
+            solution = solve_optimal(workarea, data, leaders, current_staff, min_per, max_per,
+                                     policy["use_all_staff"], caps, staff_limits, time_budget, rng, messages)
+            counts["可行"] = solution is not None
+
+    crane_to_leaders = None
+    if solution:
+        staff_crane_map = solution["staff_crane_map"]
+        leader_allocations, unassigned_ships = solution["leader_allocations"], []
+    else:
+        # 船舶分配优化：均衡数量+大小搭配
+        with stage("组长分配", 工作地=workarea, 船舶=len(ships), 组长=len(leaders)):
+            leader_loads = None if loads is None else [loads.get(leader, ()) for leader in leaders]
+            leader_allocations, unassigned_ships = allocate_ships_to_leaders(
+                leaders, model, range(model.num_ships), rng, caps, loads=leader_loads)
+            leader_allocations = cluster_allocations(model, leader_allocations, rng)
+
+        # 按岸线顺序把桥吊连续切分给理货员，切分点尽量落在组长、船舶、泊位的分界处
+        with stage("连续切分", 工作地=workarea, 桥吊=total_cranes, 理货员=len(crane_counts)):
+            crane_to_leaders = build_crane_leader_index(model, leader_allocations)
+            staff_crane_map = partition_cranes(model, crane_counts, [staff_limits[staff] for staff in crane_counts],
+                                               crane_to_leaders)
+
+    # 更新剩余可用理货员
+    staff_available[workarea] = [staff for staff in current_staff if staff not in staff_crane_map]
+    messages.append(("success", f"{workarea}桥吊分配完成：{len(staff_crane_map)}人，桥吊总数{total_cranes}"))
+    if unassigned_ships:
+        names = [model.ship_names[i] for i in unassigned_ships]
+        messages.append(("warning", f"{workarea}有{len(names)}艘船舶超出组长带船上限，未分配组长：{', '.join(names)}"))
+
+    with stage("规则核对", 工作地=workarea):
+        violations = report_violations(workarea, constraints, leader_allocations, staff_crane_map, messages)
+
+    # 整理最终配工结果
+    with stage("结果匹配", 工作地=workarea, 理货员=len(staff_crane_map), 组长=len(leader_allocations)):
+        final_result = match_staff_to_leaders(workarea, model, staff_crane_map, leader_allocations, messages,
+                                              crane_to_leaders)
+
+    df_result = pd.DataFrame(final_result)
+    df_result.attrs["violations"] = violations
+    return df_result, staff_available, pd.DataFrame(allocation_rows(model, leader_allocations)), messages
+
+
+def assign_workareas(workarea_data, leader_available, staff_available, seed=None, mode="greedy",
+                     time_budget=5.0, constraints=None, jobs=1, processes=False, loads=None):
+    """对全部工作地配工
+
+    各工作地的船舶、组长、理货员互不相干，jobs > 1 时并行执行（默认线程池，
+    processes=True 时用进程池，优化求解等CPU密集场景更快，但进程中的诊断记录不回传）。
+    loads 为历史负荷，见 assign_work。
+    返回 工作地 -> （配工结果，剩余可用理货员列表，组长分配详情，提示信息），顺序同 workarea_data。
+    """
+    def task_args(wa):
+        return (wa, workarea_data, leader_available, {wa: staff_available.get(wa, [])},
+                seed, mode, time_budget, constraints, loads)
+
+    if jobs is not None and jobs <= 1 or len(workarea_data) <= 1:
+        outcomes = {wa: assign_work(*task_args(wa)) for wa in workarea_data}
+    elif processes:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {wa: pool.submit(assign_work, *task_args(wa)) for wa in workarea_data}
+            outcomes = {wa: future.result() for wa, future in futures.items()}
+    else:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = {wa: submit(pool, assign_work, *task_args(wa)) for wa in workarea_data}
+            outcomes = {wa: future.result() for wa, future in futures.items()}
+    return {wa: (df_result, remaining.get(wa, []), df_detail, msgs)
+            for wa, (df_result, remaining, df_detail, msgs) in outcomes.items()}
+
+
+# 整体调度
+def run_schedule(frames, seed=None, mode="greedy", time_budget=5.0, jobs=1, processes=False, loads=None):
+    """对已读取的五张工作表执行全部工作地的配工
+
+    frames 为工作表名 -> DataFrame（同 loader.read_workbook 的返回），
+    返回包含各工作地配工结果、组长分配详情、提示信息及剩余待命理货员的字典。
+    seed 为随机种子，指定后结果可复现；mode/time_budget/loads 见 assign_work，
+    jobs/processes 见 assign_workareas。
+    """
+    staff_summary = summarize_staff(frames["人员信息表"])
+    leader_available = staff_summary["available"]["理货组长"]
+    staff_original = staff_summary["available"]["理货员"]
+    parsed = parse_crane_tables(frames["泊位与桥吊关联表"], frames["船舶与桥吊关联表"])
+    workarea_data = build_workarea_data(parsed)
+    constraints = compile_constraints(frames["四期-组长带船限制"], frames["理货员桥吊负责规则"],
+                                      known_people=frames["人员信息表"]["姓名"])
+
+    outcomes = assign_workareas(workarea_data, leader_available, staff_original, seed=seed, mode=mode,
+                                time_budget=time_budget, constraints=constraints, jobs=jobs, processes=processes,
+                                loads=loads)
+    results, details, messages, remaining = {}, {}, {}, {}
+    for wa, (df_result, staff_left, df_detail, msgs) in outcomes.items():
+        results[wa] = df_result
+        details[wa] = df_detail
+        messages[wa] = msgs
+        remaining[wa] = staff_left
+
+    return {
+        "results": results,
+        "details": details,
+        "messages": messages,
+        "remaining": remaining,
+        "status": staff_summary["status"],
+        "leader_available": leader_available,
+        "staff_original": staff_original,
+        "workarea_data": workarea_data,
+        "crane_issues": parsed["issues"],
+        "rule_issues": constraints.issues,
+    }
+
+
+def schedule_file(source, seed=None, mode="greedy", time_budget=5.0, jobs=1, processes=False):
+    """读取Excel文件（路径或文件对象）并执行配工"""
+    frames, missing = read_workbook(source)
+    if missing:
+        raise ValueError(f"未找到工作表：{'、'.join(missing)}")
+    return run_schedule(frames, seed=seed, mode=mode, time_budget=time_budget, jobs=jobs, processes=processes)
+
+
+def has_results(results):
+    """是否至少有一个工作地生成了配工结果"""
+    return any(df is not None and not df.empty for df in results.values())
+
+
+def result_sheet_name(workarea):
+    """工作地配工结果的工作表名（增量重排按该名称读取上次结果）"""
+    return RESULT_SHEETS.get(workarea, f"{workarea}配工结果")
+
+
+def _cell_value(value):
+    """空值写为空单元格"""
+    if value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and value != value):
+        return None
+    return value
+
+
+def _column_widths(df):
+    """按表头和前 WIDTH_SAMPLE 行估算列宽（中文按两个字符宽度计）"""
+    widths = []
+    for col in df.columns:
+        texts = [str(col)] + [str(v) for v in df[col].iloc[:WIDTH_SAMPLE] if _cell_value(v) is not None]
+        longest = max(len(t) + sum(ord(ch) > 0x2E80 for ch in t) for t in texts)
+        widths.append(min(longest + 2, MAX_COLUMN_WIDTH))
+    return widths
+
+
+@traced("导出Excel", lambda result, sheets, *args, **kwargs: {
+    "工作表": len(sheets), "行数": sum(len(df) for df in sheets.values() if df is not None)})
+def write_sheets(sheets, target=None):
+    """流式写出多张工作表（工作表名 -> DataFrame，空表跳过），target为空时返回字节内容
+
+    使用 openpyxl 只写模式逐行写出，内存中不保留单元格对象，适合多工作地、多日的大方案。
+    """
+    wb = Workbook(write_only=True)
+    for name, df in sheets.items():
+        if df is None or df.empty:
+            continue
+        ws = wb.create_sheet(title=name[:31])
+        for i, width in enumerate(_column_widths(df), start=1):
+            ws.column_dimensions[get_column_letter(i)].width = width
+        ws.freeze_panes = "A2"
+        header = []
+        for col in df.columns:
+            cell = WriteOnlyCell(ws, value=str(col))
+            cell.font, cell.fill = HEADER_FONT, HEADER_FILL
+            header.append(cell)
+        ws.append(header)
+        for row in df.itertuples(index=False, name=None):
+            ws.append([_cell_value(v) for v in row])
+    if not wb.worksheets:
+        wb.create_sheet(title="配工结果")  # 工作簿至少需要一张工作表
+
+    output = target if target is not None else BytesIO()
+    wb.save(output)
+    if target is None:
+        return output.getvalue()
+
+
+def write_results(results, target=None, extra_sheets=None):
+    """将各工作地配工结果写入Excel，target为空时返回字节内容
+
+    extra_sheets 为附加工作表（工作表名 -> DataFrame），如增量重排的变更清单；
+    需要组长汇总、桥吊/船舶视图等完整报表时使用 export.build_report。
+    """
+    sheets = {result_sheet_name(wa): df for wa, df in results.items()}
+    sheets.update(extra_sheets or {})
+    return write_sheets(sheets, target)
@@ -0,0 +1,319 @@
+"""配工方案评估：与生成方式无关，对任意方案（本次生成或导出的Excel）按输入数据打分
+
+    evaluator = PlanEvaluator.from_base(prepare_base(frames))     # 输入数据只整理一次
+    evaluation = evaluator.evaluate(plan, leaders)                 # plan 为配工结果表，leaders 为组长分配
+    evaluation["score"], evaluation["summary"]                     # 总分（越低越好）、分工作地指标
+    ranking, best_seed = best_of_seeds(base, runs=16, jobs=4)      # 多个种子并行配工，按得分择优
+
+评估内容（列见 EVALUATION_COLUMNS）：
+    - 覆盖：每艘船、每个桥吊是否恰好分配一次（未分配、重复分配、输入数据中没有的船舶/桥吊）
+    - 均衡：组长船舶数、大船数、桥吊数及理货员桥吊数的方差，各组长的大/小船搭配
+    - 规则：组长带船上限、理货员桥吊数上下限；人员不在可用名单中
+    - 一致性：理货员的桥吊是否都属于所填组长的船舶（未分配组长、组长不符、跨组长）
+输入数据的船舶、桥吊按（工作地，名称）统一编号后只整理一次；每次评估把方案拆成（组长，船舶）、
+（理货员，桥吊）两组编号，覆盖、搭配和一致性都用 numpy 计数一次算出，峰值规模单次评估
+约十几毫秒，可作为多次随机配工择优的目标函数。得分为各项指标按 EVALUATION_WEIGHTS 的加权和，
+均衡项的权重与优化求解（solver.WEIGHTS）一致。
+"""
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from constraints import ConstraintTable, SIZE_TOTAL
+from diagnostics import traced
+from engine import assign_workareas
+from export import ISSUE_COLUMNS, SUMMARY_SHEET
+from loader import split_list
+from replan import plan_from_sheets
+
+UNASSIGNED_LEADER = "未分配组长"
+
+# 分工作地评估指标
+EVALUATION_COLUMNS = ["工作地", "组长数", "理货员数", "船舶数", "未分配船舶", "重复船舶", "未知船舶",
+                      "桥吊数", "未分配桥吊", "重复桥吊", "未知桥吊", "规则违反", "不可用人员",
+                      "未分配组长理货员", "组长不符理货员", "跨组长理货员",
+                      "船舶数方差", "大船数方差", "桥吊数方差", "理货员桥吊数方差", "得分"]
+
+# 得分权重（指标 -> 每单位的代价）
+EVALUATION_WEIGHTS = {
+    "未分配船舶": 100.0,
+    "重复船舶": 100.0,
+    "未知船舶": 20.0,
+    "未分配桥吊": 50.0,
+    "重复桥吊": 100.0,
+    "未知桥吊": 20.0,
+    "规则违反": 50.0,
+    "不可用人员": 100.0,
+    "未分配组长理货员": 20.0,
+    "组长不符理货员": 20.0,
+    "跨组长理货员": 10.0,
+    "船舶数方差": 10.0,
+    "大船数方差": 4.0,
+    "桥吊数方差": 1.0,
+    "理货员桥吊数方差": 1.0,
+}
+
+LEADER_COLUMNS = ["工作地", "理货组长", "船舶数", "大船数", "小船数", "大船占比", "桥吊数", "理货员数"]
+CLERK_COLUMNS = ["工作地", "理货员", "理货组长", "桥吊数", "桥吊所属组长", "一致性"]
+
+_base = None
+_evaluator = None
+
+
+def _split(values, upper=False):
+    """逗号分隔的取值逐个拆开，返回（所在行号数组，取值列表），去除空白和空值"""
+    rows, pieces = [], []
+    for row, value in enumerate(values):
+        names = split_list(value, upper)
+        rows.extend([row] * len(names))
+        pieces.extend(names)
+    return np.asarray(rows, dtype=np.int64), pieces
+
+
+def _gather(ptr, values, rows):
+    """从CSR中取出多行，返回（每个取值所在的第几行，取值）"""
+    lens = ptr[rows + 1] - ptr[rows]
+    owner = np.repeat(np.arange(len(rows)), lens)
+    offsets = np.arange(lens.sum()) - np.repeat(np.cumsum(lens) - lens, lens)
+    return owner, values[ptr[rows][owner] + offsets]
+
+
+def _text(series):
+    return series.where(series.notna(), "").astype(str).str.strip()
+
+
+def combine_results(results):
+    """工作地 -> 配工结果 合并为一张方案表（同导出的结果工作表）"""
+    frames = [df for df in results.values() if df is not None and not df.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["工作地", "理货组长", "负责船舶",
+                                                                                      "理货员", "负责桥吊"])
+
+
+def read_plan_workbook(source):
+    """读取导出的配工结果Excel，返回（方案表，组长汇总表或None）"""
+    sheets = pd.read_excel(source, sheet_name=None)
+    leaders = sheets.get(SUMMARY_SHEET)
+    if leaders is not None and not {"工作地", "理货组长", "负责船舶"} <= set(leaders.columns):
+        leaders = None
+    return plan_from_sheets(sheets), leaders
+
+
+class PlanEvaluator:
+    """按输入数据评估配工方案
+
+    workarea_data 为 build_workarea_data 的结果，各工作地的船舶、桥吊合并编号（键为（工作地，名称）），
+    船舶 -> 桥吊同 WorkareaModel 用CSR保存；constraints 为规则表（为空时使用默认规则），
+    leader_available/staff_available 为 工作地 -> 可用组长/理货员，提供时检查方案中的人员是否可用。
+    """
+
+    def __init__(self, workarea_data, constraints=None, leader_available=None, staff_available=None):
+        self.workareas = list(workarea_data)
+        self.constraints = constraints or ConstraintTable()
+        self.available = {"理货组长": leader_available, "理货员": staff_available}
+        self.ship_names, self.crane_names = [], []
+        large, cranes = [], []
+        for wa, data in workarea_data.items():
+            model = data["model"]
+            offset = len(self.crane_names)
+            self.crane_names.extend((wa, crane) for crane in model.cranes)
+            seen = set()
+            for i, name in enumerate(model.ship_names):
+                if name in seen:  # 同名船舶以船舶表中第一行为准
+                    continue
+                seen.add(name)
+                self.ship_names.append((wa, name))
+                large.append(model.ship_large[i])
+                cranes.append(model.ship_cranes[model.ship_ptr[i]:model.ship_ptr[i + 1]].astype(np.int64) + offset)
+        self.ship_index = {key: i for i, key in enumerate(self.ship_names)}
+        self.crane_index = {key: k for k, key in enumerate(self.crane_names)}
+        self.ship_large = np.asarray(large, dtype=bool)
+        self.ship_ptr = np.concatenate([[0], np.cumsum([len(c) for c in cranes], dtype=np.int64)]).astype(np.int64)
+        self.ship_cranes = np.concatenate(cranes) if cranes else np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def from_base(cls, base):
+        """由 scenario.prepare_base 的基准数据建立"""
+        return cls(base["workarea_data"], base["constraints"], base["leader_available"], base["staff_available"])
+
+    def _leader_table(self, plan, leaders):
+        """组长 -> 船舶：优先取组长分配（工作地 -> 详情，或含工作地列的汇总表），否则由方案表还原"""
+        if isinstance(leaders, dict):
+            frames = [df.assign(工作地=wa) for wa, df in leaders.items() if df is not None and not df.empty]
+            leaders = pd.concat(frames, ignore_index=True) if frames else None
+        if leaders is None:
+            leaders = plan[plan["理货组长"] != UNASSIGNED_LEADER].drop_duplicates(["工作地", "理货组长"])
+        table = leaders[["工作地", "理货组长", "负责船舶"]].copy()
+        table["工作地"], table["理货组长"] = _text(table["工作地"]), _text(table["理货组长"])
+        return table[table["理货组长"] != ""].drop_duplicates(["工作地", "理货组长"])
+
+    def evaluate(self, plan, leaders=None):
+        """评估方案，返回 {"score": 总分, "summary": 分工作地指标, "leaders": 组长搭配, "clerks": 理货员一致性,
+        "issues": 问题明细（列同 export.ISSUE_COLUMNS）}
+
+        plan 为配工结果表（列含 工作地、理货组长、负责船舶、理货员、负责桥吊），leaders 为组长分配：
+        工作地 -> 组长分配详情（同 run_schedule 的 details），或含工作地列的组长汇总表，为空时由方案表还原。
+        """
+        plan = plan.assign(**{col: _text(plan[col]) for col in ("工作地", "理货组长", "理货员")})
+        plan = plan[plan["理货员"] != ""]
+        leader_table = self._leader_table(plan, leaders)
+        lt_wa, lt_name = leader_table["工作地"].tolist(), leader_table["理货组长"].tolist()
+        p_wa, p_leader, p_staff = plan["工作地"].tolist(), plan["理货组长"].tolist(), plan["理货员"].tolist()
+        workareas = list(dict.fromkeys(self.workareas + p_wa + lt_wa))
+        n_leaders = max(len(lt_name), 1)
+        leader_code = {key: i for i, key in enumerate(zip(lt_wa, lt_name))}
+        clerk_code = {}
+        row_clerk = np.array([clerk_code.setdefault(key, len(clerk_code)) for key in zip(p_wa, p_staff)], dtype=np.int64)
+        row_leader = np.array([leader_code.get(key, -1) for key in zip(p_wa, p_leader)], dtype=np.int64)
+        clerk_keys = list(clerk_code)
+        first_row = np.unique(row_clerk, return_index=True)[1]
+
+        # 方案拆成（组长，船舶）、（理货员，桥吊）两张长表，名称换成编号，输入数据中没有的为 -1
+        ship_rows, ship_pieces = _split(leader_table["负责船舶"].tolist())
+        crane_rows, crane_pieces = _split(plan["负责桥吊"].tolist(), upper=True)
+        ships = np.array([self.ship_index.get((lt_wa[r], s), -1) for r, s in zip(ship_rows, ship_pieces)], dtype=np.int64)
+        cranes = np.array([self.crane_index.get((p_wa[r], c), -1) for r, c in zip(crane_rows, crane_pieces)],
+                          dtype=np.int64)
+        tally, issues = {}, []
+
+        # 覆盖：船舶按组长分配，桥吊按理货员分配
+        for key, label, names, codes, rows, row_wa, pieces in (
+                ("船舶", "组长", self.ship_names, ships, ship_rows, lt_wa, ship_pieces),
+                ("桥吊", "理货员", self.crane_names, cranes, crane_rows, p_wa, crane_pieces)):
+            counts = np.bincount(codes[codes >= 0], minlength=len(names))
+            missing, repeated = np.flatnonzero(counts == 0), np.flatnonzero(counts > 1)
+            unknown = list(dict.fromkeys((row_wa[r], piece) for r, piece, code in zip(rows, pieces, codes) if code < 0))
+            tally[f"{key}数"] = [wa for wa, _ in names]
+            tally[f"未分配{key}"] = [names[i][0] for i in missing]
+            tally[f"重复{key}"] = [names[i][0] for i in repeated]
+            tally[f"未知{key}"] = [wa for wa, _ in unknown]
+            issues.extend((names[i][0], f"{key}未分配", names[i][1], f"无{label}负责") for i in missing)
+            issues.extend((names[i][0], f"{key}重复分配", names[i][1], f"分给{counts[i]}位{label}") for i in repeated)
+            issues.extend((wa, f"{key}不在输入数据中", name, "方案中的名称在输入数据中不存在") for wa, name in unknown)
+
+        # 组长搭配：船舶数、大/小船数、桥吊数（船舶桥吊去重）、理货员数
+        known = ships >= 0
+        ship_count = np.bincount(ship_rows, minlength=len(lt_name))
+        large = np.bincount(ship_rows[known], weights=self.ship_large[ships[known]], minlength=len(lt_name)).astype(int)
+        small = np.bincount(ship_rows[known], minlength=len(lt_name)) - large
+        position, owned = _gather(self.ship_ptr, self.ship_cranes, ships[known])
+        owner_pairs = np.unique(owned * n_leaders + ship_rows[known][position])
+        pair_crane, pair_leader = np.divmod(owner_pairs, n_leaders)
+        mix = pd.DataFrame({
+            "工作地": lt_wa, "理货组长": lt_name, "船舶数": ship_count, "大船数": large, "小船数": small,
+            "大船占比": np.round(large / np.where(ship_count > 0, ship_count, np.nan), 2),
+            "桥吊数": np.bincount(pair_leader, minlength=len(lt_name)),
+            "理货员数": np.bincount(row_leader[row_leader >= 0], minlength=len(lt_name)),
+        }, columns=LEADER_COLUMNS)
+        clerk_counts = np.bincount(row_clerk[crane_rows], minlength=len(clerk_keys))
+        tally.update({"组长数": lt_wa, "理货员数": [wa for wa, _ in clerk_keys]})
+        spread = mix.groupby("工作地")[["船舶数", "大船数", "桥吊数"]].var(ddof=0).add_suffix("方差")
+        spread["理货员桥吊数方差"] = pd.Series(clerk_counts, dtype=float).groupby(
+            [wa for wa, _ in clerk_keys]).var(ddof=0)
+
+        # 规则：组长带船上限（合计/大船/小船）、理货员桥吊数上下限
+        violations = []
+        for size, count in ((SIZE_TOTAL, ship_count), ("大船", large), ("小船", small)):
+            limit = np.array([self.constraints.leader_limit(wa, leader, size) for wa, leader in zip(lt_wa, lt_name)],
+                             dtype=float)
+            violations.extend((lt_wa[i], lt_name[i], f"{size}最多{int(limit[i])}艘，实际{count[i]}艘")
+                              for i in np.flatnonzero(count > np.nan_to_num(limit, nan=np.inf)))
+        limits = np.array([self.constraints.clerk_limits(wa, staff) for wa, staff in clerk_keys], dtype=int).reshape(-1, 2)
+        violations.extend((*clerk_keys[k], f"每人{limits[k, 0]}-{limits[k, 1]}个桥吊，实际{clerk_counts[k]}个")
+                          for k in np.flatnonzero((clerk_counts < limits[:, 0]) | (clerk_counts > limits[:, 1])))
+        tally["规则违反"] = [wa for wa, _, _ in violations]
+        issues.extend((wa, "违反规则", name, note) for wa, name, note in violations)
+
+        # 人员：方案中的组长、理货员需在可用名单中，理货员不能重复出现
+        unavailable = []
+        for role, keys in (("理货组长", list(leader_code)), ("理货员", clerk_keys)):
+            available = self.available[role]
+            if available is not None:
+                allowed = {(wa, name) for wa, names in available.items() for name in names}
+                unavailable.extend((wa, name, f"{role}不在该工作地的可用名单中（请假、抽调或工作地不符）")
+                                   for wa, name in keys if (wa, name) not in allowed)
+        repeated = np.ones(len(p_staff), dtype=bool)
+        repeated[first_row] = False
+        unavailable.extend((p_wa[r], p_staff[r], "理货员重复出现") for r in np.flatnonzero(repeated))
+        tally["不可用人员"] = [wa for wa, _, _ in unavailable]
+        issues.extend((wa, "人员不可用", name, note) for wa, name, note in unavailable)
+
+        # 一致性：理货员的每个桥吊都应属于所填组长名下的船舶（桥吊属于多位组长时符合其一即可）
+        stated = row_leader[crane_rows]
+        held = (cranes >= 0) & (stated >= 0)
+        held[held] = np.isin(cranes[held] * n_leaders + stated[held], owner_pairs)
+        mismatched = np.bincount(row_clerk[crane_rows][~held], minlength=len(clerk_keys)) > 0
+        crane_owners = {}
+        for crane, leader in zip(pair_crane.tolist(), pair_leader.tolist()):
+            crane_owners.setdefault(crane, []).append(leader)
+        clerk_owners = [{} for _ in clerk_keys]
+        for k, crane in zip(row_clerk[crane_rows].tolist(), cranes.tolist()):
+            clerk_owners[k].update(dict.fromkeys(crane_owners.get(crane, ())))
+        stated_names = np.array([p_leader[r] for r in first_row], dtype=object)
+        spans = np.array([len(owners) > 1 for owners in clerk_owners], dtype=bool)
+        clerk_table = pd.DataFrame({
+            "工作地": [wa for wa, _ in clerk_keys], "理货员": [staff for _, staff in clerk_keys],
+            "理货组长": stated_names, "桥吊数": clerk_counts,
+            "桥吊所属组长": [", ".join(lt_name[l] for l in owners) for owners in clerk_owners],
+            "一致性": np.select([stated_names == UNASSIGNED_LEADER, mismatched & spans, mismatched],
+                             [UNASSIGNED_LEADER, "跨组长", "组长不符"], "一致"),
+        }, columns=CLERK_COLUMNS)
+        for status in (UNASSIGNED_LEADER, "组长不符", "跨组长"):
+            rows = clerk_table[clerk_table["一致性"] == status]
+            tally[f"{status}理货员"] = rows["工作地"].tolist()
+            if status != UNASSIGNED_LEADER:
+                issues.extend((wa, f"理货员{status}", staff, f"填写组长{leader or '-'}，桥吊属于{owners or '无组长'}")
+                              for wa, staff, leader, owners in zip(rows["工作地"], rows["理货员"], rows["理货组长"],
+                                                                   rows["桥吊所属组长"]))
+
+        summary = pd.DataFrame({metric: Counter(was) for metric, was in tally.items()}, index=workareas,
+                               columns=list(tally)).fillna(0).astype(int)
+        summary = summary.join(spread.reindex(workareas).fillna(0).round(3))
+        summary["得分"] = sum(summary[col] * weight for col, weight in EVALUATION_WEIGHTS.items()).round(3)
+        summary = summary.rename_axis("工作地").reset_index().reindex(columns=EVALUATION_COLUMNS)
+        return {
+            "score": float(summary["得分"].sum()),
+            "summary": summary,
+            "leaders": mix,
+            "clerks": clerk_table,
+            "issues": pd.DataFrame(issues, columns=ISSUE_COLUMNS),
+        }
+
+
+def _run_seed(base, evaluator, seed, mode, time_budget):
+    """按种子配工并评估，返回一行择优指标"""
+    outcomes = assign_workareas(base["workarea_data"], base["leader_available"], base["staff_available"], seed=seed,
+                                mode=mode, time_budget=time_budget, constraints=base["constraints"])
+    evaluation = evaluator.evaluate(combine_results({wa: o[0] for wa, o in outcomes.items()}),
+                                    {wa: o[2] for wa, o in outcomes.items()})
+    summary = evaluation["summary"]
+    return {"种子": seed, "得分": round(evaluation["score"], 3),
+            **{col: round(summary[col].sum().item(), 3) for col in EVALUATION_COLUMNS[1:-1]}}
+
+
+def _init_worker(base):
+    global _base, _evaluator
+    _base, _evaluator = base, PlanEvaluator.from_base(base)
+
+
+def _run_seed_in_worker(seed, mode, time_budget):
+    return _run_seed(_base, _evaluator, seed, mode, time_budget)
+
+
+@traced("多种子择优", lambda result, base, *args, **kwargs: {"方案": len(result[0])})
+def best_of_seeds(base, runs=8, seed=0, mode="greedy", time_budget=5.0, jobs=None):
+    """用种子 seed ~ seed + runs - 1 分别配工并评估，返回（按得分升序的对比表，得分最低的种子）
+
+    base 为 scenario.prepare_base 的基准数据；jobs 为并行进程数（默认CPU核数），为1时在当前进程中依次配工。
+    同分时取较小的种子，得到种子后用相同参数重新配工即可复现该方案。
+    """
+    seeds = range(seed, seed + runs)
+    if jobs == 1 or runs == 1:
+        evaluator = PlanEvaluator.from_base(base)
+        rows = [_run_seed(base, evaluator, s, mode, time_budget) for s in seeds]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(base,)) as pool:
+            rows = list(pool.map(_run_seed_in_worker, seeds, [mode] * runs, [time_budget] * runs))
+    ranking = pd.DataFrame(rows).sort_values(["得分", "种子"], ignore_index=True)
+    return ranking, int(ranking["种子"].iloc[0])
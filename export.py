@@ -0,0 +1,178 @@
+"""配工结果导出：整理完整报表，并写出为Excel、CSV或Parquet
+
+    report = build_report(result["results"], result["details"], result["workarea_data"],
+                          result["messages"], result["remaining"])
+    export_report(report, "xlsx", "配工结果.xlsx")
+
+报表为 工作表名 -> DataFrame，每个方案整理一次即可重复用于各种格式；Excel 由
+engine.write_sheets 流式写出。报表包含：
+    - 各工作地配工结果（工作表名同 engine.RESULT_SHEETS，增量重排可直接读取）
+    - 组长汇总：各组长的船舶、桥吊及理货员数
+    - 桥吊视图、船舶视图：逐个桥吊/船舶列出负责的理货员和组长
+    - 未分配与违规：未分配组长的船舶、无人负责的桥吊、待命理货员及配工警告
+CSV/Parquet 按工作表各输出一个文件，打包为 zip。
+"""
+import importlib.util
+import zipfile
+from io import BytesIO, TextIOWrapper
+
+import pandas as pd
+
+from diagnostics import traced
+from engine import result_sheet_name, write_sheets
+from loader import split_list
+
+SUMMARY_SHEET = "组长汇总"
+CRANE_VIEW_SHEET = "桥吊视图"
+SHIP_VIEW_SHEET = "船舶视图"
+ISSUE_SHEET = "未分配与违规"
+VIEW_SHEETS = [SUMMARY_SHEET, CRANE_VIEW_SHEET, SHIP_VIEW_SHEET, ISSUE_SHEET]
+
+SUMMARY_COLUMNS = ["工作地", "理货组长", "总船舶数", "大船数", "小船数", "负责桥吊数", "理货员数", "负责船舶"]
+CRANE_VIEW_COLUMNS = ["工作地", "桥吊号", "船舶", "理货员", "理货组长"]
+SHIP_VIEW_COLUMNS = ["工作地", "船舶名称", "大小", "桥吊数量", "桥吊", "理货组长", "理货员"]
+ISSUE_COLUMNS = ["工作地", "类型", "名称", "说明"]
+
+# Parquet 需要 pyarrow 或 fastparquet，均未安装时不提供该格式
+PARQUET_ENGINE = next((m for m in ("pyarrow", "fastparquet") if importlib.util.find_spec(m)), None)
+
+# 导出格式 -> （说明，文件扩展名，MIME类型）
+EXPORT_FORMATS = {
+    "xlsx": ("Excel", ".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": ("CSV（zip）", ".zip", "application/zip"),
+    "parquet": ("Parquet（zip）", ".zip", "application/zip"),
+}
+
+
+def available_formats():
+    """当前环境可用的导出格式"""
+    return [fmt for fmt in EXPORT_FORMATS if fmt != "parquet" or PARQUET_ENGINE]
+
+
+def _has_rows(df):
+    return df is not None and not df.empty
+
+
+def _crane_holders(df_result):
+    """桥吊 -> （理货员，组长）"""
+    holders = {}
+    if _has_rows(df_result):
+        for leader, staff, cranes in zip(df_result["理货组长"], df_result["理货员"], df_result["负责桥吊"]):
+            for c in split_list(cranes):
+                holders[c] = (staff, leader)
+    return holders
+
+
+def _ship_leaders(df_detail):
+    """船舶 -> 组长（由组长分配详情的负责船舶列得出）"""
+    if not _has_rows(df_detail) or "负责船舶" not in df_detail.columns:
+        return {}
+    return {ship: leader for leader, ships in zip(df_detail["理货组长"], df_detail["负责船舶"])
+            for ship in split_list(ships)}
+
+
+@traced("整理报表", lambda result, *args, **kwargs: {"工作表": len(result),
+                                                  "行数": sum(len(df) for df in result.values())})
+def build_report(results, details, workarea_data, messages=None, remaining=None, extra_sheets=None):
+    """整理完整报表（工作表名 -> DataFrame）
+
+    results/details/messages/remaining 为 工作地 -> 配工结果/组长分配详情/提示信息/剩余待命理货员
+    （同 engine.run_schedule 或 replan.replan 的返回），workarea_data 为 build_workarea_data 的结果；
+    extra_sheets 附加在最后，如增量重排的变更清单。
+    """
+    messages = messages or {}
+    remaining = remaining or {}
+    report = {result_sheet_name(wa): df for wa, df in results.items() if _has_rows(df)}
+
+    summary, crane_rows, ship_rows, issues = [], [], [], []
+    for wa, data in workarea_data.items():
+        df_result, df_detail = results.get(wa), details.get(wa)
+        holders = _crane_holders(df_result)
+        ship_leaders = _ship_leaders(df_detail)
+
+        # 组长汇总：组长分配详情补充工作地和理货员数
+        if _has_rows(df_detail):
+            clerk_counts = df_result["理货组长"].value_counts() if _has_rows(df_result) else pd.Series(dtype=int)
+            df = df_detail.assign(工作地=wa, 理货员数=df_detail["理货组长"].map(clerk_counts).fillna(0).astype(int))
+            summary.append(df.reindex(columns=SUMMARY_COLUMNS))
+
+        # 桥吊视图：按泊位从左到右的顺序
+        for c in data["all_cranes"]:
+            staff, leader = holders.get(c, ("", ""))
+            crane_rows.append((wa, c, ", ".join(data["crane_to_ship"].get(c, [])), staff, leader))
+
+        # 船舶视图：负责该船桥吊的理货员
+        for ship in data["ships"]:
+            clerks = dict.fromkeys(holders[c][0] for c in ship["桥吊列表"] if c in holders)
+            ship_rows.append((wa, ship["船舶名称"], ship["大小"], ship["桥吊数量"], ", ".join(ship["桥吊列表"]),
+                              ship_leaders.get(ship["船舶名称"], ""), ", ".join(clerks)))
+
+        # 未分配与违规
+        if not _has_rows(df_result):
+            issues.append((wa, "未生成配工结果", wa, "该工作地未完成配工，详见配工警告"))
+        for ship in data["ships"]:
+            if ship["船舶名称"] not in ship_leaders:
+                issues.append((wa, "船舶未分配组长", ship["船舶名称"], f"{ship['大小']}，{ship['桥吊数量']}个桥吊"))
+        for c in data["all_cranes"]:
+            if c not in holders:
+                issues.append((wa, "桥吊无理货员", c, ", ".join(data["crane_to_ship"].get(c, []))))
+        for staff in remaining.get(wa, []):
+            issues.append((wa, "理货员待命", staff, "未分配桥吊"))
+        for level, text in messages.get(wa, []):
+            if level in ("warning", "error"):
+                issues.append((wa, "配工警告" if level == "warning" else "配工错误", "", text))
+
+    report[SUMMARY_SHEET] = pd.concat(summary, ignore_index=True) if summary else \
+        pd.DataFrame(columns=SUMMARY_COLUMNS)
+    report[CRANE_VIEW_SHEET] = pd.DataFrame(crane_rows, columns=CRANE_VIEW_COLUMNS)
+    report[SHIP_VIEW_SHEET] = pd.DataFrame(ship_rows, columns=SHIP_VIEW_COLUMNS)
+    report[ISSUE_SHEET] = pd.DataFrame(issues, columns=ISSUE_COLUMNS)
+    for name, df in (extra_sheets or {}).items():
+        if _has_rows(df):
+            report[name] = df
+    return report
+
+
+def _write_zip(report, target, suffix, write):
+    output = target if target is not None else BytesIO()
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, df in report.items():
+            if _has_rows(df):
+                with zf.open(f"{name}{suffix}", "w") as f:
+                    write(df, f)
+    if target is None:
+        return output.getvalue()
+
+
+def _write_csv(df, f):
+    # utf-8-sig：Excel 直接打开时中文不乱码
+    with TextIOWrapper(f, encoding="utf-8-sig", newline="") as text:
+        df.to_csv(text, index=False)
+
+
+def _write_parquet(df, f):
+    # 混合类型的文本列统一转为字符串，避免列类型推断失败
+    df = df.astype({col: "string" for col in df.columns if df[col].dtype == object})
+    df.to_parquet(f, index=False, engine=PARQUET_ENGINE)
+
+
+@traced("导出报表")
+def export_report(report, fmt="xlsx", target=None):
+    """按格式写出报表，target为空时返回字节内容
+
+    xlsx 为一个多工作表的工作簿；csv/parquet 为每张工作表一个文件的 zip 包。
+    """
+    if fmt == "xlsx":
+        return write_sheets(report, target)
+    if fmt == "csv":
+        return _write_zip(report, target, ".csv", _write_csv)
+    if fmt == "parquet":
+        if PARQUET_ENGINE is None:
+            raise ValueError("导出Parquet需要安装 pyarrow 或 fastparquet")
+        return _write_zip(report, target, ".parquet", _write_parquet)
+    raise ValueError(f"不支持的导出格式：{fmt}（可选：{'、'.join(EXPORT_FORMATS)}）")
+
+
+def report_filename(stem, fmt):
+    """导出文件名：<stem><扩展名>"""
+    return f"{stem}{EXPORT_FORMATS[fmt][1]}"
@@ -0,0 +1,81 @@
+"""Excel工作簿读取：按关键字匹配工作表，只打开一次文件解析全部所需工作表并统一清洗
+
+    frames, missing = read_workbook("配工.xlsx")                    # missing 非空时 frames 为None
+    frames, missing = read_workbook(source, required=SCHEDULE_SHEETS)  # 多日配工的每日船期工作簿
+
+清洗后的DataFrame保留原行索引，excel_rows 换算为Excel行号用于定位问题；
+结果表中逗号分隔的船舶/桥吊列表统一由 split_list 拆分。
+"""
+import pandas as pd
+
+from diagnostics import traced
+
+# 必需的工作表（按关键字匹配实际工作表名称）
+REQUIRED_SHEETS = [
+    "泊位与桥吊关联表",
+    "船舶与桥吊关联表",
+    "人员信息表",
+    "四期-组长带船限制",
+    "理货员桥吊负责规则",
+]
+
+# 每日船期工作表：多日配工时可只提供这两张，其余沿用人员与规则工作簿
+SCHEDULE_SHEETS = ["泊位与桥吊关联表", "船舶与桥吊关联表"]
+
+
+def match_sheet_names(sheet_names):
+    """按关键字匹配工作表名称，返回（匹配结果，缺失的工作表列表）
+
+    名称（去除首尾空白后）与关键字相同的工作表优先，否则取第一个包含关键字的工作表。
+    """
+    sheet_name_map = {}
+    missing = []
+    for key in REQUIRED_SHEETS:
+        matches = [s for s in sheet_names if s.strip() == key] or [s for s in sheet_names if key in s]
+        if matches:
+            sheet_name_map[key] = matches[0]
+        else:
+            missing.append(key)
+    return sheet_name_map, missing
+
+
+def clean_frame(df):
+    """清洗工作表：去除表头及文本单元格首尾空白，删除整行为空的行（保留原行索引）"""
+    df = df.dropna(how="all")
+    df.columns = [str(c).strip() for c in df.columns]
+    for col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].map(lambda v: v.strip() if isinstance(v, str) else v)
+    return df
+
+
+def excel_rows(df):
+    """各数据行在Excel中的行号（表头为第1行）"""
+    return df.index.to_numpy() + 2
+
+
+def split_list(value, upper=False):
+    """拆分以逗号（含全角逗号）分隔的船舶/桥吊列表，去除空白和空值，upper 为真时转为大写"""
+    if not isinstance(value, str):
+        value = "" if pd.isna(value) else str(value)
+    if upper:
+        value = value.upper()
+    return [v.strip() for v in value.replace("，", ",").split(",") if v.strip()]
+
+
+@traced("解析Excel", lambda result, source, *args, **kwargs: {
+    "工作表": len(result[0] or {}), "行数": sum(len(df) for df in (result[0] or {}).values())})
+def read_workbook(source, required=None):
+    """只打开一次Excel文件，一次性解析全部必需工作表
+
+    required 为必须存在的工作表（默认 REQUIRED_SHEETS 全部），其余已知工作表存在时一并读取。
+    返回（工作表名 -> 清洗后的DataFrame，缺失的工作表列表）；有缺失时前者为None。
+    """
+    required = REQUIRED_SHEETS if required is None else required
+    with pd.ExcelFile(source) as xls:
+        sheet_name_map, _ = match_sheet_names(xls.sheet_names)
+        missing = [key for key in required if key not in sheet_name_map]
+        if missing:
+            return None, missing
+        frames = {key: clean_frame(xls.parse(name)) for key, name in sheet_name_map.items()}
+    return frames, []
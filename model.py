@@ -0,0 +1,139 @@
+"""配工内存模型：桥吊、船舶按工作地编号为整数，分配与匹配都在整数上进行
+
+    model = workarea_data["四期"]["model"]          # build_workarea_data 建立，每个工作地一个
+    model.cranes[k]                                # 编号 k 的桥吊号
+    model.ship_bits[i]                             # 第 i 艘船的桥吊位集合
+    alloc = Allocation(); alloc.add(model, i)      # 组长分配只记录船舶编号和桥吊位集合
+
+桥吊编号即该工作地桥吊在岸线上的位置顺序（泊位表中自上而下、每行从左到右，未登记的排在最后，
+同 workarea_data 的 all_cranes），相邻编号即相邻桥吊，理货员按编号连续切分；
+桥吊集合用Python整数作位集合（第 k 位对应编号 k），合并即按位或，天然去重且解码后保持顺序。
+桥吊号、船舶名称只保存一份（sys.intern），需要名称时再按编号解码；to_dict 得到可直接
+序列化（JSON等）的普通结构。
+"""
+import sys
+
+import numpy as np
+
+
+def bits_of(ids):
+    """桥吊编号序列 -> 位集合"""
+    bits = 0
+    for k in ids:
+        bits |= 1 << int(k)
+    return bits
+
+
+def iter_bits(bits):
+    """按编号从小到大产出位集合中的桥吊编号"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def popcount(bits):
+    return bin(bits).count("1")
+
+
+class WorkareaModel:
+    """单个工作地的列式模型
+
+    cranes：桥吊号列表，序号即桥吊编号；crane_ids：桥吊号 -> 编号
+    ship_names / ship_large：船舶名称、是否大船（按船舶表顺序，序号即船舶编号）
+    ship_ptr / ship_cranes：CSR格式的船舶 -> 桥吊编号，第 i 艘船为 ship_cranes[ship_ptr[i]:ship_ptr[i + 1]]
+    ship_bits：每艘船的桥吊位集合
+    crane_berth：每个桥吊所在泊位（泊位表中的行序号，未登记为-1），相邻桥吊泊位不同即需换泊位走动
+    """
+
+    __slots__ = ("cranes", "crane_ids", "crane_berth", "ship_names", "ship_large", "ship_ptr", "ship_cranes",
+                 "ship_bits")
+
+    def __init__(self, cranes, ship_names, ship_large, ship_ptr, ship_cranes, crane_berth=None):
+        self.cranes = [sys.intern(str(c)) for c in cranes]
+        self.crane_ids = {c: k for k, c in enumerate(self.cranes)}
+        self.crane_berth = (np.full(len(self.cranes), -1, dtype=np.int32) if crane_berth is None
+                            else np.asarray(crane_berth, dtype=np.int32))
+        self.ship_names = [sys.intern(str(s)) for s in ship_names]
+        self.ship_large = np.asarray(ship_large, dtype=bool)
+        self.ship_ptr = np.asarray(ship_ptr, dtype=np.int32)
+        self.ship_cranes = np.asarray(ship_cranes, dtype=np.int32)
+        self.ship_bits = [bits_of(self.ship_cranes[self.ship_ptr[i]:self.ship_ptr[i + 1]])
+                          for i in range(len(self.ship_names))]
+
+    @property
+    def num_cranes(self):
+        return len(self.cranes)
+
+    @property
+    def num_ships(self):
+        return len(self.ship_names)
+
+    def crane_ids_of(self, ship):
+        """第 ship 艘船的桥吊编号（按船舶表中的顺序）"""
+        return self.ship_cranes[self.ship_ptr[ship]:self.ship_ptr[ship + 1]]
+
+    def crane_names(self, ids):
+        """桥吊编号序列或位集合 -> 桥吊号列表"""
+        if isinstance(ids, int):
+            ids = iter_bits(ids)
+        return [self.cranes[k] for k in ids]
+
+    def crane_ships(self):
+        """每个桥吊所属船舶的位集合（第 i 位对应第 i 艘船）"""
+        masks = [0] * self.num_cranes
+        for i in range(self.num_ships):
+            for k in self.crane_ids_of(i):
+                masks[k] |= 1 << i
+        return masks
+
+    def ship_index(self):
+        """船舶名称 -> 编号（同名船舶取第一艘）"""
+        index = {}
+        for i, name in enumerate(self.ship_names):
+            index.setdefault(name, i)
+        return index
+
+    def to_dict(self):
+        return {
+            "cranes": list(self.cranes),
+            "crane_berths": self.crane_berth.tolist(),
+            "ships": [{"name": name, "large": bool(large), "cranes": self.crane_ids_of(i).tolist()}
+                      for i, (name, large) in enumerate(zip(self.ship_names, self.ship_large))],
+        }
+
+
+class Allocation:
+    """一位组长的带船分配：船舶编号列表、大/小船数、桥吊位集合"""
+
+    __slots__ = ("ships", "large_count", "small_count", "crane_bits")
+
+    def __init__(self):
+        self.ships = []
+        self.large_count = 0
+        self.small_count = 0
+        self.crane_bits = 0
+
+    def add(self, model, ship):
+        """加入第 ship 艘船"""
+        self.ships.append(ship)
+        if model.ship_large[ship]:
+            self.large_count += 1
+        else:
+            self.small_count += 1
+        self.crane_bits |= model.ship_bits[ship]
+
+    @property
+    def crane_count(self):
+        return popcount(self.crane_bits)
+
+    def ship_names(self, model):
+        return [model.ship_names[i] for i in self.ships]
+
+    def to_dict(self, model):
+        return {
+            "ships": self.ship_names(model),
+            "large_count": self.large_count,
+            "small_count": self.small_count,
+            "cranes": model.crane_names(self.crane_bits),
+        }
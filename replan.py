@@ -0,0 +1,338 @@
+"""增量重排：在上一次配工结果的基础上，只调整受变化影响的组长和理货员
+
+变化（人员请假/新增、船舶离泊/新靠、桥吊调整）由新工作簿与上次结果比对得出：
+    1. 仍可用的组长保留原有且仍在港的船舶，离岗组长的船舶与新靠泊船舶按均衡规则补充分配；
+    2. 仍可用的理货员保留原有且仍存在的桥吊（不超过个人上限），与组长之间按桥吊归属重新匹配；
+       空出的桥吊先补给负责相邻桥吊且未满的理货员，不足时从待命理货员中补充；
+    3. 未受影响的组长和理货员保持不变，输出逐项变更清单。
+"""
+import heapq
+import random
+
+import pandas as pd
+
+from constraints import compile_constraints
+from engine import (RESULT_SHEETS, allocate_ships_to_leaders, allocation_rows, build_workarea_data, crane_policy,
+                    match_staff_to_leaders, parse_crane_tables, report_violations, summarize_staff)
+from export import SUMMARY_SHEET
+from loader import split_list
+from model import Allocation
+
+# 上次配工结果必需的列
+PLAN_COLUMNS = ["工作地", "理货组长", "负责船舶", "理货员", "负责桥吊"]
+
+# 变更清单列
+CHANGE_COLUMNS = ["工作地", "对象类型", "名称", "变更", "原安排", "新安排"]
+
+
+def read_plan(source):
+    """读取上次导出的配工结果（各工作地结果工作表合并为一张表）"""
+    return plan_from_sheets(pd.read_excel(source, sheet_name=None))
+
+
+def plan_from_sheets(sheets):
+    """从已读取的工作表（工作表名 -> DataFrame）中取出配工结果，合并为一张表
+
+    结果表只在理货员行上列出组长的船舶，没有理货员的组长只见于组长汇总工作表，
+    因此有组长汇总时，每位组长另追加一行（理货员、负责桥吊为空），作为组长负责船舶的依据。
+    """
+    frames = [df for name, df in sheets.items()
+              if name in RESULT_SHEETS.values() or set(PLAN_COLUMNS) <= set(df.columns)]
+    if not frames:
+        raise ValueError(f"未找到配工结果工作表：{'、'.join(RESULT_SHEETS.values())}")
+    df = pd.concat(frames, ignore_index=True)
+    missing = [c for c in PLAN_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"配工结果缺少列：{'、'.join(missing)}")
+    leaders = sheets.get(SUMMARY_SHEET)
+    if leaders is not None and {"工作地", "理货组长", "负责船舶"} <= set(leaders.columns):
+        df = pd.concat([df, leader_rows(leaders)], ignore_index=True)
+    return df
+
+
+def leader_rows(df_leaders, workarea=None):
+    """组长分配（组长汇总，或单个工作地的组长分配详情并指定 workarea）整理为结果表格式的组长行"""
+    if workarea is not None:
+        df_leaders = df_leaders.assign(工作地=workarea)
+    return df_leaders[["工作地", "理货组长", "负责船舶"]].assign(理货员="", 负责桥吊="").reindex(columns=PLAN_COLUMNS)
+
+
+def plan_state(df_plan, workarea):
+    """由结果表还原单个工作地的分配状态
+
+    组长负责的船舶以组长行（理货员为空，见 plan_from_sheets）为准；没有组长行时（只有结果
+    工作表的旧文件）由理货员行还原，此时没有理货员的组长的船舶无从得知，视为未分配。
+    返回 {"leader_ships": 组长 -> 船舶列表, "clerk_leader": 理货员 -> 组长,
+    "clerk_cranes": 理货员 -> 桥吊列表}，字典顺序即结果表中的顺序。
+    """
+    state = {"leader_ships": {}, "clerk_leader": {}, "clerk_cranes": {}}
+    owned = {}
+    rows = df_plan[df_plan["工作地"] == workarea]
+    for leader, ships, staff, cranes in zip(rows["理货组长"], rows["负责船舶"], rows["理货员"], rows["负责桥吊"]):
+        leader = leader.strip() if isinstance(leader, str) and leader.strip() != "未分配组长" else None
+        if not isinstance(staff, str) or not staff.strip():
+            if leader is not None:
+                owned.setdefault(leader, split_list(ships))
+            continue
+        staff = staff.strip()
+        if leader is not None:
+            state["leader_ships"].setdefault(leader, split_list(ships))
+        state["clerk_leader"][staff] = leader
+        state["clerk_cranes"][staff] = split_list(cranes)
+    if owned:
+        state["leader_ships"] = owned
+    return state
+
+
+def _fill(staff_crane_map, cranes, limits, num_cranes):
+    """把空余桥吊（编号）补给理货员，返回补不下的桥吊编号
+
+    优先补给负责相邻桥吊且未满的理货员，其次补给桥吊最少且未满的理货员。
+    """
+    holder = {c: s for s, held in staff_crane_map.items() for c in held}
+    heap = [(len(held), i, s) for i, (s, held) in enumerate(staff_crane_map.items()) if len(held) < limits[s][1]]
+    heapq.heapify(heap)
+    leftover = []
+    for c in cranes:
+        neighbours = (n for n in (c - 1, c + 1) if 0 <= n < num_cranes)
+        target = next((holder[n] for n in neighbours
+                       if n in holder and len(staff_crane_map[holder[n]]) < limits[holder[n]][1]), None)
+        while target is None and heap:
+            count, i, s = heapq.heappop(heap)
+            if count != len(staff_crane_map[s]):  # 已通过相邻桥吊补充过，按最新数量重新入堆
+                if len(staff_crane_map[s]) < limits[s][1]:
+                    heapq.heappush(heap, (len(staff_crane_map[s]), i, s))
+                continue
+            target = s
+            if count + 1 < limits[s][1]:
+                heapq.heappush(heap, (count + 1, i, s))
+        if target is None:
+            leftover.append(c)
+            continue
+        staff_crane_map[target].append(c)
+        holder[c] = target
+    for held in staff_crane_map.values():
+        held.sort()
+    return leftover
+
+
+def _top_up(staff_crane_map, staff, limits):
+    """桥吊数低于下限的理货员从桥吊富余的理货员处调剂，返回是否达到下限
+
+    只调剂出让人桥吊段两端、且与本人桥吊在岸线上相邻的桥吊（本人尚无桥吊时不要求相邻），
+    同等条件下取富余最多的出让人，调剂后双方的桥吊仍保持连续。
+    """
+    held = staff_crane_map[staff]
+    while len(held) < limits[staff][0]:
+        candidates = [(len(cranes) - limits[o][0], -c, o, c)
+                      for o, cranes in staff_crane_map.items() if o != staff and len(cranes) > limits[o][0]
+                      for c in {min(cranes), max(cranes)} if not held or c - 1 in held or c + 1 in held]
+        if not candidates:
+            return False
+        *_, donor, crane = max(candidates)
+        staff_crane_map[donor].remove(crane)
+        held.append(crane)
+    return True
+
+
+def replan_workarea(workarea, state, data, leaders, staff, constraints, rng, use_all_staff):
+    """对单个工作地做增量重排
+
+    state 为 plan_state 还原的上次分配，data/leaders/staff 为新工作簿中该工作地的
+    船舶数据、可用组长和可用理货员。返回（配工结果DataFrame，剩余待命理货员，
+    组长分配详情DataFrame，提示信息列表）。
+
+    “增量”指结果上只改动受影响的部分，计算上每次仍按新工作簿重建整个工作地的分配，
+    再对全部理货员重新匹配组长、核对规则：保留原分配的步骤已保证未受影响的人员不变，
+    而变化可能间接影响其他人（如组长离岗后其船舶分给他人，相邻理货员的组长随之改变），
+    全量匹配和核对才不会漏掉；单日数据量下（合成的240艘船、4个工作地）整个重排约0.1秒。
+    """
+    messages = []
+    model = data["model"]
+    ships = model.ship_index()
+    staff_set = set(staff)
+    limits = {s: constraints.clerk_limits(workarea, s) for s in staff}
+
+    # 变化概况
+    prev_ships = {ship for ship_list in state["leader_ships"].values() for ship in ship_list}
+    gone_leaders = [l for l in state["leader_ships"] if l not in set(leaders)]
+    gone_staff = [s for s in state["clerk_cranes"] if s not in staff_set]
+    new_staff = [s for s in staff if s not in state["clerk_cranes"]]
+    gone_ships = sorted(prev_ships - ships.keys())
+    new_ships = [name for name in ships if name not in prev_ships]
+    for label, names in (("离岗组长", gone_leaders), ("减少理货员", gone_staff), ("新增理货员", new_staff),
+                         ("离港船舶", gone_ships), ("上次未分配组长的船舶", new_ships)):
+        if names:
+            messages.append(("info", f"{workarea}{label}{len(names)}：{', '.join(names)}"))
+
+    # 1. 组长：保留仍可用组长的在港船舶（不超过带船上限），其余船舶按均衡规则补充分配
+    caps = constraints.leader_caps(workarea, leaders)
+    leader_caps = dict(zip(leaders, caps))
+    leader_allocations = {l: Allocation() for l in leaders}
+    placed = set()
+    for leader, ship_list in state["leader_ships"].items():
+        if leader not in leader_allocations:
+            continue
+        alloc = leader_allocations[leader]
+        cap_total, cap_large, cap_small = leader_caps[leader]
+        for name in ship_list:
+            i = ships.get(name)
+            if i is None or i in placed:
+                continue
+            large = model.ship_large[i]
+            size_count = alloc.large_count if large else alloc.small_count
+            size_cap = cap_large if large else cap_small
+            if (cap_total is not None and len(alloc.ships) >= cap_total) or \
+                    (size_cap is not None and size_count >= size_cap):
+                continue
+            alloc.add(model, i)
+            placed.add(i)
+    orphans = [i for i in range(model.num_ships) if i not in placed]
+    unassigned_ships = []
+    if orphans and leaders:
+        leader_allocations, unassigned_ships = allocate_ships_to_leaders(
+            leaders, model, orphans, rng, caps, leader_allocations)
+    elif orphans:
+        unassigned_ships = orphans
+    if unassigned_ships:
+        names = [model.ship_names[i] for i in unassigned_ships]
+        messages.append(("warning", f"{workarea}有{len(names)}艘船舶未能分配组长：{', '.join(names)}"))
+
+    # 2. 理货员：保留仍可用理货员的在港桥吊（按编号），理货员与组长之间仍按桥吊归属匹配
+    crane_ids = model.crane_ids
+    staff_crane_map, held, pool = {}, set(), []
+    for s, cranes in state["clerk_cranes"].items():
+        if s not in staff_set:
+            continue
+        kept = [crane_ids[c] for c in cranes if c in crane_ids and crane_ids[c] not in held][:limits[s][1]]
+        if kept:
+            staff_crane_map[s] = kept
+            held.update(kept)
+        else:
+            pool.append(s)
+    pool.extend(new_staff)
+
+    # 3. 空出的桥吊先补给原有理货员，不足时从待命理货员中补充
+    free = [c for c in range(model.num_cranes) if c not in held]
+    leftover = _fill(staff_crane_map, free, limits, model.num_cranes) if free else []
+    while leftover and pool:
+        s = pool.pop(0)
+        staff_crane_map[s], leftover = leftover[:limits[s][1]], leftover[limits[s][1]:]
+
+    # 低于下限的理货员先调剂桥吊，仍不足则把桥吊交给其他人并转为待命
+    for s in [s for s, cranes in staff_crane_map.items() if len(cranes) < limits[s][0]]:
+        if _top_up(staff_crane_map, s, limits):
+            continue
+        cranes = staff_crane_map.pop(s)
+        rest = _fill(staff_crane_map, cranes, limits, model.num_cranes)
+        if rest:
+            staff_crane_map[s] = rest
+        else:
+            pool.append(s)
+    if leftover:
+        messages.append(("warning", f"{workarea}有{len(leftover)}个桥吊无理货员负责：{', '.join(model.crane_names(leftover))}，"
+                                    "变化较大时建议重新配工"))
+
+    # 四期要求全员上岗：待命理货员从桥吊富余的理货员处分出桥吊
+    if use_all_staff:
+        for s in list(pool):
+            spare = sum(len(cranes) - limits[o][0] for o, cranes in staff_crane_map.items())
+            if spare < limits[s][0]:
+                continue
+            staff_crane_map[s] = []
+            if _top_up(staff_crane_map, s, limits):
+                pool.remove(s)
+                continue
+            # 富余桥吊不在可调剂的位置上，凑不足下限：桥吊退回相邻理货员，退不回的仍由本人负责
+            cranes = staff_crane_map.pop(s)
+            rest = _fill(staff_crane_map, cranes, limits, model.num_cranes) if cranes else []
+            if rest:
+                staff_crane_map[s] = rest
+                pool.remove(s)
+                messages.append(("warning", f"{workarea}理货员{s}只分到{len(rest)}个桥吊，低于下限{limits[s][0]}个"))
+            else:
+                messages.append(("warning", f"{workarea}理货员{s}无法从相邻理货员处调剂到{limits[s][0]}个桥吊，转为待命"))
+        if pool:
+            messages.append(("warning", f"{workarea}有{len(pool)}名理货员暂无可分配桥吊：{', '.join(pool)}"))
+    for cranes in staff_crane_map.values():
+        cranes.sort()
+
+    violations = report_violations(workarea, constraints, leader_allocations, staff_crane_map, messages)
+    final_result = match_staff_to_leaders(workarea, model, staff_crane_map, leader_allocations, messages)
+    remaining = [s for s in staff if s not in staff_crane_map]
+    df_result = pd.DataFrame(final_result)
+    df_result.attrs["violations"] = violations
+    return df_result, remaining, pd.DataFrame(allocation_rows(model, leader_allocations)), messages
+
+
+def diff_plans(workarea, state, df_result, df_detail=None):
+    """比较上次分配与重排结果，返回逐项变更（只列出发生变化的船舶和理货员）
+
+    df_detail 为重排后的组长分配详情，组长负责的船舶以其为准（没有理货员的组长也能比对）。
+    """
+    frames = [df for df in (df_result, None if df_detail is None or df_detail.empty else leader_rows(df_detail, workarea))
+              if df is not None and not df.empty]
+    new_state = plan_state(pd.concat(frames, ignore_index=True), workarea) if frames else \
+        {"leader_ships": {}, "clerk_leader": {}, "clerk_cranes": {}}
+    changes = []
+
+    def ship_leaders(s):
+        return {ship: leader for leader, ships in s["leader_ships"].items() for ship in ships}
+
+    old_ships, new_ships = ship_leaders(state), ship_leaders(new_state)
+    for ship in list(old_ships) + [s for s in new_ships if s not in old_ships]:
+        old, new = old_ships.get(ship, ""), new_ships.get(ship, "")
+        if old != new:
+            kind = "分配组长" if not old else "移除" if not new else "调整组长"
+            changes.append((workarea, "船舶", ship, kind, old, new))
+
+    def describe(s, staff):
+        return f"{s['clerk_leader'][staff] or '未分配组长'}：{', '.join(s['clerk_cranes'][staff])}"
+
+    old_staff, new_staff = state["clerk_cranes"], new_state["clerk_cranes"]
+    for staff in list(old_staff) + [s for s in new_staff if s not in old_staff]:
+        if staff not in new_staff:
+            changes.append((workarea, "理货员", staff, "移除", describe(state, staff), ""))
+        elif staff not in old_staff:
+            changes.append((workarea, "理货员", staff, "新增", "", describe(new_state, staff)))
+        elif (state["clerk_leader"][staff] != new_state["clerk_leader"][staff]
+              or old_staff[staff] != new_staff[staff]):
+            changes.append((workarea, "理货员", staff, "调整", describe(state, staff), describe(new_state, staff)))
+    return changes
+
+
+def replan(df_plan, frames, seed=None):
+    """基于上次配工结果和新工作簿做增量重排
+
+    df_plan 为 read_plan 读取的上次结果，frames 同 loader.read_workbook 的返回。
+    返回字典：results/details/messages/remaining/workarea_data（同 engine.run_schedule），
+    changes 为变更清单DataFrame（列见 CHANGE_COLUMNS）。
+    """
+    staff_summary = summarize_staff(frames["人员信息表"])
+    leader_available = staff_summary["available"]["理货组长"]
+    staff_available = staff_summary["available"]["理货员"]
+    workarea_data = build_workarea_data(parse_crane_tables(frames["泊位与桥吊关联表"], frames["船舶与桥吊关联表"]))
+    constraints = compile_constraints(frames["四期-组长带船限制"], frames["理货员桥吊负责规则"],
+                                      known_people=frames["人员信息表"]["姓名"])
+    rng = random.Random(seed)
+
+    results, details, messages, remaining, changes = {}, {}, {}, {}, []
+    for wa, data in workarea_data.items():
+        state = plan_state(df_plan, wa)
+        df_result, staff_left, df_detail, msgs = replan_workarea(
+            wa, state, data, leader_available.get(wa, []), staff_available.get(wa, []),
+            constraints, rng, use_all_staff=crane_policy(wa)["use_all_staff"]
+        )
+        wa_changes = diff_plans(wa, state, df_result, df_detail)
+        msgs.append(("success", f"{wa}增量重排完成：变更{len(wa_changes)}项，其余保持不变"))
+        results[wa], details[wa], messages[wa], remaining[wa] = df_result, df_detail, msgs, staff_left
+        changes.extend(wa_changes)
+
+    return {
+        "results": results,
+        "details": details,
+        "messages": messages,
+        "remaining": remaining,
+        "workarea_data": workarea_data,
+        "changes": pd.DataFrame(changes, columns=CHANGE_COLUMNS),
+    }
@@ -0,0 +1,184 @@
+"""多日配工：逐日配工并累计每人负荷，按历史负荷轮换大船和桥吊
+
+    with HistoryStore("配工历史.sqlite") as store:
+        for day, result in plan_days(read_days(每日工作簿, base="人员与规则.xlsx"), store, seed=0):
+            ...
+        fairness_report(store)
+
+每天配工前从历史库取出每人的累计负荷（见 HistoryStore.loads），当日船舶数相同的组长中
+历史大船少的优先分到大船，理货员按历史桥吊数从少到多上岗并优先分到多出的桥吊；
+配工后把当日每位可用人员（含待命）的上岗情况、船舶、大船、桥吊数及加班（申请加班且已上岗）
+写回历史库。负荷按可用天数折算为日均值，请假多的人不会因累计值低而被集中安排重活，
+按需派员的工作地中待命多的理货员日均桥吊少，次日优先上岗。
+历史库按人保存累计值，每天只读写一次当日人员，整月配工的用时随天数线性增长。
+优化求解模式下组长分配由求解器决定，历史负荷只影响理货员的上岗顺序。
+"""
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+from engine import run_schedule
+from loader import REQUIRED_SHEETS, SCHEDULE_SHEETS, read_workbook
+
+# 人员与规则工作簿中必需的工作表
+BASE_SHEETS = [key for key in REQUIRED_SHEETS if key not in SCHEDULE_SHEETS]
+
+# 负荷汇总列
+HISTORY_COLUMNS = ["姓名", "岗位", "可用天数", "上岗天数", "船舶数", "大船数", "桥吊数", "加班天数",
+                   "日均船舶", "日均大船", "日均桥吊"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assignments (
+    day TEXT NOT NULL, name TEXT NOT NULL, workarea TEXT, role TEXT,
+    worked INTEGER, ships INTEGER, large_ships INTEGER, cranes INTEGER, overtime INTEGER,
+    PRIMARY KEY (day, name)
+);
+CREATE TABLE IF NOT EXISTS totals (
+    name TEXT PRIMARY KEY, role TEXT,
+    days INTEGER, worked INTEGER, ships INTEGER, large_ships INTEGER, cranes INTEGER, overtime INTEGER
+);
+"""
+
+_ACCUMULATE = """
+INSERT INTO totals (name, role, days, worked, ships, large_ships, cranes, overtime) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(name) DO UPDATE SET
+    role = excluded.role, days = days + excluded.days, worked = worked + excluded.worked, ships = ships + excluded.ships,
+    large_ships = large_ships + excluded.large_ships, cranes = cranes + excluded.cranes,
+    overtime = overtime + excluded.overtime
+"""
+
+
+class HistoryStore:
+    """本地SQLite配工历史
+
+    assignments：每天每位可用人员一行（日期，姓名，工作地，岗位，上岗，船舶数，大船数，桥吊数，加班）
+    totals：每人累计值，随 record_day 增量更新，配工时只读这张表
+    path 为 ":memory:" 时不落盘（只在本次运行内轮换）。
+    """
+
+    def __init__(self, path=":memory:"):
+        self.conn = sqlite3.connect(str(path))
+        self.conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def days(self):
+        """已记录的日期（升序）"""
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT day FROM assignments ORDER BY day")]
+
+    def record_day(self, day, rows):
+        """写入一天的配工记录，rows 为（姓名，工作地，岗位，上岗，船舶数，大船数，桥吊数，加班）
+
+        同一天重复写入时替换该天原有记录，累计值先扣除再加回。
+        """
+        with self.conn:
+            old = self.conn.execute(
+                "SELECT name, role, -1, -worked, -ships, -large_ships, -cranes, -overtime FROM assignments WHERE day = ?",
+                (day,)).fetchall()
+            self.conn.executemany(_ACCUMULATE, old)
+            self.conn.execute("DELETE FROM assignments WHERE day = ?", (day,))
+            self.conn.executemany("INSERT INTO assignments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                  [(day, *row) for row in rows])
+            self.conn.executemany(_ACCUMULATE, [(name, role, 1, *counts) for name, _, role, *counts in rows])
+
+    def totals(self):
+        """每人累计负荷（列见 HISTORY_COLUMNS 前八列）"""
+        return pd.DataFrame(
+            self.conn.execute("SELECT name, role, days, worked, ships, large_ships, cranes, overtime FROM totals "
+                              "WHERE days > 0 ORDER BY role, name").fetchall(),
+            columns=HISTORY_COLUMNS[:8])
+
+    def loads(self):
+        """姓名 -> 历史负荷，供 engine.assign_work 排序（越小越优先）
+
+        按可用天数折算为日均值：组长为（日均大船，日均船舶，加班天数），
+        理货员为（日均桥吊，加班天数）。
+        """
+        loads = {}
+        for name, role, days, ships, large, cranes, overtime in self.conn.execute(
+                "SELECT name, role, days, ships, large_ships, cranes, overtime FROM totals WHERE days > 0"):
+            if role == "理货组长":
+                loads[name] = (large / days, ships / days, overtime)
+            else:
+                loads[name] = (cranes / days, overtime)
+        return loads
+
+
+def day_records(result):
+    """由 run_schedule 的结果整理当日每位可用人员的负荷记录（见 HistoryStore.record_day）"""
+    overtime = set(result["status"].get("申请加班", []))
+    leader_load, staff_cranes = {}, {}
+    for df_detail in result["details"].values():
+        if df_detail is not None and not df_detail.empty:
+            leader_load.update(zip(df_detail["理货组长"], zip(df_detail["总船舶数"], df_detail["大船数"])))
+    for df_result in result["results"].values():
+        if df_result is not None and not df_result.empty:
+            staff_cranes.update(zip(df_result["理货员"], df_result["桥吊数量"]))
+
+    rows = []
+    for wa in result["workarea_data"]:
+        for leader in result["leader_available"].get(wa, []):
+            ships, large = leader_load.get(leader, (0, 0))
+            # 组长汇总列出全部可用组长，带船数为0的当天并未上岗
+            worked = int(ships > 0)
+            rows.append((leader, wa, "理货组长", worked, int(ships), int(large), 0, worked * (leader in overtime)))
+    for wa in result["workarea_data"]:
+        for staff in result["staff_original"].get(wa, []):
+            worked = int(staff_cranes.get(staff, 0) > 0)
+            rows.append((staff, wa, "理货员", worked, 0, 0, int(staff_cranes.get(staff, 0)),
+                         worked * (staff in overtime)))
+    return rows
+
+
+def read_days(paths, base=None):
+    """逐个读取每日工作簿，依次产出（日期，工作表名 -> DataFrame）
+
+    日期取文件名（不含扩展名），按传入顺序配工。base 为人员与规则工作簿时，每日工作簿
+    只需包含 SCHEDULE_SHEETS，其余工作表（如当日另附的人员信息表）存在时覆盖 base 中的同名表。
+    """
+    base_frames = None
+    if base is not None:
+        base_frames, missing = read_workbook(base, required=BASE_SHEETS)
+        if missing:
+            raise ValueError(f"{base} 未找到工作表：{'、'.join(missing)}")
+    for path in paths:
+        frames, missing = read_workbook(path, required=SCHEDULE_SHEETS if base_frames is not None else None)
+        if missing:
+            raise ValueError(f"{path} 未找到工作表：{'、'.join(missing)}")
+        if base_frames is not None:
+            frames = {**base_frames, **frames}
+        yield Path(path).stem, frames
+
+
+def plan_days(days, store, seed=None, mode="greedy", time_budget=5.0, jobs=1):
+    """按历史负荷逐日配工，依次产出（日期，run_schedule 的结果）
+
+    days 为（日期，工作表）序列（见 read_days），store 为 HistoryStore；每天配工后立即写入历史，
+    调用方逐日导出后即可释放当天结果。seed 指定时第 i 天使用 seed + i。
+    历史按姓名累计，人员信息表中姓名重复时抛出 ValueError。
+    """
+    for i, (day, frames) in enumerate(days):
+        names = frames["人员信息表"]["姓名"].dropna()
+        duplicated = names[names.duplicated()].unique()
+        if len(duplicated):
+            raise ValueError(f"{day} 人员信息表姓名重复：{'、'.join(map(str, duplicated))}")
+        result = run_schedule(frames, seed=None if seed is None else seed + i, mode=mode,
+                              time_budget=time_budget, jobs=jobs, loads=store.loads())
+        store.record_day(day, day_records(result))
+        yield day, result
+
+
+def fairness_report(store):
+    """负荷汇总：每人累计值及日均值（列见 HISTORY_COLUMNS）"""
+    df = store.totals()
+    days = df["可用天数"].where(df["可用天数"] > 0)
+    return df.assign(日均船舶=(df["船舶数"] / days).round(2), 日均大船=(df["大船数"] / days).round(2),
+                     日均桥吊=(df["桥吊数"] / days).round(2))
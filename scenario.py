@@ -0,0 +1,243 @@
+"""方案对比（假设分析）：在同一份上传数据上试算多个方案，比较均衡程度和未分配数量
+
+    base = prepare_base(frames)                                 # 只解析一次
+    overview, detail = compare_scenarios(base, [
+        {"名称": "增加2名组长", "增加组长": {"四期": 2}},
+        {"名称": "每人3-7个桥吊", "理货员桥吊数": {"四期": [3, 7]}},
+        {"名称": "A轮改到自动化", "调整船舶": [{"船舶": "A轮", "工作地": "自动化", "桥吊": ["Z01", "Z02"]}]},
+    ], jobs=4)
+
+每个方案是在基准数据上的一组修改（见 SCENARIO_KEYS），结果第一行固定为未做修改的“基准”。
+方案只复制被修改的部分：人员名单只复制改动的工作地，规则表复制规则字典，调整船舶时只重建
+涉及的工作地，其余工作地直接沿用基准的 WorkareaModel。默认在进程池中并行试算，
+基准数据在每个工作进程启动时传入一次，方案本身只传递修改内容。
+"""
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from constraints import ANY, SIZE_TOTAL, compile_constraints
+from diagnostics import traced
+from engine import (LARGE_SHIP_CRANES, assign_workareas, build_workarea_data, clean_crane_name, parse_crane_tables,
+                    summarize_staff)
+
+BASE_NAME = "基准"
+
+# 方案中可用的修改项
+SCENARIO_KEYS = {
+    "名称": "方案名称",
+    "增加组长": "工作地 -> 人数，临时增加的组长（以“<工作地>新增组长N”占位）",
+    "增加理货员": "工作地 -> 人数，临时增加的理货员（以“<工作地>新增理货员N”占位）",
+    "减少人员": "姓名列表，视为请假，不参与配工",
+    "理货员桥吊数": "[最少, 最多]，或 工作地 -> [最少, 最多]，替代该工作地的理货员桥吊负责规则（个人规则仍有效）",
+    "组长带船上限": "整数，或 工作地 -> 整数，替代该工作地组长的最多带船数（合计）",
+    "调整船舶": "[{船舶, 工作地, 桥吊（可选）}]，船舶改到其他工作地作业，指定桥吊时改用这些桥吊",
+    "种子": "该方案使用的随机种子（默认同基准）",
+}
+
+# 方案示例（页面中作为输入框的初始内容）
+SCENARIO_EXAMPLE = [
+    {"名称": "四期增加2名组长", "增加组长": {"四期": 2}},
+    {"名称": "四期每人3-7个桥吊", "理货员桥吊数": {"四期": [3, 7]}},
+    {"名称": "组长最多带4艘", "组长带船上限": 4},
+]
+
+DETAIL_COLUMNS = ["方案", "工作地", "状态", "组长数", "上岗理货员", "待命理货员", "船舶数", "未分配船舶",
+                  "未分配组长理货员", "船舶数标准差", "大船数标准差", "桥吊数标准差", "规则违反"]
+COUNT_COLUMNS = ["组长数", "上岗理货员", "待命理货员", "船舶数", "未分配船舶", "未分配组长理货员", "规则违反"]
+SPREAD_COLUMNS = ["船舶数标准差", "大船数标准差", "桥吊数标准差"]
+
+_base = None
+
+
+def prepare_base(frames):
+    """解析一次上传数据，得到各方案共用的基准（人员名单、桥吊解析结果、工作地模型、规则表）"""
+    staff_summary = summarize_staff(frames["人员信息表"])
+    parsed = parse_crane_tables(frames["泊位与桥吊关联表"], frames["船舶与桥吊关联表"])
+    return {
+        "leader_available": staff_summary["available"]["理货组长"],
+        "staff_available": staff_summary["available"]["理货员"],
+        "parsed": parsed,
+        "workarea_data": build_workarea_data(parsed),
+        "constraints": compile_constraints(frames["四期-组长带船限制"], frames["理货员桥吊负责规则"],
+                                           known_people=frames["人员信息表"]["姓名"]),
+    }
+
+
+def load_scenarios(text):
+    """解析方案JSON（方案对象的列表），检查修改项及方案名称，返回方案列表"""
+    scenarios = json.loads(text)
+    if isinstance(scenarios, dict):
+        scenarios = [scenarios]
+    if not isinstance(scenarios, list) or not all(isinstance(s, dict) for s in scenarios):
+        raise ValueError("方案应为JSON对象的列表")
+    for i, spec in enumerate(scenarios, start=1):
+        unknown = [key for key in spec if key not in SCENARIO_KEYS]
+        if unknown:
+            raise ValueError(f"第{i}个方案有无法识别的修改项：{'、'.join(unknown)}（可用：{'、'.join(SCENARIO_KEYS)}）")
+        spec.setdefault("名称", f"方案{i}")
+    names = [BASE_NAME] + [spec["名称"] for spec in scenarios]
+    duplicated = list(dict.fromkeys(name for i, name in enumerate(names) if name in names[:i]))
+    if duplicated:
+        raise ValueError(f"方案名称不能重复（“{BASE_NAME}”为保留名称）：{'、'.join(map(str, duplicated))}")
+    return scenarios
+
+
+def _per_workarea(value, workareas):
+    """修改项取值：对象按工作地给出，否则对全部工作地生效"""
+    return dict(value) if isinstance(value, dict) else {wa: value for wa in workareas}
+
+
+def _add_people(available, counts, label):
+    available = dict(available)
+    for wa, count in counts.items():
+        available[wa] = list(available.get(wa, [])) + [f"{wa}新增{label}{i}" for i in range(1, int(count) + 1)]
+    return available
+
+
+def _move_ships(parsed, workarea_data, moves):
+    """船舶改到其他工作地（可同时改用指定桥吊），只重建涉及的工作地"""
+    ships = parsed["ships"].copy()
+    ship_cranes = parsed["ship_cranes"]
+    affected = set()
+    for move in moves:
+        name, target = str(move.get("船舶", "")).strip(), str(move.get("工作地", "")).strip()
+        rows = ships.index[ships["船舶名称"] == name]
+        if rows.empty:
+            raise ValueError(f"未找到船舶：{name}")
+        if not target:
+            raise ValueError(f"船舶{name}未指定工作地")
+        affected.update(ships.loc[rows, "工作地"].dropna())
+        affected.add(target)
+        ships.loc[rows, "工作地"] = target
+        if move.get("桥吊"):
+            cranes = move["桥吊"]
+            cranes = clean_crane_name(cranes) if isinstance(cranes, str) else [c.strip().upper() for c in map(str, cranes)]
+            line_numbers = ships.loc[rows, "行号"].to_numpy()
+            added = pd.DataFrame([(n, c, k, name) for n in line_numbers for k, c in enumerate(cranes)],
+                                 columns=["行号", "桥吊号", "顺序", "船舶名称"])
+            added["工作地"] = added["桥吊号"].map(parsed["crane_workarea"])
+            ship_cranes = pd.concat([ship_cranes[~ship_cranes["行号"].isin(line_numbers)], added], ignore_index=True)
+            ships.loc[rows, "桥吊数量"] = len(cranes)
+            ships.loc[rows, "大小"] = "大船" if len(cranes) > LARGE_SHIP_CRANES else "小船"
+    ship_cranes = ship_cranes.sort_values(["行号", "顺序"], kind="stable", ignore_index=True)
+
+    rebuilt = build_workarea_data({**parsed, "ships": ships, "ship_cranes": ship_cranes}, workareas=sorted(affected))
+    data = {wa: rebuilt.get(wa, wa_data) for wa, wa_data in workarea_data.items()}
+    data.update({wa: wa_data for wa, wa_data in rebuilt.items() if wa not in data})
+    return data
+
+
+def apply_scenario(base, spec):
+    """在基准上应用方案的修改，返回（workarea_data，可用组长，可用理货员，规则表），不修改基准"""
+    workarea_data = base["workarea_data"]
+    leaders, staff = base["leader_available"], base["staff_available"]
+    constraints = base["constraints"]
+
+    removed = set(spec.get("减少人员", []))
+    if removed:
+        leaders = {wa: [p for p in names if p not in removed] for wa, names in leaders.items()}
+        staff = {wa: [p for p in names if p not in removed] for wa, names in staff.items()}
+    if spec.get("增加组长"):
+        leaders = _add_people(leaders, spec["增加组长"], "组长")
+    if spec.get("增加理货员"):
+        staff = _add_people(staff, spec["增加理货员"], "理货员")
+
+    if "理货员桥吊数" in spec or "组长带船上限" in spec:
+        constraints = constraints.copy()
+        for wa, (low, high) in _per_workarea(spec.get("理货员桥吊数", {}), workarea_data).items():
+            if not 0 < int(low) <= int(high):
+                raise ValueError(f"{wa}理货员桥吊数应为 [最少, 最多]，且 0 < 最少 <= 最多")
+            constraints.clerk_rules[(wa, ANY)] = (int(low), int(high), None)
+        for wa, limit in _per_workarea(spec.get("组长带船上限", {}), workarea_data).items():
+            constraints.leader_rules[(wa, ANY, SIZE_TOTAL)] = (int(limit), None)
+
+    if spec.get("调整船舶"):
+        workarea_data = _move_ships(base["parsed"], workarea_data, spec["调整船舶"])
+    return workarea_data, leaders, staff, constraints
+
+
+def _spread(values):
+    return round(float(np.std(values)), 2) if len(values) else None
+
+
+def evaluate_scenario(base, spec, seed=0, mode="greedy", time_budget=5.0):
+    """试算一个方案，返回（各工作地一行的指标列表（列见 DETAIL_COLUMNS），用时秒数）"""
+    name = spec.get("名称", BASE_NAME)
+    start = time.perf_counter()
+    try:
+        workarea_data, leaders, staff, constraints = apply_scenario(base, spec)
+    except (ValueError, TypeError) as e:
+        return [{"方案": name, "工作地": "", "状态": f"方案无效：{e}"}], time.perf_counter() - start
+
+    outcomes = assign_workareas(workarea_data, leaders, staff, seed=spec.get("种子", seed), mode=mode,
+                                time_budget=time_budget, constraints=constraints)
+    rows = []
+    for wa, (df_result, remaining, df_detail, messages) in outcomes.items():
+        num_ships = workarea_data[wa]["model"].num_ships
+        row = {"方案": name, "工作地": wa, "组长数": len(leaders.get(wa, [])), "船舶数": num_ships,
+               "待命理货员": len(remaining),
+               "规则违反": 0 if df_result is None else len(df_result.attrs.get("violations", []))}
+        if df_result is None:
+            problems = [text for level, text in messages if level in ("warning", "error")]
+            row.update(状态=f"无结果：{problems[-1] if problems else '未生成配工结果'}", 上岗理货员=0,
+                       未分配船舶=num_ships, 未分配组长理货员=0)
+        else:
+            row.update(状态="完成", 上岗理货员=len(df_result),
+                       未分配船舶=num_ships - int(df_detail["总船舶数"].sum()),
+                       未分配组长理货员=int((df_result["理货组长"] == "未分配组长").sum()),
+                       船舶数标准差=_spread(df_detail["总船舶数"]), 大船数标准差=_spread(df_detail["大船数"]),
+                       桥吊数标准差=_spread(df_detail["负责桥吊数"]))
+        rows.append(row)
+    return rows, time.perf_counter() - start
+
+
+def _init_worker(base):
+    global _base
+    _base = base
+
+
+def _evaluate_in_worker(spec, seed, mode, time_budget):
+    return evaluate_scenario(_base, spec, seed, mode, time_budget)
+
+
+def summarize_scenarios(detail, elapsed):
+    """按方案汇总：数量列求和，标准差列取各工作地最大值，并列出较基准的变化"""
+    grouped = detail.groupby("方案", sort=False)
+    overview = grouped[COUNT_COLUMNS].sum(min_count=1)
+    for col in SPREAD_COLUMNS:
+        overview[f"最大{col}"] = grouped[col].max()
+    failed = detail.loc[detail["状态"] != "完成", ["方案", "工作地"]].replace({"工作地": {"": "全部"}})
+    overview["无结果工作地"] = failed.groupby("方案", sort=False)["工作地"].agg("、".join).reindex(overview.index).fillna("")
+    overview["用时(ms)"] = [round(elapsed[name] * 1000, 1) for name in overview.index]
+    if BASE_NAME in overview.index:
+        for col in ("未分配船舶", "未分配组长理货员", "待命理货员"):
+            overview[f"{col}（较基准）"] = overview[col] - overview.loc[BASE_NAME, col]
+    return overview.reset_index()
+
+
+@traced("方案对比", lambda result, base, scenarios, *args, **kwargs: {"方案": len(scenarios) + 1})
+def compare_scenarios(base, scenarios, seed=0, mode="greedy", time_budget=5.0, jobs=None):
+    """试算基准及各方案，返回（按方案汇总的对比表，各方案分工作地的明细表）
+
+    jobs 为并行进程数（默认CPU核数，同 evaluate.best_of_seeds），为1时在当前进程中依次试算。
+    """
+    specs = [{"名称": BASE_NAME}] + list(scenarios)
+    names = [spec.get("名称") for spec in specs]
+    if len(set(names)) < len(names):
+        raise ValueError("方案名称不能重复（“基准”为保留名称）")
+
+    if jobs == 1 or len(specs) == 1:
+        outcomes = [evaluate_scenario(base, spec, seed, mode, time_budget) for spec in specs]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(base,)) as pool:
+            futures = [pool.submit(_evaluate_in_worker, spec, seed, mode, time_budget) for spec in specs]
+            outcomes = [future.result() for future in futures]
+
+    detail = pd.DataFrame([row for rows, _ in outcomes for row in rows], columns=DETAIL_COLUMNS)
+    detail = detail.astype({col: "Int64" for col in COUNT_COLUMNS})
+    elapsed = {name: seconds for name, (_, seconds) in zip(names, outcomes)}
+    return summarize_scenarios(detail, elapsed), detail
@@ -0,0 +1,447 @@
+"""配工HTTP服务：供各调度室的系统直接调用配工，只依赖标准库
+
+    python cli.py serve --port 8765 -j 4 --queue 8
+    curl -X POST --data-binary @配工.xlsx "http://127.0.0.1:8765/schedule?seed=0"
+    curl -X POST -H "Content-Type: application/json" -d @配工.json "http://127.0.0.1:8765/schedule"
+    curl http://127.0.0.1:8765/metrics
+
+POST /schedule：请求体为Excel工作簿，或JSON {"sheets": {工作表名: [行记录, ...]}, "seed": ..., ...}；
+    参数 seed（默认0）、mode（greedy/optimal）、time_budget、format（json 或 export.EXPORT_FORMATS）
+    可放在查询串中，JSON请求也可放在请求体中。返回配工结果JSON（format=json）或报表文件。
+    响应头 X-Cache 为 hit（缓存）/shared（与进行中的相同任务合并）/miss（新计算），
+    X-Content-Key 为输入内容哈希。
+GET /metrics：请求数、缓存命中、拒绝数、排队数、吞吐量及延迟分位数。
+GET /health：存活检查。
+
+请求体的解析（预检、读取Excel或JSON）和配工都在有界进程池中执行，HTTP线程只收发数据。
+处理中（解析、排队及计算）的请求数达到 workers + queue_size 时直接返回503并带 Retry-After，
+调用方稍后重试。结果按规范化输入（清洗后的工作表内容及参数）的哈希缓存，
+Excel与JSON内容相同时命中同一条缓存；同一请求体再次提交时按原始字节哈希直接命中，不再解析。
+任务超过 JOB_TIMEOUT 返回504：尚在排队的任务随之取消；进程池无法中断已开始运行的任务，
+它会继续算完（结果照常缓存，重试时直接命中），期间仍占用其请求位置，排队上限不会因超时被突破。
+make_server(port=0) 可在本地随机端口启动实例，便于在测试中调用。
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from engine import MODES, has_results, run_schedule
+from export import EXPORT_FORMATS, available_formats, build_report, export_report
+from loader import REQUIRED_SHEETS, clean_frame, read_workbook
+from validate import REQUIRED_COLUMNS, blocking, format_issue, validate_workbook
+
+DEFAULT_PORT = 8765
+
+# 请求体上限（字节）
+MAX_BODY = 32 * 1024 * 1024
+
+# 单个任务的最长等待时间（秒），超时返回504
+JOB_TIMEOUT = 300
+
+# 延迟统计保留的最近请求数；吞吐量按最近 THROUGHPUT_WINDOW 秒计算
+LATENCY_WINDOW = 1000
+THROUGHPUT_WINDOW = 60
+
+JSON_TYPE = "application/json; charset=utf-8"
+
+
+class ServiceBusy(Exception):
+    """任务队列已满"""
+
+
+class BadRequest(ValueError):
+    """请求内容无法配工，issues 为逐项问题"""
+
+    def __init__(self, message, issues=()):
+        super().__init__(message)
+        self.issues = list(issues)
+
+    def __reduce__(self):
+        # 在工作进程中抛出时随结果传回，保留问题清单
+        return BadRequest, (str(self), self.issues)
+
+
+def parse_params(query, body=None):
+    """整理配工参数（seed，mode，time_budget，format），JSON请求体中的同名字段优先"""
+    values = {key: items[-1] for key, items in query.items()}
+    values.update({key: body[key] for key in ("seed", "mode", "time_budget", "format") if key in (body or {})})
+    try:
+        params = {
+            "seed": int(values.get("seed", 0)),
+            "mode": values.get("mode", "greedy"),
+            "time_budget": float(values.get("time_budget", 5.0)),
+            "format": values.get("format", "json"),
+        }
+    except (TypeError, ValueError) as e:
+        raise BadRequest(f"参数格式不正确：{e}")
+    if params["mode"] not in MODES:
+        raise BadRequest(f"mode 应为：{'、'.join(MODES)}")
+    if params["format"] not in ("json", *available_formats()):
+        raise BadRequest(f"format 应为：{'、'.join(['json', *available_formats()])}")
+    return params
+
+
+def frames_from_workbook(data):
+    """Excel请求体 -> 工作表；先预检，有错误时抛出 BadRequest"""
+    errors = blocking(validate_workbook(BytesIO(data)))
+    if not errors.empty:
+        raise BadRequest("工作簿预检未通过", [format_issue(item) for _, item in errors.iterrows()])
+    frames, missing = read_workbook(BytesIO(data))
+    if missing:
+        raise BadRequest(f"未找到工作表：{'、'.join(missing)}")
+    return frames
+
+
+def frames_from_json(body):
+    """JSON请求体中的 sheets -> 工作表，按 loader.clean_frame 清洗，缺少工作表或必需列时抛出 BadRequest"""
+    sheets = body.get("sheets")
+    if not isinstance(sheets, dict):
+        raise BadRequest("JSON请求体需包含 sheets：工作表名 -> 行记录列表")
+    missing = [key for key in REQUIRED_SHEETS if key not in sheets]
+    if missing:
+        raise BadRequest(f"未找到工作表：{'、'.join(missing)}")
+    frames, issues = {}, []
+    for key in REQUIRED_SHEETS:
+        try:
+            frames[key] = clean_frame(pd.DataFrame.from_records(sheets[key]))
+        except (TypeError, ValueError) as e:
+            raise BadRequest(f"{key} 应为行记录列表：{e}")
+        issues += [f"[错误] {key} “{col}”列：缺少必需列"
+                   for col in REQUIRED_COLUMNS.get(key, []) if col not in frames[key].columns]
+    if issues:
+        raise BadRequest("缺少必需列", issues)
+    return frames
+
+
+def parse_request(data, query, is_json):
+    """在工作进程中解析请求体，返回（内容哈希，工作表，配工参数），无法配工时抛出 BadRequest"""
+    if is_json:
+        try:
+            body = json.loads(data)
+        except ValueError as e:
+            raise BadRequest(f"JSON格式不正确：{e}")
+        if not isinstance(body, dict):
+            raise BadRequest("JSON请求体应为对象")
+        params = parse_params(query, body)
+        frames = frames_from_json(body)
+    else:
+        params = parse_params(query)
+        frames = frames_from_workbook(data)
+    return content_key(frames, params), frames, params
+
+
+def content_key(frames, params):
+    """规范化输入的哈希：按固定顺序对各工作表的列、行索引、取值及配工参数取 sha256"""
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode())
+    for key in REQUIRED_SHEETS:
+        digest.update(key.encode())
+        digest.update(frames[key].to_json(orient="split", date_format="iso", force_ascii=False).encode())
+    return digest.hexdigest()
+
+
+def _records(df):
+    if df is None or df.empty:
+        return []
+    return json.loads(df.to_json(orient="records", force_ascii=False, date_format="iso"))
+
+
+def result_payload(result):
+    """run_schedule 的结果 -> 可JSON序列化的字典"""
+    return {
+        "workareas": {
+            wa: {
+                "results": _records(result["results"][wa]),
+                "details": _records(result["details"][wa]),
+                "remaining": list(result["remaining"].get(wa, [])),
+                "messages": [{"level": level, "text": text} for level, text in result["messages"][wa]],
+            }
+            for wa in result["results"]
+        },
+        "status": result["status"],
+        "rule_issues": [{"sheet": sheet, "row": row, "text": text} for sheet, row, text in result["rule_issues"]],
+        "crane_issues": _records(result["crane_issues"]),
+    }
+
+
+def run_job(frames, params):
+    """在工作进程中配工，返回（Content-Type，响应体字节）"""
+    result = run_schedule(frames, seed=params["seed"], mode=params["mode"], time_budget=params["time_budget"])
+    if params["format"] == "json":
+        body = json.dumps(result_payload(result), ensure_ascii=False, default=str).encode("utf-8")
+        return JSON_TYPE, body
+    if not has_results(result["results"]):
+        raise BadRequest("没有生成任何配工结果", [f"{wa} {level}: {text}" for wa, msgs in result["messages"].items()
+                                                   for level, text in msgs if level in ("warning", "error")])
+    report = build_report(result["results"], result["details"], result["workarea_data"],
+                          result["messages"], result["remaining"])
+    return EXPORT_FORMATS[params["format"]][2], export_report(report, params["format"])
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class Metrics:
+    """服务计数器及最近请求的延迟"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.counts = dict.fromkeys(("requests", "completed", "failed", "rejected", "hit", "shared", "miss"), 0)
+        self.latencies = deque(maxlen=LATENCY_WINDOW)  # （完成时间，端到端用时，是否新计算）
+
+    def count(self, name):
+        with self.lock:
+            self.counts[name] += 1
+
+    def observe(self, seconds, computed):
+        with self.lock:
+            self.counts["completed"] += 1
+            self.latencies.append((time.time(), seconds, computed))
+
+    def snapshot(self):
+        with self.lock:
+            now = time.time()
+            counts = dict(self.counts)
+            latencies = list(self.latencies)
+        recent = sum(1 for end, _, _ in latencies if now - end <= THROUGHPUT_WINDOW)
+        uptime = now - self.started
+
+        def summary(values):
+            ms = [round(v * 1000, 1) for v in values]
+            return {"count": len(ms), "p50_ms": _percentile(ms, 0.5), "p95_ms": _percentile(ms, 0.95),
+                    "p99_ms": _percentile(ms, 0.99), "max_ms": max(ms) if ms else None}
+
+        return {
+            **counts,
+            "uptime_s": round(uptime, 1),
+            "throughput_per_s": round(counts["completed"] / uptime, 3) if uptime > 0 else 0.0,
+            "recent_throughput_per_s": round(recent / min(uptime, THROUGHPUT_WINDOW), 3) if uptime > 0 else 0.0,
+            "latency": summary([s for _, s, _ in latencies]),
+            "compute_latency": summary([s for _, s, computed in latencies if computed]),
+        }
+
+
+class Scheduler:
+    """有界进程池 + 结果缓存
+
+    workers 为进程数，queue_size 为工作进程都忙时最多排队的任务数；相同输入的并发请求
+    合并为一个任务。请求从解析起占用一个位置（slot），位置总数同为 workers + queue_size，
+    满载时不再解析，提交到进程池的任务数也就不会超过位置数。cache_size 为缓存的结果个数（按最近使用淘汰）。
+    """
+
+    def __init__(self, workers=2, queue_size=8, cache_size=64):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.cache_size = cache_size
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(self.capacity)
+        self.lock = threading.Lock()
+        self.cache = OrderedDict()    # 内容哈希 -> （Content-Type，响应体）
+        self.aliases = OrderedDict()  # 原始请求哈希 -> 内容哈希
+        self.inflight = {}            # 内容哈希 -> Future
+        self.metrics = Metrics()
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def acquire(self):
+        """占用一个请求位置，位置已满时抛出 ServiceBusy"""
+        if not self.slots.acquire(blocking=False):
+            raise ServiceBusy()
+
+    def release_after(self, future):
+        """任务结束后释放位置（没有任务或任务已结束时立即释放）"""
+        if future is None or future.done():
+            self.slots.release()
+        else:
+            future.add_done_callback(lambda f: self.slots.release())
+
+    def lookup(self, raw_key):
+        """按原始请求哈希查缓存，命中时返回（内容哈希，结果），否则返回None"""
+        with self.lock:
+            key = self.aliases.get(raw_key)
+            if key is None or key not in self.cache:
+                return None
+            self.aliases.move_to_end(raw_key)
+            self.cache.move_to_end(key)
+            return key, self.cache[key]
+
+    def run(self, data, query, is_json, raw_key=None):
+        """在工作进程中解析请求体并配工，返回（内容哈希，（Content-Type，响应体），缓存状态）
+
+        位置已满时抛出 ServiceBusy。解析或配工等待超过 JOB_TIMEOUT 时抛出 TimeoutError：
+        本请求提交的任务尚未运行则取消；已在运行的无法中断，结束后才释放位置（见模块说明）。
+        合并到其他请求的任务不取消。
+        """
+        self.acquire()
+        future, state = None, "miss"
+        try:
+            future = self.pool.submit(parse_request, data, query, is_json)
+            key, frames, params = future.result(timeout=JOB_TIMEOUT)
+            with self.lock:
+                if raw_key is not None:
+                    self._remember(self.aliases, raw_key, key)
+                if key in self.cache:
+                    self.cache.move_to_end(key)
+                    return key, self.cache[key], "hit"
+                future = self.inflight.get(key)
+                if future is not None:
+                    state = "shared"
+                else:
+                    future = self.pool.submit(run_job, frames, params)
+                    self.inflight[key] = future
+                    future.add_done_callback(lambda f: self._finish(key, f))
+            return key, future.result(timeout=JOB_TIMEOUT), state
+        except TimeoutError:
+            if state != "shared":
+                future.cancel()
+            raise
+        finally:
+            self.release_after(future)
+
+    def _finish(self, key, future):
+        with self.lock:
+            self.inflight.pop(key, None)
+            if not future.cancelled() and future.exception() is None:
+                self._remember(self.cache, key, future.result())
+
+    def _remember(self, table, key, value):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > self.cache_size:
+            table.popitem(last=False)
+
+
+class ScheduleHandler(BaseHTTPRequestHandler):
+    server_version = "CraneSchedule/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def scheduler(self):
+        return self.server.scheduler
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_body(self, status, body, content_type=JSON_TYPE, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, payload, headers=None):
+        self.send_body(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), headers=headers)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/health":
+            self.send_json(HTTPStatus.OK, {"status": "ok"})
+        elif path == "/metrics":
+            with self.scheduler.lock:
+                queued = len(self.scheduler.inflight)
+                cached = len(self.scheduler.cache)
+            self.send_json(HTTPStatus.OK, {**self.scheduler.metrics.snapshot(), "inflight": queued,
+                                           "capacity": self.scheduler.capacity, "workers": self.scheduler.workers,
+                                           "cached": cached})
+        else:
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": f"未知路径：{path}"})
+
+    def discard_body(self):
+        """读掉不处理的请求体，保持连接可继续使用；超过 MAX_BODY 时不读，回复后关闭连接"""
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            self.close_connection = True
+        elif length > 0:
+            self.rfile.read(length)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != "/schedule":
+            self.discard_body()
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": f"未知路径：{url.path}"})
+            return
+        metrics = self.scheduler.metrics
+        metrics.count("requests")
+        start = time.perf_counter()
+        try:
+            key, (content_type, body), state = self.schedule(url)
+        except ServiceBusy:
+            metrics.count("rejected")
+            self.send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": "配工任务已满，请稍后重试"},
+                           headers={"Retry-After": "1"})
+            return
+        except BadRequest as e:
+            metrics.count("failed")
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": str(e), "issues": e.issues})
+            return
+        except (TimeoutError, CancelledError):
+            metrics.count("failed")
+            self.send_json(HTTPStatus.GATEWAY_TIMEOUT, {"error": f"配工超过{JOB_TIMEOUT}秒未完成"})
+            return
+        except Exception as e:
+            metrics.count("failed")
+            self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"配工失败：{e}"})
+            return
+        elapsed = time.perf_counter() - start
+        metrics.count(state)
+        metrics.observe(elapsed, state == "miss")
+        self.send_body(HTTPStatus.OK, body, content_type,
+                       headers={"X-Cache": state, "X-Content-Key": key, "X-Elapsed-Ms": f"{elapsed * 1000:.1f}"})
+
+    def schedule(self, url):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            raise BadRequest("请求体为空：需上传Excel工作簿或JSON")
+        if length > MAX_BODY:
+            self.close_connection = True
+            raise BadRequest(f"请求体超过{MAX_BODY // (1024 * 1024)}MB")
+        data = self.rfile.read(length)
+        query = parse_qs(url.query)
+        is_json = self.headers.get("Content-Type", "").split(";")[0].strip() == "application/json"
+
+        raw_key = hashlib.sha256(url.query.encode() + b"\0" + data).hexdigest()
+        cached = self.scheduler.lookup(raw_key)
+        if cached is not None:
+            return (*cached, "hit")
+        # 未命中时先占用位置，满载时直接拒绝；解析和配工都交给工作进程
+        return self.scheduler.run(data, query, is_json, raw_key)
+
+
+class ScheduleServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, scheduler, verbose=False):
+        super().__init__(address, ScheduleHandler)
+        self.scheduler = scheduler
+        self.verbose = verbose
+
+    def server_close(self):
+        super().server_close()
+        self.scheduler.close()
+
+
+def make_server(host="127.0.0.1", port=DEFAULT_PORT, workers=2, queue_size=8, cache_size=64, verbose=False):
+    """创建服务实例（未启动），port=0 时使用随机空闲端口，实际地址见 server.server_address
+
+    在后台线程运行 server.serve_forever() 即可在本地调用，结束时 server.shutdown(); server.server_close()。
+    """
+    return ScheduleServer((host, port), Scheduler(workers, queue_size, cache_size), verbose=verbose)
@@ -0,0 +1,366 @@
+"""优化求解配工模式
+
+把船舶分给组长、再把每位组长名下的桥吊切分给理货员，使各组长的船舶数、大船数、
+桥吊数尽量均衡，并保证每位理货员负责的桥吊只属于一位组长。
+
+求解为纯Python实现：先按桥吊数从多到少构造初始解，再在时间预算内做单船转移、
+两船交换的局部搜索（启发式，不保证全局最优；未采用最小费用流/整数规划，
+以免引入求解器依赖）。共用桥吊的船舶视为一个整体分配，避免桥吊跨组长。
+超出时间预算仍无可行解（理货员无法按每人桥吊数上下限切分，或组长超出规则表中的
+带船上限）时返回None，由调用方回退到贪心分配。
+"""
+import heapq
+import time
+
+from model import Allocation, iter_bits
+
+# 目标函数权重
+WEIGHTS = {
+    "infeasible": 1000.0,  # 理货员无法按上下限切分（每缺口一人）、超出规则表带船上限（每艘）
+    "over_cap": 100.0,     # 超出均衡带船上限（每艘）
+    "ships": 10.0,         # 船舶数偏离平均值的平方
+    "large": 4.0,          # 大船数偏离平均值的平方
+    "cranes": 1.0,         # 桥吊数偏离平均值的平方
+}
+
+
+def group_ships(model):
+    """把共用桥吊的船舶合并为一个分配单元（并查集）
+
+    model 为工作地的 WorkareaModel，单元内船舶、桥吊均为编号，桥吊按位置排序，
+    单元按首个桥吊位置排序。
+    """
+    parent = list(range(model.num_ships))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner = [-1] * model.num_cranes
+    for i in range(model.num_ships):
+        for k in model.crane_ids_of(i):
+            if owner[k] >= 0:
+                parent[find(i)] = find(owner[k])
+            else:
+                owner[k] = i
+
+    groups = {}
+    for i in range(model.num_ships):
+        groups.setdefault(find(i), []).append(i)
+
+    units = []
+    for members in groups.values():
+        bits = 0
+        for i in members:
+            bits |= model.ship_bits[i]
+        large = sum(1 for i in members if model.ship_large[i])
+        units.append({
+            "ships": members,
+            "large": large,
+            "small": len(members) - large,
+            "cranes": list(iter_bits(bits)),
+        })
+    units.sort(key=lambda u: u["cranes"][0] if u["cranes"] else model.num_cranes)
+    return units
+
+
+def clerk_bounds(crane_count, min_per, max_per):
+    """组长名下桥吊数对应的理货员人数范围（下限，上限）"""
+    if crane_count == 0:
+        return 0, 0
+    return -(-crane_count // max_per), crane_count // min_per
+
+
+class _Search:
+    """局部搜索状态：记录各组长的船舶数、大船数、桥吊数，支持O(1)计算移动代价"""
+
+    def __init__(self, units, num_leaders, num_staff, min_per, max_per, use_all_staff, caps, limits):
+        self.units = units
+        self.n = num_leaders
+        self.num_staff = num_staff
+        self.min_per = min_per
+        self.max_per = max_per
+        self.use_all_staff = use_all_staff
+        self.caps = caps
+        self.limits = limits
+
+        total_ships = sum(len(u["ships"]) for u in units)
+        self.mean_ships = total_ships / num_leaders
+        self.mean_large = sum(u["large"] for u in units) / num_leaders
+        self.mean_cranes = sum(len(u["cranes"]) for u in units) / num_leaders
+
+        self.assign = [-1] * len(units)
+        self.ships = [0] * num_leaders
+        self.large = [0] * num_leaders
+        self.cranes = [0] * num_leaders
+        self.lo_sum = 0
+        self.hi_sum = 0
+
+    @staticmethod
+    def _excess(caps, s, a):
+        cap_total, cap_large, cap_small = caps
+        return max(0, s - cap_total) + max(0, a - cap_large) + max(0, s - a - cap_small)
+
+    def leader_cost(self, l, s, a, c):
+        lo, hi = clerk_bounds(c, self.min_per, self.max_per)
+        return (
+            WEIGHTS["ships"] * (s - self.mean_ships) ** 2
+            + WEIGHTS["large"] * (a - self.mean_large) ** 2
+            + WEIGHTS["cranes"] * (c - self.mean_cranes) ** 2
+            + WEIGHTS["over_cap"] * self._excess(self.caps[l], s, a)
+            + WEIGHTS["infeasible"] * (max(0, lo - hi) + self._excess(self.limits[l], s, a))
+        )
+
+    def staff_gap(self, lo_sum, hi_sum):
+        """理货员总人数与各组长人数范围之和的缺口"""
+        gap = max(0, lo_sum - self.num_staff)
+        if self.use_all_staff:
+            gap += max(0, self.num_staff - hi_sum)
+        return gap
+
+    def total_cost(self):
+        cost = sum(self.leader_cost(l, self.ships[l], self.large[l], self.cranes[l]) for l in range(self.n))
+        return cost + WEIGHTS["infeasible"] * self.staff_gap(self.lo_sum, self.hi_sum)
+
+    def infeasibility(self):
+        """不可行程度：理货员人数缺口 + 超出规则表带船上限的船舶数"""
+        per_leader = 0
+        for l in range(self.n):
+            lo, hi = clerk_bounds(self.cranes[l], self.min_per, self.max_per)
+            per_leader += max(0, lo - hi) + self._excess(self.limits[l], self.ships[l], self.large[l])
+        return per_leader + self.staff_gap(self.lo_sum, self.hi_sum)
+
+    def _change(self, l, ds, da, dc):
+        """组长 l 的负载变化（船舶数、大船数、桥吊数增量）带来的代价变化及人数范围变化"""
+        s, a, c = self.ships[l], self.large[l], self.cranes[l]
+        lo0, hi0 = clerk_bounds(c, self.min_per, self.max_per)
+        lo1, hi1 = clerk_bounds(c + dc, self.min_per, self.max_per)
+        delta = self.leader_cost(l, s + ds, a + da, c + dc) - self.leader_cost(l, s, a, c)
+        return delta, lo1 - lo0, hi1 - hi0
+
+    def _unit_load(self, u):
+        unit = self.units[u]
+        return len(unit["ships"]), unit["large"], len(unit["cranes"])
+
+    def apply(self, u, l):
+        """把单元 u 分给组长 l（若已分配则先移出）"""
+        s, a, c = self._unit_load(u)
+        old = self.assign[u]
+        if old >= 0:
+            self._add(old, -s, -a, -c)
+        self._add(l, s, a, c)
+        self.assign[u] = l
+
+    def _add(self, l, ds, da, dc):
+        lo0, hi0 = clerk_bounds(self.cranes[l], self.min_per, self.max_per)
+        self.ships[l] += ds
+        self.large[l] += da
+        self.cranes[l] += dc
+        lo1, hi1 = clerk_bounds(self.cranes[l], self.min_per, self.max_per)
+        self.lo_sum += lo1 - lo0
+        self.hi_sum += hi1 - hi0
+
+    def add_delta(self, u, l):
+        """未分配的单元 u 放到组长 l 的代价变化"""
+        s, a, c = self._unit_load(u)
+        d, dlo, dhi = self._change(l, s, a, c)
+        gap0 = self.staff_gap(self.lo_sum, self.hi_sum)
+        gap1 = self.staff_gap(self.lo_sum + dlo, self.hi_sum + dhi)
+        return d + WEIGHTS["infeasible"] * (gap1 - gap0)
+
+    def move_delta(self, u, l2):
+        s, a, c = self._unit_load(u)
+        l1 = self.assign[u]
+        d1, dlo1, dhi1 = self._change(l1, -s, -a, -c)
+        d2, dlo2, dhi2 = self._change(l2, s, a, c)
+        gap0 = self.staff_gap(self.lo_sum, self.hi_sum)
+        gap1 = self.staff_gap(self.lo_sum + dlo1 + dlo2, self.hi_sum + dhi1 + dhi2)
+        return d1 + d2 + WEIGHTS["infeasible"] * (gap1 - gap0)
+
+    def swap_delta(self, u, v):
+        su, au, cu = self._unit_load(u)
+        sv, av, cv = self._unit_load(v)
+        l1, l2 = self.assign[u], self.assign[v]
+        d1, dlo1, dhi1 = self._change(l1, sv - su, av - au, cv - cu)
+        d2, dlo2, dhi2 = self._change(l2, su - sv, au - av, cu - cv)
+        gap0 = self.staff_gap(self.lo_sum, self.hi_sum)
+        gap1 = self.staff_gap(self.lo_sum + dlo1 + dlo2, self.hi_sum + dhi1 + dhi2)
+        return d1 + d2 + WEIGHTS["infeasible"] * (gap1 - gap0)
+
+
+def split_clerks(search, num_staff, use_all_staff):
+    """确定每位组长配备的理货员人数：先取下限，剩余人数优先给人均桥吊最多的组长"""
+    counts = []
+    for l in range(search.n):
+        lo, hi = clerk_bounds(search.cranes[l], search.min_per, search.max_per)
+        counts.append(lo)
+    if use_all_staff:
+        remaining = num_staff - sum(counts)
+        heap = [(-search.cranes[l] / counts[l] if counts[l] else 0, l) for l in range(search.n)
+                if counts[l] < clerk_bounds(search.cranes[l], search.min_per, search.max_per)[1]]
+        heapq.heapify(heap)
+        while remaining > 0 and heap:
+            _, l = heapq.heappop(heap)
+            counts[l] += 1
+            remaining -= 1
+            if counts[l] < clerk_bounds(search.cranes[l], search.min_per, search.max_per)[1]:
+                heapq.heappush(heap, (-search.cranes[l] / counts[l], l))
+    return counts
+
+
+def pick_clerks(pool, bounds, count, target):
+    """从待命理货员中选出 count 人：个人（最少，最多）范围最接近人均桥吊数 target 的优先，
+    其次范围窄的优先（有个人规则的理货员先被用上），再按原顺序"""
+    def key(i):
+        lo, hi = bounds[pool[i]]
+        return max(0, lo - target, target - hi), hi - lo, i
+    return [pool[i] for i in sorted(range(len(pool)), key=key)[:count]]
+
+
+def fit_sizes(total, person_bounds):
+    """在各人（最少，最多）范围内尽量均分 total 个桥吊，返回每人桥吊数
+
+    下限之和超过 total 时返回None；上限之和不足 total 时多出的桥吊不计入。
+    """
+    sizes = [lo for lo, _ in person_bounds]
+    remaining = total - sum(sizes)
+    if remaining < 0:
+        return None
+    heap = [(size, i) for i, (size, (_, hi)) in enumerate(zip(sizes, person_bounds)) if size < hi]
+    heapq.heapify(heap)
+    while remaining > 0 and heap:
+        size, i = heapq.heappop(heap)
+        sizes[i] += 1
+        remaining -= 1
+        if sizes[i] < person_bounds[i][1]:
+            heapq.heappush(heap, (sizes[i], i))
+    return sizes
+
+
+def solve_workarea(model, leaders, staff, min_per, max_per, use_all_staff=True,
+                   max_ships=None, leader_caps=None, staff_limits=None, time_budget=5.0, rng=None):
+    """在时间预算内求解单个工作地的组长带船及理货员桥吊分配
+
+    model 为工作地的 WorkareaModel（桥吊编号即位置顺序，用于保持桥吊连续），
+    staff 为可用理货员（按顺序取用）。use_all_staff 为True时
+    每位理货员都必须分到 min_per-max_per 个桥吊，否则只用所需人数。
+    max_ships 为每位组长带船上限（默认按平均数向上取整），超出计入惩罚项；leader_caps 为各组长
+    规则上限（合计，大船，小船），None 表示不限，为硬约束，无法满足时视为无可行解。
+    staff_limits 为理货员 -> 个人（最少，最多）桥吊数，切分桥吊前先按个人范围选人，
+    每人分到的桥吊数都在其个人范围内。
+
+    返回字典（leader_allocations：组长 -> Allocation，staff_crane_map：理货员 -> 桥吊编号列表，
+    used_staff、unassigned_cranes：选中理货员的个人上限之和不足而未分配的桥吊编号、cost、converged、elapsed），
+    无可行解时返回None。
+    """
+    start = time.perf_counter()
+    deadline = start + time_budget
+    units = group_ships(model)
+    num_leaders = len(leaders)
+    if not units or not num_leaders:
+        return None
+    if max_ships is None:
+        total_ships = sum(len(u["ships"]) for u in units)
+        max_ships = -(-total_ships // num_leaders)
+
+    unlimited = float("inf")
+    caps, limits = [], []
+    for cap_total, cap_large, cap_small in leader_caps or [(None, None, None)] * num_leaders:
+        limit = tuple(unlimited if cap is None else cap for cap in (cap_total, cap_large, cap_small))
+        limits.append(limit)
+        caps.append((min(max_ships, limit[0]),) + limit[1:])
+    search = _Search(units, num_leaders, len(staff), min_per, max_per, use_all_staff, caps, limits)
+
+    # 初始解：单元按桥吊数从多到少，依次放到代价增加最少的组长
+    order = sorted(range(len(units)), key=lambda u: -len(units[u]["cranes"]))
+    for u in order:
+        search.apply(u, min(range(num_leaders), key=lambda l: search.add_delta(u, l)))
+
+    # 局部搜索：单元转移 + 两单元交换，直到无改进或超时
+    converged = False
+    timed_out = False
+    unit_ids = list(range(len(units)))
+    while not timed_out:
+        improved = False
+        if rng is not None:
+            rng.shuffle(unit_ids)
+        for u in unit_ids:
+            if time.perf_counter() > deadline:
+                timed_out = True
+                break
+            best_delta, best_l = -1e-9, None
+            for l in range(num_leaders):
+                if l != search.assign[u]:
+                    delta = search.move_delta(u, l)
+                    if delta < best_delta:
+                        best_delta, best_l = delta, l
+            if best_l is not None:
+                search.apply(u, best_l)
+                improved = True
+        if timed_out:
+            break
+        for i, u in enumerate(unit_ids):
+            if timed_out:
+                break
+            for v in unit_ids[i + 1:]:
+                # 交换为O(n²)，单元较多时一轮即可能超出预算，逐对检查时间
+                if time.perf_counter() > deadline:
+                    timed_out = True
+                    break
+                if search.assign[u] != search.assign[v] and search.swap_delta(u, v) < -1e-9:
+                    lu, lv = search.assign[u], search.assign[v]
+                    search.apply(u, lv)
+                    search.apply(v, lu)
+                    improved = True
+        if not improved and not timed_out:
+            converged = True
+            break
+
+    if search.infeasibility() > 0:
+        return None
+
+    # 整理组长分配结果
+    leader_allocations = {leader: Allocation() for leader in leaders}
+    for u in range(len(units)):
+        alloc = leader_allocations[leaders[search.assign[u]]]
+        for i in units[u]["ships"]:
+            alloc.add(model, i)
+
+    # 先为每位组长选定理货员，再按选中理货员的个人范围把桥吊按位置顺序连续切分
+    clerk_counts = split_clerks(search, len(staff), use_all_staff)
+    staff_limits = staff_limits or {}
+    bounds = {person: staff_limits.get(person, (min_per, max_per)) for person in staff}
+    pool = list(staff)
+    staff_crane_map = {}
+    unassigned_cranes = []
+    for leader, count in zip(leaders, clerk_counts):
+        cranes = list(iter_bits(leader_allocations[leader].crane_bits))
+        if not count:
+            unassigned_cranes.extend(cranes)
+            continue
+        chosen = pick_clerks(pool, bounds, count, len(cranes) / count)
+        sizes = fit_sizes(len(cranes), [bounds[person] for person in chosen])
+        while sizes is None:
+            # 选中理货员的个人下限之和超过桥吊数：去掉下限最大的一位，放回待命
+            chosen.remove(max(chosen, key=lambda person: bounds[person][0]))
+            sizes = fit_sizes(len(cranes), [bounds[person] for person in chosen])
+        idx = 0
+        for person, size in zip(chosen, sizes):
+            pool.remove(person)
+            staff_crane_map[person] = cranes[idx: idx + size]
+            idx += size
+        # 个人上限之和不足时剩余桥吊不分配（不违反个人规则），由调用方提示
+        unassigned_cranes.extend(cranes[idx:])
+    unassigned_cranes.sort()
+
+    return {
+        "leader_allocations": leader_allocations,
+        "staff_crane_map": staff_crane_map,
+        "used_staff": list(staff_crane_map),
+        "unassigned_cranes": unassigned_cranes,
+        "cost": search.total_cost(),
+        "converged": converged,
+        "elapsed": time.perf_counter() - start,
+    }
@@ -0,0 +1,135 @@
+"""合成配工工作簿：按指定规模生成格式合法、可以完成配工的五张工作表，用于性能测试
+
+    frames = generate_frames(ships=240, workareas=4, leave_ratio=0.1, seed=0)
+    write_workbook(frames, "峰值日.xlsx")
+
+各工作地的桥吊数会微调到能满足理货员桥吊数上下限，可用理货员、组长人数按桥吊数和
+船舶数推算；staff 指定总人数时，多出的人员补充到按需派员的工作地或闸口。
+"""
+import random
+from io import BytesIO
+
+import pandas as pd
+
+from constraints import (CLERK_SHEET, DEFAULT_CLERK_LIMITS, FALLBACK_CLERK_LIMITS, LEADER_SHEET)
+from engine import LARGE_SHIP_CRANES, STATUS_COLUMNS, UNAVAILABLE_COLUMNS, WORKAREAS, crane_policy
+
+# 生成的工作地名称及桥吊号前缀（超出列表时按序号命名）
+WORKAREA_NAMES = WORKAREAS + ["五期", "六期", "七期", "八期"]
+CRANE_PREFIXES = "QABCDEFGHJKLMNPRSTUVWXYZ"
+
+# 泊位每行登记的桥吊数
+CRANES_PER_BERTH = 10
+
+BERTH_CRANE_COLUMN = "桥吊号（按从左到右顺序，逗号分隔）"
+SHIP_CRANE_COLUMN = "对应桥吊号（逗号分隔，需属于工作表1中的桥吊）"
+WORKAREA_COLUMN = "工作地（四期/自动化/闸口）"
+
+
+def workarea_names(count):
+    return [WORKAREA_NAMES[i] if i < len(WORKAREA_NAMES) else f"码头{i + 1}" for i in range(count)]
+
+
+def _feasible(total, min_per, max_per):
+    """桥吊总数能否按每人上下限拆分（按上限计算人数时每人仍不少于下限）"""
+    if min_per == max_per:
+        return total % min_per == 0
+    return -(-total // max_per) * min_per <= total
+
+
+def generate_frames(ships=40, cranes_per_ship=(1, 6), workareas=2, leave_ratio=0.1, staff=None,
+                    rules=True, seed=0):
+    """生成五张工作表（工作表名 -> DataFrame，同 loader.read_workbook 的返回）
+
+    ships 为船舶总数，按工作地轮流分配；cranes_per_ship 为每船桥吊数范围；
+    leave_ratio 为请假/抽调人员占比；staff 为总人数，为空时取满足配工的最少人数，
+    小于该人数时报错；rules 为 False 时规则表只有表头（使用默认规则）。
+    """
+    rng = random.Random(seed)
+    names = workarea_names(workareas)
+    low, high = cranes_per_ship
+
+    berth_rows, ship_rows, people, leader_rules, clerk_rules = [], [], [], [], []
+    quota_areas = []
+    ship_no = 0
+    for w, wa in enumerate(names):
+        min_per, max_per = DEFAULT_CLERK_LIMITS.get(wa, FALLBACK_CLERK_LIMITS)
+        prefix = CRANE_PREFIXES[w % len(CRANE_PREFIXES)] + (str(w // len(CRANE_PREFIXES)) if w >= len(CRANE_PREFIXES) else "")
+
+        # 船舶及桥吊：船舶沿泊位从左到右连续占用桥吊
+        counts = [rng.randint(low, high) for _ in range(len(range(w, ships, workareas)))]
+        if not counts:
+            continue
+        while not _feasible(sum(counts), min_per, max_per):
+            counts[-1] += 1
+        cranes = [f"{prefix}{i + 1}" for i in range(sum(counts))]
+        start = 0
+        large = 0
+        for count in counts:
+            ship_no += 1
+            ship_rows.append({"船舶名称": f"船{ship_no}", SHIP_CRANE_COLUMN: ",".join(cranes[start:start + count])})
+            start += count
+            large += count > LARGE_SHIP_CRANES
+        for i in range(0, len(cranes), CRANES_PER_BERTH):
+            berth_rows.append({"泊位": f"{wa}{i // CRANES_PER_BERTH + 1}号泊位", "工作地": wa,
+                               BERTH_CRANE_COLUMN: ",".join(cranes[i:i + CRANES_PER_BERTH])})
+
+        # 可用人员：组长平均每人带2艘船；全员上岗的工作地取平均桥吊数对应的人数，按需派员的多备两成
+        total = len(cranes)
+        num_leaders = -(-len(counts) // 2)
+        fewest, most = -(-total // max_per), total // min_per
+        if crane_policy(wa)["use_all_staff"]:
+            num_clerks = min(max(round(total * 2 / (min_per + max_per)), fewest), most)
+        else:
+            num_clerks = fewest + fewest // 5
+            quota_areas.append(wa)
+        people += [("理货组长", wa)] * num_leaders + [("理货员", wa)] * num_clerks
+
+        if rules:
+            leader_rules.append({"工作地": wa, "理货组长": None, "船舶大小": "合计",
+                                 "最多带船数": -(-len(counts) // num_leaders) + 1})
+            leader_rules.append({"工作地": wa, "理货组长": None, "船舶大小": "大船",
+                                 "最多带船数": -(-large // num_leaders) + 1})
+            clerk_rules.append({"工作地": wa, "理货员": None, "最少桥吊数": min_per, "最多桥吊数": max_per})
+
+    # 总人数：不可用人员按比例补充，指定总人数时其余人员补充到按需派员的工作地或闸口
+    unavailable = round(len(people) * leave_ratio / (1 - leave_ratio)) if leave_ratio < 1 else 0
+    required = len(people) + unavailable
+    if staff is not None:
+        if staff < required:
+            raise ValueError(f"总人数至少为{required}人（{len(people)}人参与配工，{unavailable}人请假/抽调）")
+        extra_areas = quota_areas + ["闸口"]
+        people += [("理货员", extra_areas[i % len(extra_areas)]) for i in range(staff - required)]
+
+    rows = []
+    flag_cols = [col for _, col in STATUS_COLUMNS]
+    for role, wa in people:
+        row = {"姓名": "", "岗位类型": role, WORKAREA_COLUMN: wa}
+        row.update({col: "是" if rng.random() < 0.05 and col not in UNAVAILABLE_COLUMNS else "否" for col in flag_cols})
+        rows.append(row)
+    for _ in range(unavailable):
+        row = {"姓名": "", "岗位类型": rng.choice(["理货组长", "理货员"]), WORKAREA_COLUMN: rng.choice(names)}
+        row.update({col: "否" for col in flag_cols})
+        row[rng.choice(UNAVAILABLE_COLUMNS)] = "是"
+        rows.append(row)
+    rng.shuffle(rows)
+    for i, row in enumerate(rows):
+        row["姓名"] = f"人{i + 1}"
+
+    return {
+        "泊位与桥吊关联表": pd.DataFrame(berth_rows, columns=["泊位", "工作地", BERTH_CRANE_COLUMN]),
+        "船舶与桥吊关联表": pd.DataFrame(ship_rows, columns=["船舶名称", SHIP_CRANE_COLUMN]),
+        "人员信息表": pd.DataFrame(rows, columns=["姓名", "岗位类型", WORKAREA_COLUMN] + flag_cols),
+        LEADER_SHEET: pd.DataFrame(leader_rules, columns=["工作地", "理货组长", "船舶大小", "最多带船数"]),
+        CLERK_SHEET: pd.DataFrame(clerk_rules, columns=["工作地", "理货员", "最少桥吊数", "最多桥吊数"]),
+    }
+
+
+def write_workbook(frames, target=None):
+    """写出工作簿，target为空时返回字节内容"""
+    output = target if target is not None else BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        for name, df in frames.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    if target is None:
+        return output.getvalue()
@@ -0,0 +1,69 @@
+import sys
+from io import BytesIO
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+BERTH_CRANE_COLUMN = "桥吊号（按从左到右顺序，逗号分隔）"
+SHIP_CRANE_COLUMN = "对应桥吊号（逗号分隔，需属于工作表1中的桥吊）"
+FLAG_COLUMNS = ["是否请假（是/否）", "公司抽调（是/否）", "负责闸口（是/否）", "驾驶员（是/否）", "设备员（是/否）",
+                "申请加班（是/否）"]
+
+
+def person(name, role, workarea, **flags):
+    return {"姓名": name, "岗位类型": role, "工作地（四期/自动化/闸口）": workarea,
+            **{col: "是" if flags.get(col[:2]) else "否" for col in FLAG_COLUMNS}}
+
+
+def make_frames():
+    """小规模样例：四期10个桥吊、2名理货员，自动化6个桥吊、4名理货员（每人2个）"""
+    return {
+        "泊位与桥吊关联表": pd.DataFrame({
+            "泊位": ["四期1号泊位", "四期2号泊位", "自动化1号泊位"],
+            "工作地": ["四期", "四期", "自动化"],
+            BERTH_CRANE_COLUMN: ["Q1,Q2,Q3,Q4,Q5", "Q6,Q7,Q8,Q9,Q10", "A1,A2,A3,A4,A5,A6"],
+        }),
+        "船舶与桥吊关联表": pd.DataFrame({
+            "船舶名称": ["甲轮", "乙轮", "丙轮", "丁轮", "戊轮"],
+            SHIP_CRANE_COLUMN: ["Q1,Q2,Q3,Q4", "Q5,Q6", "Q7,Q8,Q9,Q10", "A1,A2,A3,A4", "A5,A6"],
+        }),
+        "人员信息表": pd.DataFrame([
+            person("组长1", "理货组长", "四期"),
+            person("组长2", "理货组长", "四期", 申请=True),
+            person("组长3", "理货组长", "自动化"),
+            person("组长4", "理货组长", "自动化", 是否=True),
+            person("理货1", "理货员", "四期"),
+            person("理货2", "理货员", "四期", 驾驶=True),
+            person("理货3", "理货员", "自动化"),
+            person("理货4", "理货员", "自动化"),
+            person("理货5", "理货员", "自动化"),
+            person("理货6", "理货员", "自动化", 申请=True),
+            person("理货7", "理货员", "闸口", 负责=True),
+            person("理货8", "理货员", "四期", 公司=True),
+        ]),
+        "四期-组长带船限制": pd.DataFrame(columns=["工作地", "理货组长", "船舶大小", "最多带船数"]),
+        "理货员桥吊负责规则": pd.DataFrame(columns=["工作地", "理货员", "最少桥吊数", "最多桥吊数"]),
+    }
+
+
+def to_workbook(frames):
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        for name, df in frames.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    return output.getvalue()
+
+
+@pytest.fixture
+def sample_frames():
+    return make_frames()
+
+
+@pytest.fixture
+def sample_workbook(tmp_path):
+    path = tmp_path / "样例.xlsx"
+    path.write_bytes(to_workbook(make_frames()))
+    return path
@@ -0,0 +1,86 @@
+import random
+
+from engine import allocate_ships_to_leaders, build_crane_leader_index, match_staff_to_leaders
+from model import Allocation, WorkareaModel
+
+LEADERS = ["组长1", "组长2", "组长3"]
+
+
+def ship_model(large=3, small=4):
+    # 每艘船一个桥吊，大船在前
+    names = [f"大{i}" for i in range(large)] + [f"小{i}" for i in range(small)]
+    count = large + small
+    return WorkareaModel([f"Q{k + 1}" for k in range(count)], names, [True] * large + [False] * small,
+                         list(range(count + 1)), list(range(count)))
+
+
+def allocate(leaders, model, seed=0):
+    return allocate_ships_to_leaders(leaders, model, range(model.num_ships), random.Random(seed))
+
+
+def counts(allocations):
+    return sorted((len(a.ships), a.large_count) for a in allocations.values())
+
+
+def plan(allocations, model):
+    return {leader: a.ship_names(model) for leader, a in allocations.items()}
+
+
+def test_ships_are_balanced_across_leaders():
+    model = ship_model()
+    allocations, unassigned = allocate(LEADERS, model)
+    assert unassigned == []
+    # 7艘船3名组长：船舶数相差不超过1，大船每人1艘
+    assert counts(allocations) == [(2, 1), (2, 1), (3, 1)]
+    assert sorted(s for a in allocations.values() for s in a.ships) == list(range(model.num_ships))
+
+
+def test_ties_are_broken_by_seed():
+    model = ship_model(large=3, small=3)
+    plans = {seed: allocate(LEADERS, model, seed)[0] for seed in range(8)}
+    assert all(counts(allocations) == [(2, 1)] * 3 for allocations in plans.values())
+    assert plan(plans[0], model) == plan(allocate(LEADERS, model, 0)[0], model)
+    assert len({tuple(map(tuple, plan(allocations, model).values())) for allocations in plans.values()}) > 1
+
+
+def test_large_ships_are_capped_per_leader():
+    allocations, unassigned = allocate(LEADERS[:2], ship_model(large=5, small=0))
+    # 每人大船不超过均分值加1，多出的大船分给另一位组长
+    assert sorted(a.large_count for a in allocations.values()) == [2, 3] and unassigned == []
+
+
+def test_rule_caps_leave_ships_unassigned():
+    model = ship_model(large=0, small=4)
+    caps = [(1, None, None), (None, None, 1), (None, None, None)]
+    allocations, unassigned = allocate_ships_to_leaders(LEADERS, model, range(4), random.Random(0), caps)
+    assert [len(a.ships) for a in allocations.values()][:2] == [1, 1] and unassigned == []
+    allocations, unassigned = allocate_ships_to_leaders(LEADERS[:2], model, range(4), random.Random(0), caps[:2])
+    assert len(unassigned) == 2
+
+
+def test_without_leaders_every_ship_is_unassigned():
+    allocations, unassigned = allocate([], ship_model())
+    assert allocations == {} and unassigned == list(range(7))
+
+
+def shared_crane_model():
+    # Q3 由甲、乙两艘船共用，两船分属不同组长
+    model = WorkareaModel(["Q1", "Q2", "Q3", "Q4", "Q9"], ["甲", "乙"], [False, False], [0, 3, 5], [0, 1, 2, 2, 3])
+    allocations = {leader: Allocation() for leader in LEADERS}
+    allocations["组长1"].add(model, 0)
+    allocations["组长2"].add(model, 1)
+    return model, allocations
+
+
+def test_index_lists_every_leader_of_a_shared_crane():
+    model, allocations = shared_crane_model()
+    assert build_crane_leader_index(model, allocations) == [0b001, 0b001, 0b011, 0b010, 0]
+
+
+def test_clerk_spanning_leaders_goes_to_first_leader():
+    model, allocations = shared_crane_model()
+    messages = []
+    rows = match_staff_to_leaders("四期", model, {"理货1": [2, 3], "理货2": [4]}, allocations, messages)
+    assert [(r["理货员"], r["理货组长"], r["负责船舶"]) for r in rows] == [("理货1", "组长1", "甲"),
+                                                                    ("理货2", "未分配组长", "")]
+    assert messages and "理货1（组长1/组长2）" in messages[0][1]
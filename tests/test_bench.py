@@ -0,0 +1,44 @@
+import json
+from io import BytesIO
+
+import pytest
+
+import bench
+from cli import main
+from engine import run_schedule
+from loader import read_workbook
+from synthetic import generate_frames, workarea_names, write_workbook
+from validate import validate_workbook
+
+
+@pytest.mark.parametrize("ships, workareas", [(12, 2), (60, 3)])
+def test_generated_workbook_validates_and_schedules(ships, workareas):
+    data = write_workbook(generate_frames(ships=ships, workareas=workareas, seed=0))
+    assert validate_workbook(BytesIO(data)).empty
+    frames, missing = read_workbook(BytesIO(data))
+    assert missing == [] and len(frames["船舶与桥吊关联表"]) == ships
+    result = run_schedule(frames, seed=0)
+    assert list(result["results"]) == workarea_names(workareas)
+    for wa, df in result["results"].items():
+        # 生成的人数满足配工：每个工作地的桥吊全部分配
+        assert df["桥吊数量"].sum() == result["workarea_data"][wa]["model"].num_cranes
+
+
+def test_compare_flags_only_real_slowdowns():
+    current = {"stages": {"解析Excel": 0.30, "人员筛选": 0.004, "导出Excel": 0.10}}
+    baseline = {"stages": {"解析Excel": 0.20, "人员筛选": 0.001}}
+    rows = {stage: (ratio, slower) for stage, _, _, ratio, slower in bench.compare(current, baseline)}
+    # 人员筛选慢了4倍但绝对差不足 MIN_DELTA，视为计时抖动；基线缺失的阶段不判定
+    assert rows == {"解析Excel": (pytest.approx(1.5), True), "人员筛选": (pytest.approx(4.0), False),
+                    "导出Excel": (None, False)}
+
+
+def test_bench_requires_a_recorded_baseline(tmp_path, capsys):
+    path = tmp_path / "基线.json"
+    args = ["bench", "--scenario", "small", "--repeat", "1", "--baseline", str(path)]
+    assert main(args) == 1 and "--save-baseline" in capsys.readouterr().err
+    assert main([*args, "--save-baseline"]) == 0
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert list(saved["small"]["stages"]) == bench.STAGES
+    # 放宽判定倍数，只验证有基线时的比较流程
+    assert main([*args, "--threshold", "1000"]) == 0
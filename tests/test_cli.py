@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from cli import main
+from conftest import make_frames, to_workbook
+
+
+def test_batch_writes_one_result_per_workbook(sample_workbook, tmp_path, capsys):
+    output = tmp_path / "结果"
+    assert main(["batch", str(sample_workbook), "-o", str(output), "-j", "1"]) == 0
+    target = output / "样例_配工结果.xlsx"
+    assert target.exists()
+    assert set(pd.read_excel(target, sheet_name=None)) >= {"四期配工结果", "自动化配工结果"}
+    assert "成功1个" in capsys.readouterr().out
+
+
+def test_batch_reports_failed_workbooks(sample_workbook, tmp_path, capsys):
+    frames = make_frames()
+    del frames["人员信息表"]
+    broken = tmp_path / "缺表.xlsx"
+    broken.write_bytes(to_workbook(frames))
+    assert main(["batch", str(sample_workbook), str(broken), "-o", str(tmp_path / "结果"), "-j", "1"]) == 1
+    out = capsys.readouterr().out
+    assert "[失败]" in out and "缺表.xlsx" in out and "失败1个" in out
+
+
+def test_batch_without_workbooks_fails(tmp_path, capsys):
+    assert main(["batch", str(tmp_path), "-o", str(tmp_path / "结果")]) == 1
+    assert "未找到" in capsys.readouterr().err
+
+
+def test_subcommand_is_required():
+    with pytest.raises(SystemExit) as exc:
+        main([])
+    assert exc.value.code == 2
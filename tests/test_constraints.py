@@ -0,0 +1,65 @@
+import pandas as pd
+
+from conftest import make_frames
+from constraints import CLERK_SHEET, LEADER_SHEET, compile_constraints
+from engine import run_schedule
+
+LEADER_COLUMNS = ["工作地", "理货组长", "船舶大小", "最多带船数"]
+CLERK_COLUMNS = ["工作地", "理货员", "最少桥吊数", "最多桥吊数"]
+
+
+def compile_rules(leader_rows=(), clerk_rows=()):
+    return compile_constraints(pd.DataFrame(list(leader_rows), columns=LEADER_COLUMNS),
+                               pd.DataFrame(list(clerk_rows), columns=CLERK_COLUMNS))
+
+
+def test_personal_rule_beats_workarea_rule():
+    table = compile_rules(clerk_rows=[("四期", None, 4, 6), (None, "张三", 2, 3)])
+    assert table.clerk_limits("四期", "张三") == (2, 3)
+    assert table.clerk_rule_row("四期", "张三") == 3
+    assert table.clerk_limits("四期", "李四") == (4, 6)
+
+
+def test_clerk_precedence_order():
+    table = compile_rules(clerk_rows=[(None, None, 1, 8), ("四期", None, 4, 6), (None, "张三", 2, 3),
+                                      ("四期", "张三", 5, 5)])
+    assert table.clerk_limits("四期", "张三") == (5, 5)
+    assert table.clerk_limits("自动化", "张三") == (2, 3)
+    assert table.clerk_limits("四期") == (4, 6)
+    assert table.clerk_limits("自动化") == (1, 8)
+
+
+def test_default_clerk_limits_without_rules():
+    table = compile_rules()
+    assert table.clerk_limits("四期", "张三") == (4, 6)
+    assert table.clerk_limits("自动化", "张三") == (2, 2)
+    assert table.clerk_rule_row("四期", "张三") is None
+
+
+def test_leader_limits_and_invalid_rows():
+    table = compile_rules(leader_rows=[(None, None, "大船", 1), ("四期", "王五", None, 3), ("四期", None, "中船", 2)],
+                          clerk_rows=[(None, None, 5, 4)])
+    assert table.leader_limit("四期", "赵六", "大船") == 1
+    assert table.leader_limit("四期", "王五") == 3
+    assert table.leader_limit("四期", "赵六") is None
+    assert [sheet for sheet, _, _ in table.issues].count(CLERK_SHEET) == 1
+    assert len(table.issues) == 2
+
+
+def test_rule_sheets_drive_the_schedule():
+    frames = make_frames()
+    frames[CLERK_SHEET] = pd.DataFrame([("四期", None, 5, 5)], columns=CLERK_COLUMNS)
+    frames[LEADER_SHEET] = pd.DataFrame([("四期", "组长1", None, 1), ("四期", "组长2", None, 1)],
+                                        columns=LEADER_COLUMNS)
+    result = run_schedule(frames, seed=0)
+    assert result["results"]["四期"]["桥吊数量"].tolist() == [5, 5]
+    assert result["details"]["四期"]["总船舶数"].tolist() == [1, 1]
+    assert any("未分配组长" in text for _, text in result["messages"]["四期"])
+
+
+def test_non_finite_counts_are_invalid_rows():
+    table = compile_rules(leader_rows=[("四期", "王五", None, float("inf"))],
+                          clerk_rows=[(None, "张三", "-inf", 3), (None, "李四", 2, float("nan"))])
+    assert table.leader_limit("四期", "王五") is None
+    assert table.clerk_limits("四期", "张三") == (4, 6)
+    assert len(table.issues) == 3
@@ -0,0 +1,38 @@
+import pandas as pd
+
+from conftest import BERTH_CRANE_COLUMN, SHIP_CRANE_COLUMN
+from engine import build_workarea_data, clean_crane_name, parse_crane_tables
+
+
+def parse(ship_cranes, berth_cranes=("q1，Q2, Q3", "A1,A2")):
+    berths = pd.DataFrame({"工作地": ["四期", "自动化"][:len(berth_cranes)], BERTH_CRANE_COLUMN: list(berth_cranes)})
+    ships = pd.DataFrame({"船舶名称": [f"船{i + 1}" for i in range(len(ship_cranes))], SHIP_CRANE_COLUMN: ship_cranes})
+    return parse_crane_tables(berths, ships)
+
+
+def test_full_width_commas_and_lowercase_names_are_normalised():
+    parsed = parse(["q1，q2", " A1 , a2 "])
+    assert parsed["berth_cranes"]["桥吊号"].tolist() == ["Q1", "Q2", "Q3", "A1", "A2"]
+    assert parsed["ship_cranes"]["桥吊号"].tolist() == ["Q1", "Q2", "A1", "A2"]
+    assert parsed["ships"]["工作地"].tolist() == ["四期", "自动化"]
+    assert clean_crane_name("q1，Q2,") == ["Q1", "Q2"]
+
+
+def test_unknown_cranes_and_empty_ship_rows_are_reported():
+    parsed = parse(["Q1,Z9", None, "Z8", "Q2/Q3"])
+    issues = parsed["issues"]
+    assert issues.loc[issues["问题"] == "桥吊号未在泊位与桥吊关联表中登记", "桥吊号"].tolist() == ["Z9", "Z8", "Q2/Q3"]
+    assert issues.loc[issues["问题"] == "桥吊号格式不正确", "桥吊号"].tolist() == ["Q2/Q3"]
+    # 空行及只有未登记桥吊的船舶无法确定工作地，按Excel行号报告
+    unmatched = issues[issues["问题"].str.startswith("船舶无已登记桥吊")]
+    assert unmatched["名称"].tolist() == ["船2", "船3", "船4"] and unmatched["行号"].tolist() == [3, 4, 5]
+    assert parsed["ships"]["桥吊数量"].tolist() == [2, 0, 1, 1]
+
+
+def test_workarea_data_groups_ships_and_sizes(sample_frames):
+    parsed = parse_crane_tables(sample_frames["泊位与桥吊关联表"], sample_frames["船舶与桥吊关联表"])
+    data = build_workarea_data(parsed)
+    assert [s["船舶名称"] for s in data["四期"]["ships"]] == ["甲轮", "乙轮", "丙轮"]
+    assert data["四期"]["large_ships"] == ["甲轮", "丙轮"] and data["四期"]["small_ships"] == ["乙轮"]
+    assert data["自动化"]["all_cranes"] == [f"A{i}" for i in range(1, 7)]
+    assert data["四期"]["crane_to_ship"]["Q5"] == ["乙轮"]
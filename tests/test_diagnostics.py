@@ -0,0 +1,41 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from diagnostics import Recorder, current_recorder, stage, submit, traced
+
+
+@traced("求和", lambda result, values: {"个数": len(values)})
+def total(values):
+    with stage("累加", 步骤=1) as counts:
+        counts["结果"] = sum(values)
+    return counts["结果"]
+
+
+def test_stages_are_noops_without_recorder():
+    assert current_recorder() is None
+    assert total([1, 2, 3]) == 6
+
+
+def test_recorder_collects_nested_stages_and_counts():
+    with Recorder() as recorder:
+        total([1, 2, 3])
+    records = recorder.records()
+    assert [r["阶段"] for r in records] == ["求和", "累加"]
+    assert [r["层级"] for r in records] == [0, 1]
+    assert records[0]["个数"] == 3 and records[1]["结果"] == 6
+    assert current_recorder() is None
+
+
+def test_submit_carries_recorder_into_worker_threads():
+    with Recorder() as recorder, ThreadPoolExecutor(2) as pool:
+        for future in [submit(pool, total, [i]) for i in range(4)]:
+            future.result()
+    assert sum(r["阶段"] == "求和" for r in recorder.records()) == 4
+
+
+def test_chrome_trace_has_one_complete_event_per_stage():
+    with Recorder() as recorder:
+        total([1])
+    events = json.loads(recorder.chrome_trace())["traceEvents"]
+    assert [(e["name"], e["ph"]) for e in events] == [("求和", "X"), ("累加", "X")]
+    assert json.loads(recorder.to_json())["阶段"][0]["阶段"] == "求和"
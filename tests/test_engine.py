@@ -0,0 +1,91 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import engine
+from conftest import make_frames, to_workbook
+from engine import (CRANE_POLICIES, DEFAULT_POLICY, crane_policy, has_results, register_policy, run_schedule,
+                    schedule_file)
+
+ROOT = Path(__file__).resolve().parents[1]
+
+SCRIPT = """
+import hashlib
+from engine import run_schedule
+from synthetic import generate_frames
+
+result = run_schedule(generate_frames(ships=240, workareas=4, seed=1), seed=0)
+digest = hashlib.sha256()
+for wa in sorted(result["results"]):
+    digest.update(result["results"][wa].to_csv().encode())
+print(digest.hexdigest())
+"""
+
+
+def crane_owners(result, workarea):
+    df = result["results"][workarea]
+    return [c.strip() for cranes in df["负责桥吊"] for c in cranes.split(",")]
+
+
+def test_run_schedule_assigns_every_crane_once(sample_frames):
+    result = run_schedule(sample_frames, seed=0)
+    assert has_results(result["results"])
+    assert sorted(crane_owners(result, "四期"), key=lambda c: int(c[1:])) == [f"Q{i}" for i in range(1, 11)]
+    assert sorted(crane_owners(result, "自动化")) == [f"A{i}" for i in range(1, 7)]
+    # 自动化每人2个桥吊，多出的理货员待命
+    assert result["results"]["自动化"]["桥吊数量"].tolist() == [2, 2, 2]
+
+
+def test_unavailable_staff_are_not_scheduled(sample_frames):
+    result = run_schedule(sample_frames, seed=0)
+    scheduled = {name for df in result["results"].values() for name in (*df["理货组长"], *df["理货员"])}
+    assert not scheduled & {"组长4", "理货7", "理货8"}
+
+
+def test_same_seed_same_plan(sample_frames):
+    first, second = run_schedule(sample_frames, seed=3), run_schedule(make_frames(), seed=3)
+    for wa in first["results"]:
+        assert first["results"][wa].equals(second["results"][wa])
+
+
+def test_schedule_file_requires_every_sheet(tmp_path):
+    frames = make_frames()
+    del frames["船舶与桥吊关联表"]
+    path = tmp_path / "缺表.xlsx"
+    path.write_bytes(to_workbook(frames))
+    with pytest.raises(ValueError, match="船舶与桥吊关联表"):
+        schedule_file(path)
+
+
+def test_workareas_map_to_registered_policies():
+    assert crane_policy("四期") is CRANE_POLICIES["all_staff"] and crane_policy("四期")["use_all_staff"]
+    assert crane_policy("自动化") is CRANE_POLICIES["quota"]
+    # 未登记的工作地使用默认策略
+    assert crane_policy("新码头") is CRANE_POLICIES[DEFAULT_POLICY]
+
+
+def test_registered_policy_owns_the_crane_split(monkeypatch, sample_frames):
+    monkeypatch.setattr(engine, "CRANE_POLICIES", dict(CRANE_POLICIES))
+    monkeypatch.setitem(engine.WORKAREA_POLICIES, "自动化", "后排")
+
+    @register_policy("后排")
+    def split_last(workarea, total_cranes, staff, min_per, max_per, messages, limits):
+        return {person: min_per for person in staff[-(total_cranes // min_per):]}
+
+    result = run_schedule(sample_frames, seed=0)
+    # 默认按需派员取前3人（理货3-5）；该策略取后3人，理货3待命
+    assert result["results"]["自动化"]["理货员"].tolist() == ["理货4", "理货5", "理货6"]
+    assert result["remaining"]["自动化"] == ["理货3"]
+
+
+def plan_digest(hash_seed):
+    env = {**os.environ, "PYTHONHASHSEED": str(hash_seed)}
+    return subprocess.run([sys.executable, "-c", SCRIPT], cwd=ROOT, env=env, capture_output=True, text=True,
+                          check=True).stdout
+
+
+def test_same_seed_same_plan_across_hash_seeds():
+    assert len({plan_digest(hash_seed) for hash_seed in (0, 1, 2, 3)}) == 1
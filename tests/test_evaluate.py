@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+from engine import run_schedule
+from evaluate import PlanEvaluator, best_of_seeds, combine_results, read_plan_workbook
+from export import build_report, export_report
+from scenario import prepare_base
+from synthetic import generate_frames
+
+COVERAGE = ["未分配船舶", "重复船舶", "未知船舶", "未分配桥吊", "重复桥吊", "未知桥吊", "不可用人员"]
+
+
+@pytest.fixture(scope="module")
+def frames():
+    return generate_frames(ships=20, workareas=2, seed=0)
+
+
+@pytest.fixture(scope="module")
+def evaluator(frames):
+    return PlanEvaluator.from_base(prepare_base(frames))
+
+
+@pytest.fixture(scope="module")
+def result(frames):
+    return run_schedule(frames, seed=0)
+
+
+def test_generated_plan_covers_every_ship_and_crane(evaluator, result):
+    summary = evaluator.evaluate(combine_results(result["results"]), result["details"])["summary"]
+    assert (summary[COVERAGE] == 0).all().all()
+    assert list(summary["船舶数"]) == [10, 10]
+
+
+def test_missing_and_repeated_rows_are_counted(evaluator, result):
+    plan = combine_results(result["results"])
+    clerk = plan[plan["理货员"] != ""].iloc[0]
+    cranes = len(str(clerk["负责桥吊"]).split(","))
+    dropped = evaluator.evaluate(plan.drop(index=clerk.name), result["details"])["summary"]
+    repeated = evaluator.evaluate(pd.concat([plan, plan.loc[[clerk.name]]], ignore_index=True),
+                                  result["details"])["summary"]
+    assert dropped["未分配桥吊"].sum() == cranes
+    assert repeated["重复桥吊"].sum() == cranes
+
+
+def test_exported_workbook_scores_like_the_plan(evaluator, result, tmp_path):
+    target = tmp_path / "结果.xlsx"
+    export_report(build_report(result["results"], result["details"], result["workarea_data"], result["messages"],
+                               result["remaining"]), "xlsx", target)
+    plan, leaders = read_plan_workbook(target)
+    expected = evaluator.evaluate(combine_results(result["results"]), result["details"])["score"]
+    assert evaluator.evaluate(plan, leaders)["score"] == pytest.approx(expected)
+
+
+def test_best_of_seeds_ranks_by_score(frames):
+    ranking, best = best_of_seeds(prepare_base(frames), runs=4, jobs=1)
+    assert sorted(ranking["种子"]) == [0, 1, 2, 3]
+    assert ranking["得分"].is_monotonic_increasing and best == ranking["种子"].iloc[0]
+
+
+def test_seeds_explore_different_plans():
+    ranking, _ = best_of_seeds(prepare_base(generate_frames(ships=40, workareas=2, seed=0)), runs=4, jobs=1)
+    assert ranking["得分"].nunique() > 1
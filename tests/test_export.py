@@ -0,0 +1,57 @@
+import zipfile
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from engine import run_schedule
+from export import (CRANE_VIEW_SHEET, ISSUE_SHEET, SHIP_VIEW_SHEET, SUMMARY_SHEET, build_report, export_report,
+                    report_filename)
+from synthetic import generate_frames
+
+
+@pytest.fixture(scope="module")
+def result():
+    return run_schedule(generate_frames(ships=20, workareas=2, seed=0), seed=0)
+
+
+@pytest.fixture(scope="module")
+def report(result):
+    return build_report(result["results"], result["details"], result["workarea_data"], result["messages"],
+                        result["remaining"])
+
+
+def test_views_list_every_crane_and_ship(result, report):
+    data = result["workarea_data"]
+    assert len(report[CRANE_VIEW_SHEET]) == sum(len(d["all_cranes"]) for d in data.values())
+    assert len(report[SHIP_VIEW_SHEET]) == sum(len(d["ships"]) for d in data.values())
+    assert set(report[SUMMARY_SHEET]["理货组长"]) == {leader for df in result["details"].values()
+                                                     for leader in df["理货组长"]}
+
+
+def test_unassigned_crane_is_listed_as_issue(result):
+    wa = next(iter(result["results"]))
+    df = result["results"][wa]
+    results = {**result["results"], wa: df.drop(index=df.index[df["理货员"] != ""][0])}
+    issues = build_report(results, result["details"], result["workarea_data"])[ISSUE_SHEET]
+    assert (issues["类型"] == "桥吊无理货员").any()
+
+
+def test_xlsx_export_round_trips(report):
+    sheets = pd.read_excel(BytesIO(export_report(report, "xlsx")), sheet_name=None)
+    assert list(sheets) == [name for name, df in report.items() if not df.empty]
+    assert len(sheets[CRANE_VIEW_SHEET]) == len(report[CRANE_VIEW_SHEET])
+
+
+def test_csv_export_is_a_zip_with_one_file_per_sheet(report):
+    with zipfile.ZipFile(BytesIO(export_report(report, "csv"))) as zf:
+        names = zf.namelist()
+        summary = pd.read_csv(zf.open(f"{SUMMARY_SHEET}.csv"), encoding="utf-8-sig")
+    assert names == [f"{name}.csv" for name, df in report.items() if not df.empty]
+    assert len(summary) == len(report[SUMMARY_SHEET])
+    assert report_filename("配工结果", "csv") == "配工结果.zip"
+
+
+def test_unknown_format_is_rejected(report):
+    with pytest.raises(ValueError, match="不支持的导出格式"):
+        export_report(report, "pdf")
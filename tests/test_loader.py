@@ -0,0 +1,52 @@
+import pandas as pd
+
+from conftest import make_frames, to_workbook
+from loader import (REQUIRED_SHEETS, SCHEDULE_SHEETS, clean_frame, excel_rows, match_sheet_names, read_workbook,
+                    split_list)
+
+
+def test_match_sheet_names_by_keyword():
+    mapping, missing = match_sheet_names(["1-泊位与桥吊关联表", "人员信息表（当日）", "其他"])
+    assert mapping == {"泊位与桥吊关联表": "1-泊位与桥吊关联表", "人员信息表": "人员信息表（当日）"}
+    assert missing == [key for key in REQUIRED_SHEETS if key not in mapping]
+
+
+def test_match_sheet_names_prefers_exact_name():
+    mapping, _ = match_sheet_names(["人员信息表（旧）", " 人员信息表 "])
+    assert mapping["人员信息表"] == " 人员信息表 "
+
+
+def test_clean_frame_strips_text_and_drops_blank_rows():
+    df = clean_frame(pd.DataFrame({" 姓名 ": [" 人1 ", None, "人2"], "数量": [1, None, 2]}))
+    assert list(df.columns) == ["姓名", "数量"]
+    assert list(df["姓名"]) == ["人1", "人2"] and list(df["数量"]) == [1, 2]
+    # 保留原行索引，问题可定位到Excel行号
+    assert list(excel_rows(df)) == [2, 4]
+
+
+def test_read_workbook_parses_every_required_sheet(sample_workbook):
+    frames, missing = read_workbook(sample_workbook)
+    assert missing == [] and set(frames) == set(REQUIRED_SHEETS)
+    assert frames["人员信息表"]["姓名"].tolist() == make_frames()["人员信息表"]["姓名"].tolist()
+
+
+def test_read_workbook_reports_missing_sheets(tmp_path):
+    frames = make_frames()
+    del frames["人员信息表"]
+    path = tmp_path / "缺表.xlsx"
+    path.write_bytes(to_workbook(frames))
+    assert read_workbook(path) == (None, ["人员信息表"])
+
+
+def test_read_workbook_only_requires_given_sheets(tmp_path):
+    frames = {key: df for key, df in make_frames().items() if key in SCHEDULE_SHEETS}
+    path = tmp_path / "船期.xlsx"
+    path.write_bytes(to_workbook(frames))
+    assert read_workbook(path)[0] is None
+    parsed, missing = read_workbook(path, required=SCHEDULE_SHEETS)
+    assert missing == [] and set(parsed) == set(SCHEDULE_SHEETS)
+
+
+def test_split_list_accepts_full_width_commas_and_blanks():
+    assert split_list(" q1，Q2,, q3 ", upper=True) == ["Q1", "Q2", "Q3"]
+    assert split_list(float("nan")) == [] and split_list(None) == [] and split_list(5) == ["5"]
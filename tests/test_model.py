@@ -0,0 +1,30 @@
+from engine import build_workarea_data, parse_crane_tables
+from model import Allocation, WorkareaModel, bits_of, iter_bits, popcount
+from synthetic import generate_frames
+
+
+def test_bit_sets_round_trip_in_crane_order():
+    bits = bits_of([5, 0, 3, 3])
+    assert list(iter_bits(bits)) == [0, 3, 5] and popcount(bits) == 3
+
+
+def test_model_numbers_cranes_along_the_quay():
+    frames = generate_frames(ships=20, workareas=2, seed=0)
+    data = build_workarea_data(parse_crane_tables(frames["泊位与桥吊关联表"], frames["船舶与桥吊关联表"]))
+    for wa in data.values():
+        model = wa["model"]
+        assert model.cranes == list(wa["all_cranes"])
+        assert model.ship_names == [ship["船舶名称"] for ship in wa["ships"]]
+        for i, ship in enumerate(wa["ships"]):
+            assert model.crane_names(model.ship_bits[i]) == sorted(ship["桥吊列表"], key=model.crane_ids.get)
+
+
+def test_allocation_merges_shared_cranes():
+    model = WorkareaModel(["Q1", "Q2", "Q3"], ["甲", "乙"], [True, False], [0, 2, 3], [0, 1, 1])
+    allocation = Allocation()
+    allocation.add(model, 0)
+    allocation.add(model, 1)
+    assert (allocation.large_count, allocation.small_count, allocation.crane_count) == (1, 1, 2)
+    assert allocation.to_dict(model) == {"ships": ["甲", "乙"], "large_count": 1, "small_count": 1,
+                                         "cranes": ["Q1", "Q2"]}
+    assert model.crane_ships() == [0b01, 0b11, 0]
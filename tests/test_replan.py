@@ -0,0 +1,92 @@
+import random
+
+import pandas as pd
+import pytest
+
+from conftest import make_frames
+from constraints import compile_constraints
+from engine import build_workarea_data, parse_crane_tables, run_schedule
+from export import build_report, export_report
+from replan import _top_up, plan_state, read_plan, replan, replan_workarea
+from synthetic import generate_frames
+
+
+@pytest.fixture(scope="module")
+def frames():
+    # 该规模下有组长分不到理货员，其船舶只出现在组长汇总中
+    return generate_frames(ships=120, workareas=3, seed=1)
+
+
+@pytest.fixture(scope="module")
+def exported(frames, tmp_path_factory):
+    result = run_schedule(frames, seed=0)
+    target = tmp_path_factory.mktemp("plan") / "结果.xlsx"
+    export_report(build_report(result["results"], result["details"], result["workarea_data"], result["messages"],
+                               result["remaining"]), "xlsx", target)
+    return result, target
+
+
+def test_leader_without_clerks_keeps_ships(exported):
+    result, target = exported
+    plan = read_plan(target)
+    for wa, detail in result["details"].items():
+        state = plan_state(plan, wa)
+        assert {leader: ", ".join(ships) for leader, ships in state["leader_ships"].items()} == \
+            dict(zip(detail["理货组长"], detail["负责船舶"]))
+
+
+def test_replan_of_unchanged_input_has_no_changes(frames, exported):
+    assert replan(read_plan(exported[1]), frames, seed=0)["changes"].empty
+
+
+def test_clerk_on_leave_does_not_move_ships(frames, exported):
+    result, target = exported
+    wa, df = next((wa, df) for wa, df in result["results"].items() if df is not None and not df.empty)
+    clerk = df["理货员"].iloc[0]
+    changed = {name: df.copy() for name, df in frames.items()}
+    staff = changed["人员信息表"]
+    staff.loc[staff["姓名"] == clerk, "是否请假（是/否）"] = "是"
+    changes = replan(read_plan(target), changed, seed=0)["changes"]
+    assert changes[changes["对象类型"] == "船舶"].empty
+    assert ((changes["名称"] == clerk) & (changes["变更"] == "移除")).any()
+
+
+def test_top_up_takes_adjacent_end_crane():
+    staff_crane_map = {"a": [0, 1, 2, 3, 4, 5], "b": [6], "c": [7, 8, 9, 10, 11, 12]}
+    limits = {"a": (4, 6), "b": (3, 6), "c": (4, 6)}
+    assert _top_up(staff_crane_map, "b", limits)
+    assert sorted(staff_crane_map["b"]) == [5, 6, 7]
+    assert staff_crane_map["a"] == [0, 1, 2, 3, 4] and staff_crane_map["c"] == [8, 9, 10, 11, 12]
+
+
+def test_top_up_fails_without_adjacent_surplus():
+    staff_crane_map = {"a": [0, 1, 2, 3], "b": [4], "c": [5, 6, 7, 8, 9, 10]}
+    limits = {"a": (4, 6), "b": (2, 6), "c": (4, 6)}
+    assert _top_up(staff_crane_map, "b", limits)
+    assert staff_crane_map["b"] == [4, 5]
+    staff_crane_map = {"a": [0, 1, 2, 3, 4], "b": [5], "c": [6, 7, 8, 9], "d": [10, 11, 12, 13, 14, 15]}
+    limits = {"a": (5, 6), "b": (2, 6), "c": (4, 6), "d": (4, 6)}
+    assert not _top_up(staff_crane_map, "b", limits)
+
+
+def test_standby_clerk_without_adjacent_surplus_is_named():
+    sample = make_frames()
+    data = build_workarea_data(parse_crane_tables(sample["泊位与桥吊关联表"], sample["船舶与桥吊关联表"]))["四期"]
+    constraints = compile_constraints(pd.DataFrame(columns=["工作地", "理货组长", "船舶大小", "最多带船数"]),
+                                      pd.DataFrame([("四期", "c", 2, 2)],
+                                                   columns=["工作地", "理货员", "最少桥吊数", "最多桥吊数"]))
+    state = {"leader_ships": {"组长1": ["甲轮", "乙轮", "丙轮"]}, "clerk_leader": {"a": "组长1", "b": "组长1"},
+             "clerk_cranes": {"a": ["Q1", "Q2", "Q3", "Q4", "Q5"], "b": ["Q6", "Q7", "Q8", "Q9", "Q10"]}}
+    df, remaining, _, messages = replan_workarea("四期", state, data, ["组长1"], ["a", "b", "c"], constraints,
+                                                 random.Random(0), use_all_staff=True)
+    # a、b各富余1个桥吊但不相邻，c凑不足2个：桥吊退回原处，c转为待命并在提示中点名
+    assert remaining == ["c"] and df["桥吊数量"].tolist() == [5, 5]
+    assert any("理货员c无法" in text for level, text in messages if level == "warning")
+
+
+def test_plan_state_without_summary_falls_back_to_clerk_rows():
+    plan = pd.DataFrame({"工作地": ["四期"] * 2, "理货组长": ["甲", "未分配组长"], "负责船舶": ["船1, 船2", ""],
+                         "理货员": ["a", "b"], "负责桥吊": ["Q1, Q2", "Q3"]})
+    state = plan_state(plan, "四期")
+    assert state["leader_ships"] == {"甲": ["船1", "船2"]}
+    assert state["clerk_leader"] == {"a": "甲", "b": None}
@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+from conftest import make_frames
+from constraints import LEADER_SHEET
+from engine import run_schedule
+from roster import HistoryStore, day_records, fairness_report, plan_days
+from synthetic import generate_frames
+
+
+def with_duplicate_staff(frames):
+    staff = frames["人员信息表"]
+    return {**frames, "人员信息表": pd.concat([staff, staff.iloc[[0]]], ignore_index=True)}
+
+
+def test_plan_days_records_each_available_person_once():
+    frames = generate_frames(ships=20, workareas=2, seed=0)
+    with HistoryStore() as store:
+        for day, result in plan_days([("d1", frames), ("d2", frames)], store, seed=0):
+            # 重复写入同一天时替换原有记录
+            store.record_day(day, day_records(result))
+        assert store.days() == ["d1", "d2"]
+        report = fairness_report(store)
+    assert not report["姓名"].duplicated().any()
+    assert (report["可用天数"] == 2).all()
+
+
+def test_duplicate_staff_names_are_rejected_before_scheduling():
+    frames = with_duplicate_staff(generate_frames(ships=20, workareas=2, seed=0))
+    with HistoryStore() as store:
+        with pytest.raises(ValueError, match="姓名重复"):
+            list(plan_days([("d1", frames)], store, seed=0))
+        assert store.days() == []
+
+
+def test_leader_without_ships_did_not_work():
+    frames = make_frames()
+    # 组长2（申请加班）上限为0艘船：出现在组长汇总中，但当天未上岗，也不计加班
+    frames[LEADER_SHEET] = pd.DataFrame([("四期", "组长2", None, 0)], columns=["工作地", "理货组长", "船舶大小", "最多带船数"])
+    records = {row[0]: row for row in day_records(run_schedule(frames, seed=0))}
+    assert records["组长2"][3:] == (0, 0, 0, 0, 0)
+    assert records["组长1"][3] == 1 and records["理货6"][3] == 0
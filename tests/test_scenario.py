@@ -0,0 +1,37 @@
+import pytest
+
+from constraints import ConstraintTable
+from scenario import BASE_NAME, compare_scenarios, load_scenarios, prepare_base
+from synthetic import generate_frames
+
+
+def test_load_scenarios_names_unnamed_scenarios():
+    scenarios = load_scenarios('[{"增加组长": {"四期": 1}}, {"名称": "上限4", "组长带船上限": 4}]')
+    assert [spec["名称"] for spec in scenarios] == ["方案1", "上限4"]
+
+
+@pytest.mark.parametrize("text", ['[{"名称": "甲"}, {"名称": "甲"}]', f'[{{"名称": "{BASE_NAME}"}}]'],
+                         ids=["repeated", "base"])
+def test_load_scenarios_rejects_duplicate_names(text):
+    with pytest.raises(ValueError, match="方案名称不能重复"):
+        load_scenarios(text)
+
+
+def test_load_scenarios_rejects_unknown_keys():
+    with pytest.raises(ValueError, match="无法识别的修改项"):
+        load_scenarios('[{"名称": "甲", "增加船舶": 1}]')
+
+
+def test_compare_scenarios_starts_with_base():
+    base = prepare_base(generate_frames(ships=20, workareas=2, seed=0))
+    overview, detail = compare_scenarios(base, load_scenarios('[{"名称": "甲", "组长带船上限": 4}]'), jobs=1)
+    assert list(overview["方案"]) == [BASE_NAME, "甲"]
+    assert set(detail["方案"]) == {BASE_NAME, "甲"}
+
+
+def test_rule_violations_are_counted_from_the_check(monkeypatch):
+    violation = {"规则表": "理货员桥吊负责规则", "行号": 2, "对象": "理货1", "规则": "每人3-6个桥吊", "实际": "2个"}
+    monkeypatch.setattr(ConstraintTable, "check_assignment", lambda self, *args: [violation])
+    base = prepare_base(generate_frames(ships=20, workareas=2, seed=0))
+    _, detail = compare_scenarios(base, [], jobs=1)
+    assert list(detail["规则违反"]) == [1, 1]
@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+from http.client import HTTPConnection
+
+import pytest
+
+import service
+from service import make_server
+from synthetic import generate_frames, write_workbook
+
+
+def slow_job(frames, params):
+    time.sleep(3)
+    return "text/plain", b"done"
+
+
+@pytest.fixture
+def server():
+    server = make_server(port=0, workers=1, queue_size=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def connect(server):
+    return HTTPConnection(*server.server_address, timeout=60)
+
+
+def test_unknown_post_keeps_connection_usable(server):
+    conn = connect(server)
+    conn.request("POST", "/unknown", body=b"x" * 1000)
+    response = conn.getresponse()
+    response.read()
+    assert response.status == 404
+    conn.request("GET", "/health")
+    response = conn.getresponse()
+    assert response.status == 200 and json.loads(response.read()) == {"status": "ok"}
+
+
+def test_full_service_rejects_before_parsing(server):
+    server.scheduler.acquire()
+    try:
+        conn = connect(server)
+        conn.request("POST", "/schedule", body=b"not a workbook")
+        response = conn.getresponse()
+        response.read()
+    finally:
+        server.scheduler.slots.release()
+    assert response.status == 503 and response.getheader("Retry-After") == "1"
+    assert server.scheduler.metrics.snapshot()["rejected"] == 1
+
+
+def test_bad_workbook_issues_come_back_from_the_worker(server):
+    frames = generate_frames(ships=10, workareas=1, seed=0)
+    del frames["人员信息表"]
+    conn = connect(server)
+    conn.request("POST", "/schedule", body=write_workbook(frames))
+    response = conn.getresponse()
+    payload = json.loads(response.read())
+    # 预检在工作进程中执行，BadRequest 连同问题清单传回
+    assert response.status == 400 and any("人员信息表" in issue for issue in payload["issues"])
+    # 请求结束后位置已释放
+    assert server.scheduler.slots.acquire(blocking=False)
+    server.scheduler.slots.release()
+
+
+def test_schedule_caches_by_content(server):
+    data = write_workbook(generate_frames(ships=10, workareas=1, seed=0))
+    states = []
+    for query in ("/schedule?seed=0", "/schedule?seed=0", "/schedule?seed=0&format=json"):
+        conn = connect(server)
+        conn.request("POST", query, body=data)
+        response = conn.getresponse()
+        payload = json.loads(response.read())
+        assert response.status == 200 and payload["workareas"]
+        states.append(response.getheader("X-Cache"))
+    # 原始字节相同直接命中；查询串不同但规范化参数相同时按内容哈希命中
+    assert states == ["miss", "hit", "hit"]
+
+
+def test_timed_out_job_holds_its_slot_until_it_finishes(server, monkeypatch):
+    # 工作进程在首次提交时才创建（fork），替换后的 run_job 在子进程中同样生效
+    monkeypatch.setattr(service, "JOB_TIMEOUT", 1.0)
+    monkeypatch.setattr(service, "run_job", slow_job)
+    data = write_workbook(generate_frames(ships=10, workareas=1, seed=0))
+    conn = connect(server)
+    conn.request("POST", "/schedule", body=data)
+    response = conn.getresponse()
+    response.read()
+    assert response.status == 504
+    # 已在运行的任务无法中断：仍占用位置，新请求被拒绝
+    assert not server.scheduler.slots.acquire(blocking=False)
+    time.sleep(3)
+    conn.request("POST", "/schedule", body=data)
+    response = conn.getresponse()
+    # 任务算完后释放位置，结果照常缓存，重试直接命中
+    assert response.read() == b"done" and response.getheader("X-Cache") == "hit"
@@ -0,0 +1,82 @@
+import random
+
+import numpy as np
+
+from conftest import make_frames
+from engine import run_schedule
+from model import WorkareaModel
+from solver import solve_workarea
+
+
+def make_model(crane_counts, large=None):
+    """按岸线顺序依次排列的船舶，第 i 艘船占用 crane_counts[i] 个相邻桥吊"""
+    ptr = np.concatenate([[0], np.cumsum(crane_counts)])
+    cranes = [f"Q{k + 1}" for k in range(ptr[-1])]
+    names = [f"船{i + 1}" for i in range(len(crane_counts))]
+    return WorkareaModel(cranes, names, large or [False] * len(crane_counts), ptr, np.arange(ptr[-1]))
+
+
+def solve(model, leaders, staff, caps=None, limits=None, min_per=2, max_per=2, use_all_staff=True):
+    return solve_workarea(model, leaders, staff, min_per, max_per, use_all_staff=use_all_staff, leader_caps=caps,
+                          staff_limits=limits, time_budget=1.0, rng=random.Random(0))
+
+
+def test_balanced_solution_covers_every_crane():
+    model = make_model([2, 2, 2, 2])
+    solution = solve(model, ["甲", "乙"], ["a", "b", "c", "d"])
+    assert sorted(len(a.ships) for a in solution["leader_allocations"].values()) == [2, 2]
+    assert sorted(c for cranes in solution["staff_crane_map"].values() for c in cranes) == list(range(8))
+
+
+def test_only_needed_staff_are_used_on_quota_workareas():
+    solution = solve(make_model([2, 2]), ["甲"], ["a", "b", "c", "d"], use_all_staff=False)
+    assert len(solution["staff_crane_map"]) == 2
+    assert all(len(cranes) == 2 for cranes in solution["staff_crane_map"].values())
+
+
+def test_leader_caps_are_respected():
+    model = make_model([2, 2, 2, 2])
+    solution = solve(model, ["甲", "乙"], ["a", "b", "c", "d"], caps=[(1, None, None), (None, None, None)])
+    assert len(solution["leader_allocations"]["甲"].ships) <= 1
+
+
+def test_unreachable_leader_caps_are_infeasible():
+    model = make_model([2, 2, 2, 2])
+    assert solve(model, ["甲", "乙"], ["a", "b", "c", "d"], caps=[(1, None, None), (1, None, None)]) is None
+    large = make_model([2, 2, 2, 2], large=[True, True, True, False])
+    assert solve(large, ["甲", "乙"], ["a", "b", "c", "d"], caps=[(None, 1, None), (None, 1, None)]) is None
+
+
+def test_too_few_staff_is_infeasible():
+    assert solve(make_model([2, 2, 2]), ["甲"], ["a", "b"]) is None
+
+
+def test_optimal_mode_schedules_the_sample():
+    result = run_schedule(make_frames(), seed=0, mode="optimal", time_budget=1.0)
+    assert result["results"]["四期"]["桥吊数量"].sum() == 10
+    assert result["results"]["自动化"]["桥吊数量"].tolist() == [2, 2, 2]
+
+
+def test_cranes_beyond_personal_limits_are_left_unassigned():
+    model = make_model([3, 3])
+    limits = {"a": (2, 2), "b": (2, 2)}
+    solution = solve(model, ["甲", "乙"], ["a", "b"], limits=limits, min_per=3, max_per=3)
+    # 每人按个人上限取2个相邻桥吊，组长名下剩余的1个桥吊不分配
+    assert sorted(solution["staff_crane_map"].values()) == [[0, 1], [3, 4]]
+    assert solution["unassigned_cranes"] == [2, 5]
+
+
+def test_personal_limits_shape_the_chunks():
+    solution = solve(make_model([2, 2]), ["甲"], ["a", "b"], limits={"a": (1, 1)}, min_per=1, max_per=3)
+    # 均分为2+2时a无法接手；按个人范围切分为1+3，全部桥吊有人负责
+    assert {person: len(cranes) for person, cranes in solution["staff_crane_map"].items()} == {"a": 1, "b": 3}
+    assert solution["unassigned_cranes"] == []
+
+
+def test_idle_clerk_takes_chunk_that_fits_their_limits():
+    model = make_model([3, 3])
+    limits = {"a": (1, 2), "b": (3, 3), "c": (3, 3)}
+    solution = solve(model, ["甲", "乙"], ["a", "b", "c"], limits=limits, min_per=3, max_per=3,
+                     use_all_staff=False)
+    assert set(solution["staff_crane_map"]) == {"b", "c"}
+    assert solution["unassigned_cranes"] == []
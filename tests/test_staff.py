@@ -0,0 +1,26 @@
+import pandas as pd
+
+from conftest import person
+from engine import summarize_staff
+
+
+def test_status_lists_and_available_staff(sample_frames):
+    summary = summarize_staff(sample_frames["人员信息表"])
+    assert {label: len(names) for label, names in summary["status"].items()} == {
+        "请假人员": 1, "公司抽调": 1, "负责闸口": 1, "驾驶员": 1, "设备员": 0, "申请加班": 2}
+    assert summary["status"]["申请加班"] == ["组长2", "理货6"]
+    assert summary["available"] == {
+        "理货组长": {"四期": ["组长1", "组长2"], "自动化": ["组长3"]},
+        "理货员": {"四期": ["理货1", "理货2"], "自动化": ["理货3", "理货4", "理货5", "理货6"]},
+    }
+
+
+def test_unclear_flags_make_staff_unavailable():
+    df = pd.DataFrame([person("甲", "理货员", "四期"), person("乙", "理货员", "四期"), person("丙", "理货员", "四期")])
+    df.loc[1, "是否请假（是/否）"] = "Y"
+    df.loc[2, "公司抽调（是/否）"] = None
+    df.loc[2, "驾驶员（是/否）"] = "是"
+    summary = summarize_staff(df)
+    # 请假、抽调、闸口三列需明确为“否”；其他列的非法取值不计入名单
+    assert summary["available"]["理货员"] == {"四期": ["甲"]}
+    assert summary["status"]["请假人员"] == [] and summary["status"]["驾驶员"] == ["丙"]
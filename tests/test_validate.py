@@ -0,0 +1,41 @@
+from io import BytesIO
+
+import pandas as pd
+
+from synthetic import generate_frames, write_workbook
+from validate import ERROR, WARNING, blocking, validate_workbook
+
+
+def workbook(frames):
+    return BytesIO(write_workbook(frames))
+
+
+def test_generated_workbook_has_no_issues():
+    assert validate_workbook(workbook(generate_frames(ships=10, workareas=1, seed=0))).empty
+
+
+def test_missing_sheet_is_an_error():
+    frames = generate_frames(ships=10, workareas=1, seed=0)
+    del frames["泊位与桥吊关联表"]
+    errors = blocking(validate_workbook(workbook(frames)))
+    assert list(errors["工作表"]) == ["泊位与桥吊关联表"]
+
+
+def test_bad_values_are_warnings_grouped_by_problem():
+    frames = generate_frames(ships=10, workareas=1, seed=0)
+    frames["人员信息表"].loc[[1, 3], "是否请假（是/否）"] = "Y"
+    frames["船舶与桥吊关联表"].iloc[0, 1] = "Q1,Q2/Q3"
+    report = validate_workbook(workbook(frames))
+    assert (report["级别"] == WARNING).all() and blocking(report).empty
+    leave = report[report["列"] == "是否请假（是/否）"]
+    assert list(leave["行号"]) == ["3, 5"] and "应为是/否" in leave["问题"].iloc[0]
+    assert report["问题"].str.contains("桥吊号“Q2/Q3”格式不正确").any()
+
+
+def test_duplicate_staff_name_is_an_error():
+    frames = generate_frames(ships=10, workareas=1, seed=0)
+    staff = frames["人员信息表"]
+    frames["人员信息表"] = pd.concat([staff, staff.iloc[[0]]], ignore_index=True)
+    errors = blocking(validate_workbook(workbook(frames)))
+    assert list(errors["列"]) == ["姓名"] and (errors["级别"] == ERROR).all()
+    assert "姓名重复" in errors["问题"].iloc[0]
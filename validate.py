@@ -0,0 +1,212 @@
+"""上传文件预检：只读表头、逐行流式检查取值，在完整解析前给出逐项问题清单
+
+    report = validate_workbook("配工.xlsx")      # DataFrame，列见 VALIDATION_COLUMNS
+    blocking(report)                            # “错误”级别的问题，存在时不应继续解析
+    future = validate_async(file_bytes)         # 后台线程预检，页面先行渲染
+
+用 openpyxl 只读模式打开，不建立 DataFrame：规则表只读表头，人员、泊位、船舶三张表
+逐行检查是/否取值和桥吊号格式。缺少工作表或必需列为“错误”（完整解析会失败），
+人员姓名重复也为“错误”（配工及配工历史按姓名区分人员），其余取值问题为“警告”
+（配工仍可进行，但相应人员或桥吊不会按预期参与）。
+同一问题出现在多行时合并为一项，列出行号。
+"""
+import difflib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from constraints import CLERK_SHEET, COLUMN_ALIASES, LEADER_SHEET
+from diagnostics import submit, traced
+from engine import CRANE_ID_PATTERN, STATUS_COLUMNS, UNAVAILABLE_COLUMNS, YES_NO
+from loader import match_sheet_names
+
+VALIDATION_COLUMNS = ["级别", "工作表", "行号", "列", "问题"]
+ERROR, WARNING = "错误", "警告"
+
+BERTH_CRANE_COLUMN = "桥吊号（按从左到右顺序，逗号分隔）"
+SHIP_CRANE_COLUMN = "对应桥吊号（逗号分隔，需属于工作表1中的桥吊）"
+STAFF_WORKAREA_COLUMN = "工作地（四期/自动化/闸口）"
+
+# 各工作表的必需列（规则表的列按别名识别，见 constraints.COLUMN_ALIASES）
+REQUIRED_COLUMNS = {
+    "泊位与桥吊关联表": ["工作地", BERTH_CRANE_COLUMN],
+    "船舶与桥吊关联表": ["船舶名称", SHIP_CRANE_COLUMN],
+    "人员信息表": ["姓名", "岗位类型", STAFF_WORKAREA_COLUMN] + [col for _, col in STATUS_COLUMNS],
+}
+
+# 规则表中缺失时会回退默认规则的列（组）
+RULE_COLUMNS = {LEADER_SHEET: ["最多带船数"], CLERK_SHEET: ["最少桥吊数", "最多桥吊数"]}
+
+# 合并问题时最多列出的行号数
+MAX_LISTED_ROWS = 20
+
+_CRANE_ID = re.compile(CRANE_ID_PATTERN)
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="validate")
+
+
+def _text(value):
+    if value is None:
+        return ""
+    return value.strip() if isinstance(value, str) else str(value)
+
+
+class _Report:
+    """按（级别，工作表，列，问题）合并的问题清单"""
+
+    def __init__(self):
+        self.items = {}
+
+    def add(self, level, sheet, row, column, problem):
+        self.items.setdefault((level, sheet, column, problem), []).append(row)
+
+    def frame(self):
+        records = []
+        for (level, sheet, column, problem), rows in self.items.items():
+            rows = [r for r in rows if r is not None]
+            text = ", ".join(map(str, rows[:MAX_LISTED_ROWS]))
+            if len(rows) > MAX_LISTED_ROWS:
+                text += f" 等共{len(rows)}行"
+            records.append((level, sheet, text, column, problem))
+        df = pd.DataFrame(records, columns=VALIDATION_COLUMNS)
+        return df.sort_values("级别", key=lambda s: s != ERROR, kind="stable", ignore_index=True)
+
+
+def _header(ws):
+    row = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+    return [_text(v) for v in row]
+
+
+def _check_columns(report, sheet, header, required):
+    """缺少的必需列记为错误，表头中有相近列名时提示可能的笔误"""
+    present = set(header)
+    for col in required:
+        if col in present:
+            continue
+        close = difflib.get_close_matches(col, [h for h in header if h], n=1, cutoff=0.6)
+        hint = f"，表头中的“{close[0]}”是否为笔误" if close else ""
+        report.add(ERROR, sheet, 1, col, f"缺少必需列{hint}")
+
+
+def _rows(ws, header, columns):
+    """逐行产出（Excel行号，列名 -> 取值），只取需要的列，跳过整行为空的行"""
+    index = {col: header.index(col) for col in columns if col in header}
+    for row, values in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+        if all(v is None or (isinstance(v, str) and not v.strip()) for v in values):
+            continue
+        yield row, {col: values[i] if i < len(values) else None for col, i in index.items()}
+
+
+def _check_cranes(report, sheet, row, column, value):
+    """按 engine.explode_cranes 的清洗规则检查桥吊号格式"""
+    for piece in _text(value).replace("，", ",").upper().split(","):
+        piece = piece.strip()
+        if piece and not _CRANE_ID.fullmatch(piece):
+            report.add(WARNING, sheet, row, column, f"桥吊号“{piece}”格式不正确，应为大写字母、数字，可含 - _ # 分隔")
+
+
+def _check_staff(report, ws, header):
+    sheet = "人员信息表"
+    flag_cols = [col for _, col in STATUS_COLUMNS]
+    seen = {}
+    for row, values in _rows(ws, header, ["姓名", *flag_cols]):
+        name = _text(values.get("姓名"))
+        if not name:
+            report.add(WARNING, sheet, row, "姓名", "姓名未填写")
+        elif name in seen:
+            report.add(ERROR, sheet, row, "姓名", f"与第{seen[name]}行姓名重复")
+        else:
+            seen[name] = row
+        for col in flag_cols:
+            if col not in values:
+                continue
+            text = _text(values[col])
+            if not text:
+                if col in UNAVAILABLE_COLUMNS:
+                    report.add(WARNING, sheet, row, col, "未填写，视为不可参与配工")
+            elif text not in YES_NO:
+                report.add(WARNING, sheet, row, col, f"取值“{text}”应为是/否"
+                           + ("，视为不可参与配工" if col in UNAVAILABLE_COLUMNS else ""))
+
+
+def _check_berths(report, ws, header):
+    sheet = "泊位与桥吊关联表"
+    for row, values in _rows(ws, header, ["工作地", BERTH_CRANE_COLUMN]):
+        if "工作地" in values and not _text(values["工作地"]):
+            report.add(WARNING, sheet, row, "工作地", "工作地未填写，该行桥吊不参与配工")
+        if BERTH_CRANE_COLUMN in values:
+            _check_cranes(report, sheet, row, BERTH_CRANE_COLUMN, values[BERTH_CRANE_COLUMN])
+
+
+def _check_ships(report, ws, header):
+    sheet = "船舶与桥吊关联表"
+    for row, values in _rows(ws, header, ["船舶名称", SHIP_CRANE_COLUMN]):
+        if "船舶名称" in values and not _text(values["船舶名称"]):
+            report.add(WARNING, sheet, row, "船舶名称", "船舶名称未填写")
+        if SHIP_CRANE_COLUMN in values:
+            if not _text(values[SHIP_CRANE_COLUMN]):
+                report.add(WARNING, sheet, row, SHIP_CRANE_COLUMN, "未填写桥吊号，该船舶不参与配工")
+            else:
+                _check_cranes(report, sheet, row, SHIP_CRANE_COLUMN, values[SHIP_CRANE_COLUMN])
+
+
+def _check_rules(report, ws, header, sheet):
+    """规则表只读表头：有规则行但缺少规则列时整张表不生效"""
+    if (ws.max_row or 2) < 2:
+        return
+    for name in RULE_COLUMNS[sheet]:
+        if not any(alias in header for alias in COLUMN_ALIASES[name]):
+            report.add(WARNING, sheet, 1, name, f"未识别到该列（可用列名：{'/'.join(COLUMN_ALIASES[name])}），"
+                                                "本表规则不生效，使用默认规则")
+
+
+VALUE_CHECKS = {"人员信息表": _check_staff, "泊位与桥吊关联表": _check_berths, "船舶与桥吊关联表": _check_ships}
+
+
+@traced("上传预检", lambda result, source: {"问题": len(result), "错误": int((result["级别"] == ERROR).sum())})
+def validate_workbook(source):
+    """预检工作簿（路径或文件对象），返回问题清单DataFrame（列见 VALIDATION_COLUMNS），无问题时为空表"""
+    report = _Report()
+    try:
+        wb = load_workbook(source, read_only=True, data_only=True)
+    except Exception as e:
+        report.add(ERROR, "", None, "", f"无法作为Excel文件打开：{e}")
+        return report.frame()
+    try:
+        sheet_name_map, missing = match_sheet_names(wb.sheetnames)
+        for key in missing:
+            report.add(ERROR, key, None, "", "未找到工作表（工作表名需包含该名称）")
+        for key, name in sheet_name_map.items():
+            candidates = [s for s in wb.sheetnames if key in s]
+            if name.strip() != key and len(candidates) > 1:
+                report.add(WARNING, name, None, "", f"有{len(candidates)}个工作表名包含“{key}”"
+                                                    f"（{'、'.join(candidates)}），使用“{name}”")
+            ws = wb[name]
+            header = _header(ws)
+            if key in REQUIRED_COLUMNS:
+                _check_columns(report, key, header, REQUIRED_COLUMNS[key])
+                VALUE_CHECKS[key](report, ws, header)
+            else:
+                _check_rules(report, ws, header, key)
+    finally:
+        wb.close()
+    return report.frame()
+
+
+def validate_async(data):
+    """在后台线程中预检工作簿字节内容，返回 Future（结果同 validate_workbook）"""
+    return submit(_executor, validate_workbook, BytesIO(data))
+
+
+def blocking(report):
+    """问题清单中会导致完整解析失败的“错误”项"""
+    return report[report["级别"] == ERROR]
+
+
+def format_issue(item):
+    """把问题清单的一行格式化为一句提示"""
+    where = item["工作表"] + (f" 第{item['行号']}行" if item["行号"] else "") + (f" “{item['列']}”列" if item["列"] else "")
+    return f"[{item['级别']}] {where}：{item['问题']}"